@@ -0,0 +1,269 @@
+# benchmarks/pipeline_bench.py
+
+"""
+Uçtan uca veri hattı (pipeline) benchmark'ı.
+Simülatör trafiğini BluetoothManager._notification_handler'dan başlayarak
+FrameIngestor -> çözümleme/depo -> ekranlar (Dashboard, Errors, Logs) ve
+BLF kayda kadar sürer; aşama başına gecikme yüzdeliklerini, toplam verimi
+ve bellek artışını raporlar.
+
+Kullanım:
+    python benchmarks/pipeline_bench.py                  # çalıştır, baseline ile karşılaştır
+    python benchmarks/pipeline_bench.py --save-baseline  # sonucu baseline olarak kaydet
+    python benchmarks/pipeline_bench.py --check          # gerileme varsa çıkış kodu 1
+    python benchmarks/pipeline_bench.py --no-ui          # Kivy ekranları olmadan
+    python benchmarks/pipeline_bench.py --trace-memory   # Python bellek artışını da ölç
+
+Baseline makineye özgüdür ve depoda tutulmaz: önce aynı cihazda --save-baseline ile
+kaydedilmelidir. Baseline makine bilgisini de saklar; farklı bir makinede ya da farklı
+ayarlarla (--total, --rate ...) kaydedilmiş baseline ile gerileme kontrolü yapılmaz.
+Gerileme p50/p90 üzerinden --tolerance ile, gürültülü p99 ise daha geniş --p99-tolerance
+ile değerlendirilir.
+Ekranlar Kivy'nin "mock" GL arka ucu ile pencere açılmadan oluşturulur; Kivy/KivyMD
+yüklü değilse ekran aşaması atlanır ve raporda belirtilir.
+"""
+
+import argparse  # Komut satırı seçenekleri
+import contextlib  # stdout yönlendirme
+import io  # Sessiz stdout
+import json  # Sonuç ve baseline dosyası
+import os  # Ortam değişkenleri ve yollar
+import platform  # Baseline'ın kaydedildiği makine
+import sys  # Proje kökünü import yoluna eklemek için
+import time  # perf_counter_ns / monotonic_ns
+import tracemalloc  # Python bellek artışı
+
+try:
+    import resource  # RSS ölçümü (Windows'ta yok)
+except ImportError:
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+os.environ.setdefault("CAN2GO_SIMULATOR", "1")  # bleak gerekmez
+
+from utils.bluetooth_manager import BluetoothManager  # noqa: E402
+from utils.ingest import FrameIngestor, LATEST_PER_BCU, DROP_OLDEST  # noqa: E402
+from utils.timeseries import TimeSeriesStore  # noqa: E402
+from utils.capture import CaptureBuffer  # noqa: E402
+from utils.log_writer import StreamingLogWriter  # noqa: E402
+from utils.blf import BLFLogFormat  # noqa: E402
+from utils.simulator import SimulatorConfig, TrafficGenerator  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+REGRESSION_TOLERANCE = 0.20  # p50/p90 ve verimde baseline'a göre %20'den fazla kötüleşme gerileme sayılır
+P99_TOLERANCE = 1.0  # p99 (GC, zamanlayıcı) gürültülüdür: ancak iki katını aşarsa gerileme
+# Ekranların uygulamadaki (main.py) devir politikaları
+SCREEN_POLICIES = {"dashboard": (LATEST_PER_BCU, None), "logs": (DROP_OLDEST, 1)}
+
+
+def percentiles(samples_ns, points=(50, 90, 99)):
+    # ns örneklerinden mikro saniye cinsinden yüzdelikler
+    if not samples_ns:
+        return {f"p{p}": None for p in points}
+    data = sorted(samples_ns)
+    out = {}
+    for p in points:
+        k = min(len(data) - 1, int(round(p / 100 * (len(data) - 1))))
+        out[f"p{p}"] = round(data[k] / 1000, 2)
+    return out
+
+
+class _StageTimer:
+    # Tüketici sarmalayıcı: on_new_batch süresini ölçer
+    def __init__(self, consumer, samples):
+        self.consumer = consumer
+        self.samples = samples
+
+    def on_new_batch(self, frames):
+        t0 = time.perf_counter_ns()
+        self.consumer.on_new_batch(frames)
+        self.samples.append(time.perf_counter_ns() - t0)
+
+
+def _max_rss_kb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+
+
+def machine_info():
+    # Baseline'ın karşılaştırılabilirliği için makine özeti
+    return {
+        "system": platform.system(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+    }
+
+
+def build_screens(store):
+    """
+    Kivy ekranlarını pencere açmadan oluşturur.
+    Dönüş: ({ad: ekran}, None) ya da ({}, atlanma nedeni)
+    """
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    os.environ.setdefault("KIVY_NO_CONSOLELOG", "1")
+    os.environ.setdefault("KIVY_GL_BACKEND", "mock")
+    try:
+        from kivymd.app import MDApp  # theme_cls için çalışan bir uygulama nesnesi gerekir
+        from screens.dashboard import DashboardScreen
+        from screens.errors import ErrorScreen
+        from screens.logs import LogsScreen
+    except Exception as e:  # Kivy yoksa ya da başlatılamıyorsa
+        return {}, f"{type(e).__name__}: {e}"
+    MDApp()  # App._running_app atanır; run() çağrılmaz
+    return {
+        "dashboard": DashboardScreen(store=store),
+        "errors": ErrorScreen(),
+        "logs": LogsScreen(),
+    }, None
+
+
+def run(total=200_000, rate=5000.0, fps=60.0, seed=0, ui=True, trace_memory=False):
+    """
+    total: işlenecek bildirim sayısı
+    rate/fps: UI karesi başına düşen bildirim sayısını belirler (rate / fps)
+    trace_memory: Python bellek artışını tracemalloc ile ölç (süreleri belirgin yavaşlatır)
+    """
+    gen = TrafficGenerator(SimulatorConfig(seed=seed))
+    frames = gen.frames(total)  # Üretim maliyeti ölçüme dahil edilmez
+    per_frame = max(1, int(rate / fps))
+
+    stage = {"notify": [], "decode_store": [], "dashboard": [], "errors": [], "logs": []}
+    e2e = []  # Bildirimden UI karesi sonuna gecikme
+
+    store = TimeSeriesStore()
+    ingestor = FrameIngestor(capacity=max(4096, per_frame * 4))
+    ingestor.add_consumer(_StageTimer(store, stage["decode_store"]))
+    screens, skipped = build_screens(store) if ui else ({}, "--no-ui")
+    for name, screen in screens.items():
+        ingestor.add_consumer(_StageTimer(screen, stage[name]), *SCREEN_POLICIES.get(name, ()))
+
+    capture = CaptureBuffer()
+    writer = StreamingLogWriter(fmt=BLFLogFormat(), flush_interval=0.05, source=capture)
+
+    def dispatch(data):
+        capture.append(data)
+        ingestor.push(data)
+
+    manager = BluetoothManager()
+    manager.notify_callback = dispatch
+
+    if trace_memory:
+        tracemalloc.start()
+    rss0 = _max_rss_kb()
+    sink = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sink):
+        for start in range(0, total, per_frame):
+            for data in frames[start:start + per_frame]:
+                t0 = time.perf_counter_ns()
+                manager._notification_handler("bench", data)
+                stage["notify"].append(time.perf_counter_ns() - t0)
+            batch = ingestor.drain()
+            done = time.monotonic_ns()
+            if batch:
+                e2e.extend(done - ts for ts in batch.timestamps)
+            sink.seek(0)
+            sink.truncate()
+    elapsed = time.perf_counter() - started
+    memory = {}
+    if trace_memory:
+        mem1, mem_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        memory = {"python_growth_kb": round(mem1 / 1024, 1), "python_peak_kb": round(mem_peak / 1024, 1)}
+    rss1 = _max_rss_kb()
+
+    t0 = time.perf_counter()
+    writer.discard()
+    flush_s = time.perf_counter() - t0
+
+    result = {
+        "machine": machine_info(),
+        "config": {"total": total, "rate": rate, "fps": fps, "seed": seed, "frames_per_ui_frame": per_frame},
+        "throughput_per_s": round(total / elapsed, 1),
+        "elapsed_s": round(elapsed, 3),
+        "writer_flush_s": round(flush_s, 3),
+        "dropped": {"ingestor": ingestor.dropped, "capture": capture.dropped},
+        "latency_us": {name: percentiles(s) for name, s in stage.items() if s},
+        "end_to_end_us": percentiles(e2e),
+        "memory": dict(memory, max_rss_growth_kb=rss1 - rss0 if resource else None),
+        "ui_skipped": skipped,
+    }
+    return result
+
+
+def compare(result, baseline, tolerance=REGRESSION_TOLERANCE, p99_tolerance=P99_TOLERANCE):
+    """
+    Baseline'a göre gerilemeleri listeler.
+    Dönüş: (gerilemeler, notlar) — notlar karşılaştırılamayan durumları açıklar.
+    Baseline başka bir makinede ya da başka ayarlarla kaydedildiyse karşılaştırma
+    yapılmaz ve gerilemeler None döner.
+    """
+    problems, notes = [], []
+    if baseline.get("machine") != result["machine"]:
+        notes.append("baseline başka bir makinede kaydedilmiş; bu makinede --save-baseline ile yeniden kaydedin")
+        return None, notes
+    if baseline.get("config") != result["config"]:
+        notes.append(f"baseline ayarları farklı ({baseline.get('config')}); aynı ayarlarla çalıştırın "
+                     "ya da --save-baseline ile yeniden kaydedin")
+        return None, notes
+    base_tp = baseline.get("throughput_per_s")
+    if base_tp and result["throughput_per_s"] < base_tp * (1 - tolerance):
+        problems.append(f"throughput {result['throughput_per_s']} < baseline {base_tp}")
+    limits = (("p50", tolerance), ("p90", tolerance), ("p99", p99_tolerance))
+    for name, cur in result["latency_us"].items():
+        base = baseline.get("latency_us", {}).get(name)
+        if not base:
+            notes.append(f"{name}: baseline'da yok (ör. Kivy olmadan kaydedilmiş); --save-baseline ile yeniden kaydedin")
+            continue
+        for p, tol in limits:
+            if base.get(p) and cur.get(p) is not None and cur[p] > base[p] * (1 + tol):
+                problems.append(f"{name} {p} {cur[p]}us > baseline {base[p]}us (+{tol:.0%})")
+    return problems, notes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CAN2Go pipeline benchmark")
+    parser.add_argument("--total", type=int, default=200_000)
+    parser.add_argument("--rate", type=float, default=5000.0)
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-ui", action="store_true", help="Kivy ekranlarını dahil etme")
+    parser.add_argument("--trace-memory", action="store_true", help="tracemalloc ile Python bellek artışı")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="gerileme varsa 1 ile çık")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="p50/p90 ve verim için gerileme eşiği (oran, varsayılan 0.20)")
+    parser.add_argument("--p99-tolerance", type=float, default=P99_TOLERANCE,
+                        help="p99 için gerileme eşiği (oran, varsayılan 1.0)")
+    args = parser.parse_args(argv)
+
+    result = run(args.total, args.rate, args.fps, args.seed, ui=not args.no_ui,
+                 trace_memory=args.trace_memory)
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+        print(f"Baseline kaydedildi: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"Baseline yok ({args.baseline}): önce bu makinede --save-baseline ile kaydedin")
+        return 1 if args.check else 0
+    with open(args.baseline) as f:
+        problems, notes = compare(result, json.load(f), args.tolerance, args.p99_tolerance)
+    for n in notes:
+        print(f"NOT: {n}")
+    if problems is None:
+        return 2 if args.check else 0  # Karşılaştırılamadı (gerileme değil)
+    for p in problems:
+        print(f"GERİLEME: {p}")
+    return 1 if problems and args.check else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
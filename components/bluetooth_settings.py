@@ -1,7 +1,5 @@
 # components/bluetooth_settings.py
 
-import threading  # BLE taramasını ana akışı bloklamadan yapmak için
-import asyncio   # Asenkron BLE işlemleri
 from kivy.clock import Clock  # UI güncellemelerini planlamak için
 from kivy.metrics import dp  # DPI bağımsız ölçümler
 from kivymd.uix.dialog import MDDialog  # Diyalog pencereleri
@@ -9,7 +7,7 @@ from kivymd.uix.boxlayout import MDBoxLayout  # Dikey düzen kutusu
 from kivymd.uix.label import MDLabel  # Metin göstermek için
 from kivymd.uix.scrollview import MDScrollView  # Kaydırılabilir alan
 from kivymd.uix.list import MDList, OneLineListItem  # Basit liste bileşenleri
-from bleak import BleakScanner  # BLE cihaz tarayıcı
+from utils.discovery import get_discovery  # Ortak, akışlı ve önbellekli BLE keşfi
 
 class BluetoothSettingsDialog:
     def __init__(self, select_callback=None):
@@ -20,6 +18,8 @@ class BluetoothSettingsDialog:
         self.label = None
         self.device_list = None
         self.select_callback = select_callback  # Seçim callback'i
+        self.discovery = get_discovery()  # Ayarlar ekranıyla paylaşılan keşif servisi
+        self._items = {}  # adres -> liste öğesi
 
     def open(self):
         # Diyalog içeriği: başlık, etiket ve cihaz listesi
@@ -44,46 +44,59 @@ class BluetoothSettingsDialog:
         )
         self.dialog.open()
 
-        # Cihaz taramayı arka planda başlat
-        threading.Thread(target=self._scan_in_thread, daemon=True).start()
+        # Önbellekteki cihazlar anında listelenir; tarama (süre sınırı 5 saniye)
+        # sürerken bulunan cihazlar akış halinde eklenir
+        self._items = {}
+        for d in self.discovery.cached():
+            self._add_device(d)
+        if self._items:
+            self._set_label("Bulunan Cihazlar (tıklayarak seç):")
+        self.discovery.add_listener(self._on_discovered)
+        self.discovery.start(timeout=5.0).add_done_callback(self._scan_done)
 
-    def _scan_in_thread(self):
+    def _on_discovered(self, device, is_new):
+        # BLE thread'inde çağrılır; UI işleri Clock ile ana thread'e taşınır
+        Clock.schedule_once(lambda dt: self._add_device(device))
+
+    def _scan_done(self, future):
+        # BLE thread'inde çağrılır; UI işleri Clock ile ana thread'e taşınır
         try:
-            # Asenkron keşif işlemi, süre sınırı 5 saniye
-            devices = asyncio.run(BleakScanner.discover(timeout=5.0))
+            future.result()
         except Exception as e:
             # Hata mesajını UI thread'e ilet
-            Clock.schedule_once(lambda dt: self._set_label(f"Hata: {e}"))
+            Clock.schedule_once(lambda dt, err=e: self._set_label(f"Hata: {err}"))
             return
-        # Bulunan cihazları UI thread'te listele
-        Clock.schedule_once(lambda dt: self._populate_list(devices))
+        Clock.schedule_once(lambda dt: self._finish_scan())
 
     def _set_label(self, text: str):
         # Durum etiketini güncelle
         if self.label:
             self.label.text = text
 
-    def _populate_list(self, devices):
-        # Debug bilgisi: konsola cihaz sayısını yaz
-        print(f"[BluetoothSettingsDialog] {len(devices)} cihaz bulundu")
-
-        self.device_list.clear_widgets()
-
-        if not devices:
+    def _finish_scan(self):
+        self.discovery.remove_listener(self._on_discovered)
+        if not self._items:
             self._set_label("Hiçbir cihaz bulunamadı.")
-            return
 
-        self._set_label("Bulunan Cihazlar (tıklayarak seç):")
-        # Her cihaz için liste öğesi oluştur
-        for d in devices:
-            name = d.name or "Adsız"
-            address = d.address
-            item_text = f"{name} — {address}"
-            item = OneLineListItem(text=item_text, on_release=lambda x, addr=address: self._on_device_selected(addr))
-            self.device_list.add_widget(item)
+    def _add_device(self, d):
+        # Yeni cihaz için liste öğesi oluştur; bilinen cihazın yalnızca RSSI'sini güncelle
+        if self.device_list is None:
+            return
+        item_text = f"{d.name or 'Adsız'} — {d.address}" + (f"  ({d.rssi} dBm)" if d.rssi is not None else "")
+        item = self._items.get(d.address)
+        if item is not None:
+            item.text = item_text
+            return
+        if not self._items:
+            self._set_label("Bulunan Cihazlar (tıklayarak seç):")
+        item = OneLineListItem(text=item_text, on_release=lambda x, addr=d.address: self._on_device_selected(addr))
+        self.device_list.add_widget(item)
+        self._items[d.address] = item
 
     def _on_device_selected(self, address: str):
-        # Cihaz seçildiğinde callback'i çağır ve diyaloğu kapat
+        # Cihaz seçildiğinde taramayı bitir, callback'i çağır ve diyaloğu kapat
+        self.discovery.remove_listener(self._on_discovered)
+        self.discovery.stop()
         if self.select_callback:
             self.select_callback(address)
         self.dialog.dismiss()
\ No newline at end of file
@@ -0,0 +1,72 @@
+# components/debug_overlay.py
+
+from kivy.clock import Clock  # Saniyede bir yenileme
+from kivy.graphics import Color, Rectangle  # Yarı saydam arka plan
+from kivy.metrics import dp  # DPI bağımsız ölçümler
+from kivymd.uix.label import MDLabel  # Yarı saydam metin katmanı
+
+from utils.instrumentation import STATS  # Ölçümlerin okunduğu ortak nesne
+
+
+class DebugOverlay(MDLabel):
+    """
+    Geliştirici katmanı: paket/s, bayt/s, düşürülen paketler ve tüketici
+    gecikme yüzdeliklerini saniyede bir gösterir. Yalnızca açıkken çalışır;
+    kapalıyken zamanlayıcı durdurulur ve hiçbir maliyeti yoktur.
+    """
+
+    def __init__(self, stats=STATS, interval=1.0, **kwargs):
+        kwargs.setdefault("size_hint", (None, None))
+        kwargs.setdefault("size", (dp(300), dp(140)))
+        kwargs.setdefault("pos_hint", {"right": 1, "top": 0.9})
+        kwargs.setdefault("font_style", "Caption")
+        kwargs.setdefault("theme_text_color", "Custom")
+        kwargs.setdefault("text_color", (0.1, 0.9, 0.3, 1))
+        kwargs.setdefault("valign", "top")
+        super().__init__(**kwargs)
+        self.padding = (dp(6), dp(4))
+        with self.canvas.before:
+            Color(0, 0, 0, 0.6)
+            self._bg = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._sync_bg, size=self._sync_bg)
+        self.stats = stats
+        self.interval = interval
+        self._event = None
+        self._last = None  # (zaman, paket, bayt) — hız hesabı için
+
+    def _sync_bg(self, *args):
+        self._bg.pos = self.pos
+        self._bg.size = self.size
+
+    def start(self):
+        if self._event is None:
+            self._last = None
+            self._event = Clock.schedule_interval(self.refresh, self.interval)
+            self.refresh()
+
+    def stop(self):
+        if self._event is not None:
+            self._event.cancel()
+            self._event = None
+
+    def refresh(self, *args):
+        snap = self.stats.snapshot()
+        counters = snap["counters"]
+        packets = counters.get("ble.packets", 0)
+        nbytes = counters.get("ble.bytes", 0)
+        now = snap["uptime_s"]
+        pps = bps = 0.0
+        if self._last and now > self._last[0]:
+            dt = now - self._last[0]
+            pps = (packets - self._last[1]) / dt
+            bps = (nbytes - self._last[2]) / dt
+        self._last = (now, packets, nbytes)
+
+        lines = [f"paket/s: {pps:.0f}   bayt/s: {bps:.0f}"]
+        drops = ", ".join(f"{k}={v}" for k, v in snap["gauges"].items() if k.endswith("dropped"))
+        if drops:
+            lines.append(f"düşen: {drops}")
+        for name, h in sorted(snap["latency"].items()):
+            if h["count"]:
+                lines.append(f"{name}: p50 {h['p50_us']:.0f}µs  p99 {h['p99_us']:.0f}µs")
+        self.text = "\n".join(lines)
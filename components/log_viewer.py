@@ -0,0 +1,216 @@
+# components/log_viewer.py
+
+import threading  # Filtre araması arka planda yapılır
+from datetime import datetime, timedelta  # Saat metninden zamana dönüşüm
+
+from kivy.clock import Clock  # Arama sonucunu UI thread'ine taşımak için
+from kivy.metrics import dp  # DPI bağımsız ölçümler
+from kivy.uix.modalview import ModalView  # Tam ekran görüntüleyici penceresi
+from kivy.uix.recycleboxlayout import RecycleBoxLayout  # RecycleView satır düzeni
+from kivymd.uix.boxlayout import MDBoxLayout  # Material kutu düzeni
+from kivymd.uix.button import MDIconButton  # Gezinme butonları
+from kivymd.uix.label import MDLabel  # Başlık ve durum metni
+from kivymd.uix.recycleview import MDRecycleView  # Yalnızca görünen satırları oluşturan liste
+from kivymd.uix.slider import MDSlider  # Kayıt içinde konum seçimi
+from kivymd.uix.textfield import MDTextField  # Zaman ve filtre girişi
+
+from utils.log_index import LogIndex, RowFilter, format_row, format_time  # mmap'li BLF okuyucu ve zaman indeksi
+
+
+class LogViewer(MDBoxLayout):
+    """
+    Kaydedilmiş BLF dosyasını uygulama içinde gösterir.
+    Dosya belleğe okunmaz: LogIndex konteyner indeksini (gerekirse yan dosyadan)
+    alır, ekranda yalnızca seçili konteynerin satırları bulunur ve bunların da
+    yalnızca görünenleri widget olarak oluşturulur. Kaydırıcı ve zaman alanı
+    indeks üzerinden ilgili konteynere atlar; filtre (BCU / hata ID) satırları
+    süzer ve ileri/geri arama eşleşen ilk konteyneri arka planda bulur.
+    """
+
+    def __init__(self, path, close_callback=None, **kwargs):
+        super().__init__(**kwargs)
+        self.orientation = 'vertical'
+        self.padding = dp(10)
+        self.spacing = dp(6)
+        self.close_callback = close_callback
+        self.index = LogIndex(path)
+        self.block = None  # Gösterilen konteyner (LogBlock)
+        self.row_filter = None
+        self._search = None  # Süren aramanın iptal olayı
+
+        # Başlık: dosya adı ve kapatma
+        header = MDBoxLayout(size_hint_y=None, height=dp(40))
+        name = path.replace("\\", "/").rsplit("/", 1)[-1]
+        header.add_widget(MDLabel(text=name, font_style="Subtitle1", shorten=True))
+        header.add_widget(MDIconButton(icon="close", on_release=lambda x: self.close()))
+        self.add_widget(header)
+
+        # Zamana atlama ve filtre alanları
+        controls = MDBoxLayout(size_hint_y=None, height=dp(56), spacing=dp(6))
+        self.time_input = MDTextField(hint_text="Zaman (ss:dd:ss)", mode="rectangle", size_hint_x=0.4)
+        self.time_input.bind(on_text_validate=self._jump_to_time)
+        self.filter_input = MDTextField(hint_text="Filtre (BCU 3 / E145)", mode="rectangle", size_hint_x=0.6)
+        self.filter_input.bind(on_text_validate=self._apply_filter)
+        controls.add_widget(self.time_input)
+        controls.add_widget(self.filter_input)
+        controls.add_widget(MDIconButton(icon="magnify", on_release=self._apply_filter))
+        self.add_widget(controls)
+
+        # Konum: önceki/sonraki konteyner ve kaydırıcı
+        nav = MDBoxLayout(size_hint_y=None, height=dp(40))
+        nav.add_widget(MDIconButton(icon="chevron-left", on_release=lambda x: self._step(-1)))
+        self.slider = MDSlider(min=0, max=max(len(self.index) - 1, 1), step=1, hint=False)
+        self.slider.bind(on_touch_up=self._on_slider_release)
+        nav.add_widget(self.slider)
+        nav.add_widget(MDIconButton(icon="chevron-right", on_release=lambda x: self._step(1)))
+        self.add_widget(nav)
+
+        self.status_label = MDLabel(size_hint_y=None, height=dp(24), font_style="Caption")
+        self.add_widget(self.status_label)
+
+        # Satır listesi: RecycleView yalnızca ekrandaki satırlar için widget oluşturur
+        self.row_list = MDRecycleView()
+        self.row_list.viewclass = "TwoLineListItem"
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            default_size=(None, dp(56)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.row_list.add_widget(layout)
+        self.add_widget(self.row_list)
+
+        if len(self.index):
+            self.show_block(0)
+        else:
+            self.status_label.text = "Kayıtta veri yok."
+
+    def show_block(self, i, row=0, matches=None):
+        # i. konteyneri listele (filtre varsa yalnızca eşleşen satırlar) ve satıra kaydır
+        self.block = block = self.index.block(i)
+        if matches is None:
+            matches = self.row_filter.select(block) if self.row_filter else range(len(block))
+        data = []
+        target = 0
+        for n, r in enumerate(matches):
+            head, summary = format_row(block, r)
+            data.append({"text": head, "secondary_text": summary, "_no_ripple_effect": True})
+            if r < row:
+                target = n + 1
+        self.row_list.data = data
+        self.row_list.scroll_y = 1 - target / max(len(data) - 1, 1) if data else 1
+        self.slider.value = i
+        self._show_status(len(data))
+
+    def _show_status(self, shown):
+        block, index = self.block, self.index
+        text = f"Blok {block.index + 1}/{len(index)}"
+        if len(block):
+            text += f"  {format_time(block.timestamps[0])} – {format_time(block.timestamps[-1])}"
+        if self.row_filter:
+            text += f"  ({shown}/{len(block)} satır)"
+        self.status_label.text = text
+
+    def _step(self, direction):
+        # Filtre varken eşleşme içeren bir sonraki / önceki konteynere, yoksa komşu konteynere geç
+        if self.block is None:
+            return
+        if self.row_filter:
+            self._find(direction)
+            return
+        i = self.block.index + direction
+        if 0 <= i < len(self.index):
+            self.show_block(i)
+
+    def _on_slider_release(self, slider, touch):
+        if slider.collide_point(*touch.pos) and self.block is not None:
+            i = int(slider.value)
+            if i != self.block.index:
+                self.show_block(i)
+
+    def _jump_to_time(self, *args):
+        # "ss:dd[:ss]" kaydın başladığı güne göre yorumlanır (gece yarısını aşan kayıtlar dahil)
+        text = self.time_input.text.strip()
+        try:
+            parts = [int(p) for p in text.split(":")]
+            if not 2 <= len(parts) <= 3:
+                raise ValueError
+            parts += [0] * (3 - len(parts))
+            start = datetime.fromtimestamp(self.index.start_timestamp or self.index.first_ts[0])
+            target = start.replace(hour=parts[0], minute=parts[1], second=parts[2], microsecond=0)
+        except (ValueError, IndexError):
+            self.status_label.text = "Geçersiz zaman (ör. 14:05:30)."
+            return
+        if target < start.replace(microsecond=0):
+            target += timedelta(days=1)
+        found = self.index.locate(target.timestamp())
+        if found:
+            self.show_block(*found)
+
+    def _parse_filter(self):
+        try:
+            self.row_filter = RowFilter.parse(self.filter_input.text)
+        except ValueError as e:
+            self.status_label.text = str(e)
+            return False
+        return True
+
+    def _apply_filter(self, *args):
+        # Filtreyi gösterilen konteynere uygula; burada eşleşme yoksa ileri doğru ara
+        if not self._parse_filter() or self.block is None:
+            return
+        if self.row_filter and not self.row_filter.select(self.block):
+            self._find(1)
+        else:
+            self.show_block(self.block.index)
+
+    def _find(self, direction):
+        # Filtreye uyan satırı içeren bir sonraki konteyneri arka planda ara
+        if self.block is None:
+            return
+        if not self._parse_filter() or not self.row_filter:
+            return
+        self._cancel_search()
+        cancel = self._search = threading.Event()
+        start = self.block.index + direction
+        row_filter = self.row_filter
+        self.status_label.text = "Aranıyor..."
+
+        def run():
+            try:
+                found = self.index.find(row_filter, start, direction, cancel)
+            except Exception as e:
+                Clock.schedule_once(lambda dt, err=e: setattr(self.status_label, "text", f"Hata: {err}"))
+                return
+            if not cancel.is_set():
+                Clock.schedule_once(lambda dt: self._search_done(found))
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def _search_done(self, found):
+        self._search = None
+        if found is None:
+            self.status_label.text = "Eşleşme bulunamadı."
+            return
+        i, matches = found
+        self.show_block(i, matches=matches)
+
+    def _cancel_search(self):
+        if self._search is not None:
+            self._search.set()
+            self._search = None
+
+    def close(self):
+        self._cancel_search()
+        self.index.close()
+        if self.close_callback:
+            self.close_callback()
+
+
+def open_log_viewer(path):
+    # Görüntüleyiciyi tam ekran bir pencerede aç; dosya açılamazsa hata yükseltir
+    view = ModalView(size_hint=(1, 1), auto_dismiss=False)
+    view.add_widget(LogViewer(path, close_callback=view.dismiss, md_bg_color=(1, 1, 1, 1)))
+    view.open()
+    return view
@@ -0,0 +1,133 @@
+# components/trend_chart.py
+
+from collections import deque  # Piksel sütunu başına min/max dilimleri
+
+from kivy.clock import Clock  # Kare başına tek çizim için tetikleyici
+from kivy.graphics import Color, Line, PopMatrix, PushMatrix, Scale, Translate  # Kivy çizim talimatları
+from kivy.uix.stencilview import StencilView  # Pencere dışına taşan çizgileri kırpmak için
+
+
+class TrendChart(StencilView):
+    """
+    Kayan (scrolling) trend grafiği.
+    Zaman ekseni piksel sütunlarına bölünür; her sütunda yalnızca min ve max
+    tutulur (min/max-per-pixel seyreltme). Böylece çizim maliyeti örnek sayısına
+    değil ekran genişliğine bağlıdır. Yeni örnek son sütunu günceller ya da yeni
+    sütun ekler; kaydırma, noktalar yeniden hesaplanmadan Translate/Scale
+    dönüşümleriyle yapılır.
+
+    window: grafikte görünen süre (saniye)
+    reload_callback: genişlik değişip sütunlar geçersiz kaldığında çağrılır
+    """
+
+    def __init__(self, window=300.0, color=(0.2, 0.5, 0.9, 1), reload_callback=None, **kwargs):
+        super().__init__(**kwargs)
+        self.window = window
+        self.reload_callback = reload_callback
+        self._buckets = deque()  # [sütun indeksi, min, max]
+        self._pts = []  # Çizgi noktaları: her sütun için (x, min), (x, max)
+        self._origin = None  # İlk sütunun mutlak indeksi (x koordinatları buna göre küçük tutulur)
+        self._ymin = self._ymax = None
+        self._columns = 0
+        with self.canvas:
+            Color(*color)
+            PushMatrix()
+            self._translate = Translate()
+            self._scale = Scale()
+            self._line = Line(points=[])
+            PopMatrix()
+        self._redraw_trigger = Clock.create_trigger(self._redraw)
+        self.bind(pos=self._redraw_trigger, size=self._on_size)
+
+    @property
+    def columns(self):
+        # Görünen sütun (piksel) sayısı
+        return max(int(self.width), 1)
+
+    @property
+    def bucket_seconds(self):
+        return self.window / self.columns
+
+    def _on_size(self, *args):
+        # Genişlik değiştiyse sütun süresi de değişir: grafiği sıfırla ve yeniden yükle
+        if self.columns != self._columns:
+            self._columns = self.columns
+            self.reset()
+            if self.reload_callback:
+                self.reload_callback()
+        self._redraw_trigger()
+
+    def reset(self):
+        self._buckets.clear()
+        self._pts = []
+        self._origin = None
+        self._ymin = self._ymax = None
+        self._redraw_trigger()
+
+    def load(self, samples):
+        """
+        Geçmişi yükle: TimeSeriesStore.downsample(..., mode="minmax") çıktısı
+        [(zaman, min, max), ...]
+        """
+        self.reset()
+        for t, lo, hi in samples:
+            self.append(t, lo)
+            self.append(t, hi)
+
+    def append(self, t, v):
+        # Yeni örneği ekle (zaman sırasıyla gelmelidir)
+        b = int(t / self.bucket_seconds)
+        buckets = self._buckets
+        if buckets and buckets[-1][0] == b:
+            # Aynı piksel sütunu: yalnızca min/max güncellenir
+            last = buckets[-1]
+            if v < last[1]:
+                last[1] = v
+                self._pts[-3] = v
+            elif v > last[2]:
+                last[2] = v
+                self._pts[-1] = v
+        elif buckets and b < buckets[-1][0]:
+            return  # Sıra dışı örnek
+        else:
+            if self._origin is None:
+                self._origin = b
+            buckets.append([b, v, v])
+            x = b - self._origin
+            self._pts.extend((x, v, x, v))
+            if len(buckets) > 2 * self.columns:
+                self._trim()
+        if self._ymin is None or v < self._ymin:
+            self._ymin = v
+        if self._ymax is None or v > self._ymax:
+            self._ymax = v
+        self._redraw_trigger()
+
+    def _trim(self):
+        # Görünmeyen eski sütunları at (amortize O(1)); y aralığını yeniden hesapla
+        while len(self._buckets) > self.columns:
+            self._buckets.popleft()
+        self._origin = self._buckets[0][0]
+        self._pts = []
+        for b, lo, hi in self._buckets:
+            x = b - self._origin
+            self._pts.extend((x, lo, x, hi))
+        self._ymin = min(lo for _, lo, _ in self._buckets)
+        self._ymax = max(hi for _, _, hi in self._buckets)
+
+    def _redraw(self, *args):
+        # Noktaları değiştirmeden yalnızca dönüşümü güncelle ve çizgiyi ata
+        self._line.points = self._pts
+        if not self._buckets:
+            return
+        first = self._buckets[-1][0] - self.columns + 1 - self._origin
+        sx = self.width / self.columns
+        ymin, ymax = self._ymin, self._ymax
+        pad = (ymax - ymin) * 0.05 or 1.0
+        ymin -= pad
+        ymax += pad
+        sy = self.height / (ymax - ymin)
+        self._scale.x = sx
+        self._scale.y = sy
+        self._translate.x = self.x - first * sx
+        self._translate.y = self.y - ymin * sy
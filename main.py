@@ -1,9 +1,12 @@
 # main.py
 
-import threading  # subprocessler için
-import asyncio  # asenkron işlemler için
+from utils.startup import START  # Açılış süresi ölçümü (ilk import olmalı)
 
+import logging  # can2go.* loglarının seviyesi
+import os  # Ortam değişkenleri (log seviyesi, debug katmanı)
 
+
+from kivy.clock import Clock  # Kare başına toplu veri dağıtımı için
 from kivy.core.window import Window
 from kivy.metrics import dp  # DPI
 from kivy.uix.image import Image  # logo için
@@ -11,16 +14,17 @@ from kivy.uix.floatlayout import FloatLayout  #şuan yok ama güncellemeler içi
 
 from kivymd.app import MDApp  # Material Design
 from kivymd.uix.screenmanager import MDScreenManager  # Ekranlar arası geçiş
-from kivymd.uix.tab import MDTabs  # Sekme menüsü
 from kivymd.uix.screen import MDScreen  # Temel ekranlar
 
-from screens.dashboard import DashboardScreen  # Dashboard
-from screens.errors import ErrorScreen       # Error
-from screens.logs import LogsScreen        # Logs
-from screens.login import LoginScreen      # Login
-from screens.settings import SettingsScreen  # Settings
+from screens.login import LoginScreen      # Login (ilk ekran; diğer ekranlar sekmeler kurulurken yüklenir)
+
+from utils.instrumentation import STATS  # Veri hattı ölçümleri
+
+# CAN2GO_LOG_LEVEL=DEBUG ile örneklenmiş paket logları açılır (varsayılan WARNING)
+logging.basicConfig(format="%(asctime)s %(name)s %(levelname)s %(message)s")
+logging.getLogger("can2go").setLevel(os.environ.get("CAN2GO_LOG_LEVEL", "WARNING").upper())
 
-from utils.bluetooth_manager import BluetoothManager  # BLE işlemleri için
+START.mark("imports")
 
 
 class MainApp(MDApp):
@@ -32,9 +36,7 @@ class MainApp(MDApp):
         Window.set_icon(self.icon)  # Pencere logosunu ayarlama
 
         # BLE kullanımı için gerekli alanlar
-        self.esp32_address = None  # ESP32 adresi
         self.char_uuid = "abcd1234-5678-90ab-cdef-1234567890ab"  # BLE UUID
-        self.bt_manager = BluetoothManager()  # BLE manager
         self.screen_manager = MDScreenManager()  # Ekran manager
 
         # 1️⃣ Login ekranını oluştur ve yöneticine ekle
@@ -42,17 +44,57 @@ class MainApp(MDApp):
         self.login_screen.name = "login"
         self.screen_manager.add_widget(self.login_screen)
 
-        # 2️⃣ Ana sekmeli ekranı hazırla ve ekle
-        self.tabs_screen = self.build_main_tabs()
-        self.tabs_screen.name = "main_tabs"
-        self.screen_manager.add_widget(self.tabs_screen)
+        # 2️⃣ Ana sekmeli ekran, login ekranı göründükten sonra kare kare hazırlanır
+        # (kullanıcı şifresini yazarken); giriş daha önce yapılırsa hemen tamamlanır
+        self.tabs_screen = None
+        self.debug_overlay = None
+        self._tab_steps = None
 
         # Önce login ekranını göster
         self.screen_manager.current = "login"
+        START.mark("build")
         return self.screen_manager
 
+    def on_start(self):
+        # İlk kare çizildikten sonra çalışır: açılışı ölç, sekmeleri hazırlamaya başla
+        Clock.schedule_once(self._after_first_frame, 0)
+
+    def _after_first_frame(self, dt):
+        START.mark("first_frame")
+        if self.tabs_screen is None and self._tab_steps is None:
+            self._tab_steps = self._main_tabs_steps()
+            Clock.schedule_once(self._build_next_step, 0)
+
+    def _build_next_step(self, dt):
+        # Her karede tek adım: arayüz takılmadan arka planda hazırlık
+        if self._tab_steps is None:
+            return
+        try:
+            next(self._tab_steps)
+        except StopIteration:
+            self._tab_steps = None
+            return
+        Clock.schedule_once(self._build_next_step, 0)
+
     def build_main_tabs(self):
+        # Sekmeli ekranı (hazır değilse) kalan adımlarıyla hemen kur ve döndür
+        if self.tabs_screen is None and self._tab_steps is None:
+            self._tab_steps = self._main_tabs_steps()
+        if self._tab_steps is not None:
+            for _ in self._tab_steps:
+                pass
+            self._tab_steps = None
+        return self.tabs_screen
+
+    def _main_tabs_steps(self):
+        # Ana sekmeli ekranı adım adım kurar; her yield bir kareye denk gelir.
+        # Ekran modülleri (ve bleak, plyer gibi bağımlılıkları) burada yüklenir.
+        from kivymd.uix.tab import MDTabs  # Sekme menüsü
+        from utils.ingest import FrameIngestor, LATEST_PER_BCU, DROP_OLDEST  # BLE paketlerini kare başına toplamak için
+        from utils.timeseries import TimeSeriesStore  # BCU/metrik zaman serileri (ortak veri kaynağı)
+
         tabs_screen = MDScreen()  # Sekme ekranı konteyneri
+        tabs_screen.name = "main_tabs"
 
         # ◆ MDTabs yapılandırması: Tam ekran sekmeler
         self.tabs = MDTabs(
@@ -63,13 +105,25 @@ class MainApp(MDApp):
             pos_hint={"x": 0, "y": 0},
         )
 
+        # Tüm ekranların okuduğu ortak zaman serisi deposu
+        self.store = TimeSeriesStore()
+        yield
+
         # Sekme içeriklerini örnekle
-        self.dashboard = DashboardScreen(); self.dashboard.title = "Dashboard"
+        from screens.dashboard import DashboardScreen  # Dashboard
+        self.dashboard = DashboardScreen(store=self.store); self.dashboard.title = "Dashboard"
+        yield
+        from screens.errors import ErrorScreen       # Error
         self.errors    = ErrorScreen();    self.errors.title    = "Errors"
+        yield
+        from screens.logs import LogsScreen        # Logs
         self.logs      = LogsScreen();     self.logs.title      = "Logs"
+        yield
         # Ayarlar sekmesi, BLE bağlantı callback'i ile
+        from screens.settings import SettingsScreen  # Settings
         self.settings  = SettingsScreen(connect_callback=self.on_bluetooth_connect)
         self.settings.title = "Settings"
+        yield
 
         # Tüm sekmeleri MDTabs'e ekle
         for screen in (self.dashboard, self.errors, self.logs, self.settings):
@@ -77,6 +131,41 @@ class MainApp(MDApp):
 
         tabs_screen.add_widget(self.tabs)  # Sekmeleri ekrana yerleştir
 
+        # BLE paketleri halka tampona yazılır, her UI karesinde bir kez toplu dağıtılır.
+        # Tampon BLE thread'ini hiç bekletmez: UI kaynak başına 4096 paket geride kalırsa
+        # en eskiler düşer ve "ingest.dropped" ile sayılır (her paket yalnızca log kaydında garantili)
+        self.ingestor = FrameIngestor()
+        self.ingestor.wakeup = Clock.create_trigger(self.ingestor.drain)
+        # Depo ilk tüketicidir: ekranlar güncel veriyi ondan okur. Depo, alarmlar ve hata
+        # sayımı tamponun teslim ettiği her paketi alır; ekranlar yalnızca güncel durumu işler
+        self.ingestor.add_consumer(self.store)
+        self.ingestor.add_consumer(self.dashboard, LATEST_PER_BCU)
+        self.ingestor.add_consumer(self.errors)
+        self.ingestor.add_consumer(self.logs, DROP_OLDEST, limit=1)  # Aralıklı kayıt yalnızca son paketi kullanır
+        # Eşik / histerezis / değişim hızı alarmları (assets/alarms.json) aynı çözülmüş kareyi kullanır
+        from utils.alarms import AlarmEngine  # Derlenmiş alarm kuralları
+        try:
+            self.alarms = AlarmEngine()
+        except (OSError, ValueError) as e:
+            logging.getLogger("can2go.alarms").error("Alarm kuralları yüklenemedi: %s", e)
+            self.alarms = AlarmEngine(rules=[])
+        self.alarms.add_listener(self.errors.add_alarm)
+        self.alarms.add_listener(self.on_alarm)
+        self.ingestor.add_consumer(self.alarms)
+        STATS.gauge("capture.dropped", lambda: self.logs.capture.dropped if self.logs.capture else 0)
+
+        # Bağlı ESP32'ler (her biri kopmada otomatik yeniden bağlanır); paketler
+        # cihazın kaynak indeksiyle etiketlenip tek veri hattında birleşir
+        from utils.device_hub import DeviceHub  # Birden fazla ESP32'ye tek loop üzerinden bağlantı
+        self.devices = DeviceHub(
+            self.char_uuid,
+            self.dispatch_frame,
+            dispatch_frames=self.dispatch_frames,
+            gap_callback=lambda address, start, end: self.logs.mark_gap(start, end, address),
+            status_callback=lambda address, connected: Clock.schedule_once(
+                lambda dt: self.settings.show_link_status(address, connected)),
+        )
+
         # ◇ Sol-alt köşeye yarı şeffaf logo ekle
         logo = Image(
             source=self.icon,
@@ -87,53 +176,72 @@ class MainApp(MDApp):
         )
         tabs_screen.add_widget(logo)
 
-        return tabs_screen
+        # Geliştirici ölçüm katmanı (CAN2GO_DEBUG_OVERLAY=1 ile açık başlar)
+        self.tabs_screen_root = tabs_screen
+        if os.environ.get("CAN2GO_DEBUG_OVERLAY") == "1":
+            self.toggle_debug_overlay(tabs_screen)
+
+        self.screen_manager.add_widget(tabs_screen)
+        self.tabs_screen = tabs_screen
+        START.mark("main_tabs")
+        # Açılış süreleri log'a yazılır ve STATS.snapshot() içinde de okunabilir
+        for name, ms in START.report().items():
+            STATS.gauge(f"startup.{name}_ms", lambda ms=ms: ms)
+
+    def toggle_debug_overlay(self, parent=None):
+        # Ölçüm katmanını aç/kapat; kapalıyken yenileme zamanlayıcısı da durur
+        parent = parent or self.tabs_screen_root
+        if self.debug_overlay is None:
+            from components.debug_overlay import DebugOverlay  # Yalnızca gerektiğinde yüklenir
+            self.debug_overlay = DebugOverlay()
+            parent.add_widget(self.debug_overlay)
+            self.debug_overlay.start()
+        else:
+            self.debug_overlay.stop()
+            parent.remove_widget(self.debug_overlay)
+            self.debug_overlay = None
 
     def show_main_tabs(self):
-        # Login sonrası ana sekmeli ekrana geçiş
+        # Login sonrası ana sekmeli ekrana geçiş (hazırlık bitmediyse önce tamamlanır)
+        self.build_main_tabs()
         self.screen_manager.current = "main_tabs"
 
-    def on_bluetooth_connect(self, address: str):
-        # BLE adresi atama
-        self.esp32_address = address
-
-        # Gelen verileri tüm ekranlara ileten dispatch fonksiyonu
-        def dispatch(data: bytes):
-            self.dashboard.on_new_data(data)
-            self.errors.on_new_data(data)
-            self.logs.on_new_data(data)
-
-        # BLE dinleme işlemini arka planda çalışan bir thread'e taşı
-        def ble_thread():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-            async def runner():
-                # Belirlenen adrese bağlan ve dinleme başlat
-                await self.bt_manager.connect_and_listen_fixed_address(
-                    self.esp32_address,
-                    self.char_uuid,
-                    dispatch
-                )
-
-            loop.run_until_complete(runner())  # Bağlan ve dinleme
-            try:
-                loop.run_forever()  # Sürekli dinle
-            finally:
-                # Uygulama kapanırken bağlantıyı kes
-                loop.run_until_complete(self.bt_manager.disconnect())
-                loop.close()
+    def dispatch_frame(self, data: bytes, source: int = 0):
+        # BLE thread'inde çağrılır: veriyi yalnızca tampona ekle; ekranlara dağıtım
+        # UI thread'inde kare başına bir kez (on_new_batch) yapılır. Kayıpsız log
+        # kaydı ise paketi doğrudan BLE thread'inde kendi tamponuna yazar.
+        self.logs.capture_frame(data, source)
+        self.ingestor.push(data, source)
+
+    def dispatch_frames(self, frames, ids, source: int = 0):
+        # Çok çerçeveli bildirim: açılan çerçeveler tampona bildirim başına tek seferde eklenir
+        self.logs.capture_frames(frames, ids, source)
+        self.ingestor.push_many(frames, ids, source)
+
+    def on_alarm(self, event):
+        # Alarm kalkması ve temizlenmesi aktif kayda işaret olarak yazılır
+        state = "ALARM" if event.raised else "Alarm temizlendi"
+        level = f" [{event.rule.level}]" if event.raised else ""
+        where = f"K{event.source + 1} BCU {event.bcu}"
+        self.logs.mark_event(event.timestamp, f"{state}{level} {where} — {event.rule.describe(event.value)}")
 
-        # Thread'i başlat (daemon=True, ana thread kapanınca duracak)
-        threading.Thread(target=ble_thread, daemon=True).start()
+    def on_bluetooth_connect(self, address: str):
+        # Seçilen cihazı bağlı cihazlara ekle; zaten bağlıysa bağlantısını kes.
+        # Tüm bağlantılar ortak BLE loop'unda kurulur, bildirimler de aynı thread'de gelir.
+        if address in self.devices.links:
+            self.devices.disconnect(address)
+        else:
+            self.devices.connect(address)
 
     def on_stop(self):
-        # Uygulama kapanırken BLE bağlantısını temizle
-        if getattr(self.bt_manager, "connected", False):
+        # Uygulama kapanırken BLE bağlantılarını, istemcilerin ait olduğu loop'ta temizle
+        devices = getattr(self, "devices", None)
+        if devices is not None:
             try:
-                asyncio.run(self.bt_manager.disconnect())
+                devices.disconnect_all().result(timeout=3)
             except Exception as e:
-                print(f"[on_stop ERROR] {e}")
+                logging.getLogger("can2go").warning("[on_stop ERROR] %s", e)
+            devices.worker.stop()
         return super().on_stop()
 
 
@@ -9,37 +9,66 @@ from kivymd.uix.menu import MDDropdownMenu  # Açılır menü
 from kivymd.uix.scrollview import MDScrollView  # Kaydırılabilir alan
 from kivy.clock import Clock  # Zamanlanmış görevler
 from kivy.metrics import dp  # DPI bağımsız ölçümler
-from utils.parser import parse_metrics  # Ham veriyi metriklere çevirme
+from utils.aggregates import MetricAggregator  # Total görünümü için artımlı toplamlar
+from utils.ingest import FrameIngestor, LATEST_PER_BCU  # Tekil paketler için sınırlı devir tamponu
+from utils.timeseries import TimeSeriesStore  # BCU/metrik bazında ortak zaman serisi deposu
+from components.trend_chart import TrendChart  # Kayan trend grafikleri
 from datetime import datetime  # (Gerekirse zaman damgası için)
+import time  # Trend grafikleri için monotonic zaman
+
+BCU_COUNT = 16  # İzlenen BCU sayısı
+TOTAL_BCU = 0  # Depoda Total (ortalama) serisinin tutulduğu anahtar
+HANDOFF_CAPACITY = 256  # on_new_data tamponu (paket)
 
 class DashboardScreen(MDBoxLayout, MDTabsBase):
-    def __init__(self, **kwargs):
+    def __init__(self, store=None, **kwargs):
         super().__init__(**kwargs)
         # Dikey düzen, iç boşluklar ve aralıklar
         self.orientation = 'vertical'
         self.padding = dp(10)
         self.spacing = dp(10)
 
-        # Data yapıları: her BCU ve toplam için metrikler
-        self.metrics = {f"BCU {i}": {"soc": 0, "soh": 0, "voltage": 0, "temperature": 0} for i in range(1,17)}
-        self.metrics["Total"] = {"soc": 0, "soh": 0, "voltage": 0, "temperature": 0}
+        # Data yapıları: BCU metrikleri ortak zaman serisi deposundan okunur.
+        # Depo dışarıdan verilmediyse ekran kendi deposunu oluşturur ve besler.
+        self.store = store if store is not None else TimeSeriesStore()
+        self._feeds_store = store is None
+        # Kaynak (cihaz) başına çalışan toplamlar, min/max BCU: farklı ağ geçitlerindeki
+        # aynı numaralı BCU'lar ayrı paketlerdir ve birbirinin toplamına karışmaz
+        self.aggregators = {}
         self.selected = "Total"  # Başlangıç seçimi
+        self.selected_source = 0  # Gösterilen cihazın kaynak indeksi
+        # on_new_data ile gelen tekil paketler sınırlı tampondan kare başına bir kez,
+        # BCU başına en son değerle işlenir (UI geride kalırsa bellek ve gecikme büyümez)
+        self._handoff = FrameIngestor(capacity=HANDOFF_CAPACITY, name="ingest.dashboard")
+        self._handoff.add_consumer(self, LATEST_PER_BCU)
+        self._handoff.wakeup = Clock.create_trigger(self._handoff.drain)
 
-        # Dropdown menü için öğeler
-        items = [
+        # Dropdown menü için öğeler (menü ilk açılışta oluşturulur)
+        self._menu_items = [
             {"text": name, "viewclass": "OneLineListItem", "on_release": lambda x=name: self._set_selection(x)}
-            for name in ["Total"] + [f"BCU {i}" for i in range(1,17)]
+            for name in ["Total"] + [f"BCU {i}" for i in range(1,BCU_COUNT+1)]
         ]
         # Seçim butonu
         self.dd_btn = MDRaisedButton(
             text="Total",
             size_hint=(None,None),
             size=(dp(120), dp(40)),
-            pos_hint={"center_x":0.5},
             on_release=self._open_menu
         )
-        self.menu = MDDropdownMenu(caller=self.dd_btn, items=items, width_mult=4)
-        self.add_widget(self.dd_btn)
+        self.menu = None
+        # Cihaz seçim butonu (menü açılırken veri gelmiş cihazlardan oluşturulur)
+        self.src_btn = MDRaisedButton(
+            text=_source_name(0),
+            size_hint=(None,None),
+            size=(dp(120), dp(40)),
+            on_release=self._open_source_menu
+        )
+        self.source_menu = None
+        selectors = MDBoxLayout(size_hint=(None,None), height=dp(40), spacing=dp(10),
+                                adaptive_width=True, pos_hint={"center_x":0.5})
+        selectors.add_widget(self.src_btn)
+        selectors.add_widget(self.dd_btn)
+        self.add_widget(selectors)
 
         # Kaydırılabilir konteyner
         scroll = MDScrollView()
@@ -50,6 +79,9 @@ class DashboardScreen(MDBoxLayout, MDTabsBase):
 
         # Kartları oluştur ve sakla
         self.cards = {}
+        self.charts = {}  # Metrik başına trend grafiği
+        self._chart_since = None  # Grafiklere eklenmiş son örneğin zamanı
+        self._shown = {}  # Etiketlerde şu an gösterilen metinler (gereksiz yazımı önlemek için)
         self._build_cards()
 
     def _build_cards(self):
@@ -71,48 +103,145 @@ class DashboardScreen(MDBoxLayout, MDTabsBase):
             value_lbl = MDLabel(text="0", font_style="H6", theme_text_color="Primary")
             box.add_widget(value_lbl)
             card.add_widget(box)
+            # Trend grafiği: seçili BCU'nun (veya Total'in) son 5 dakikası
+            chart = TrendChart(reload_callback=self._load_charts)
+            card.add_widget(chart)
             self.container.add_widget(card)
-            # Label referansını sakla
+            # Label ve grafik referanslarını sakla
             self.cards[key] = value_lbl
+            self.charts[key] = chart
+
+        # Total görünümünde ek toplamlar: min/max BCU, fark ve en zayıf paket
+        self.summary_lbl = MDLabel(text="", font_style="Body2", theme_text_color="Secondary",
+                                   size_hint_y=None, height=dp(90))
+        self.container.add_widget(self.summary_lbl)
 
     def _open_menu(self, *args):
         # Dropdown menüyü aç
+        if self.menu is None:
+            self.menu = MDDropdownMenu(caller=self.dd_btn, items=self._menu_items, width_mult=4)
         self.menu.open()
 
+    def _open_source_menu(self, *args):
+        # Veri gelmiş cihazların menüsü (her açılışta güncel listeyle)
+        sources = sorted(self.store.sources | {self.selected_source})
+        items = [
+            {"text": _source_name(src), "viewclass": "OneLineListItem",
+             "on_release": lambda x=src: self._set_source(x)}
+            for src in sources
+        ]
+        if self.source_menu is None:
+            self.source_menu = MDDropdownMenu(caller=self.src_btn, items=items, width_mult=4)
+        else:
+            self.source_menu.items = items
+        self.source_menu.open()
+
+    def _set_source(self, source):
+        # Gösterilen cihazı değiştir; kartlar, grafikler ve toplamlar o cihazın verisine geçer
+        self.selected_source = source
+        self.src_btn.text = _source_name(source)
+        self.source_menu.dismiss()
+        self._load_charts()
+        self._refresh_display()
+
+    def _aggregator(self, source):
+        agg = self.aggregators.get(source)
+        if agg is None:
+            agg = self.aggregators[source] = MetricAggregator(bcu_count=BCU_COUNT)
+        return agg
+
     def _set_selection(self, name):
         # Yeni seçimi uygula ve ekranda güncelle
         self.selected = name
         self.dd_btn.text = name
         self.menu.dismiss()
+        self._load_charts()
         self._refresh_display()
 
     def on_new_data(self, data: bytes):
-        # Gelen verileri işlemek için zamanla planla
-        Clock.schedule_once(lambda dt: self._process_data(data))
-
-    def _process_data(self, data: bytes):
-        # Ham veriyi ayrıştır
-        parsed = parse_metrics(data)
-        # Hangi BCU olduğunu belirle (örnek: ilk byte ile)
-        bcu = f"BCU {(data[0] % 16) + 1}"
-        # BCU metriklerini güncelle
-        self.metrics[bcu] = parsed
-        # Total için ortalamaları hesapla
-        total = {"soc":0,"soh":0,"voltage":0,"temperature":0}
-        for i in range(1,17):
-            m = self.metrics[f"BCU {i}"]
-            for k in total:
-                total[k] += m[k]
-        for k in total:
-            total[k] /= 16
-        self.metrics["Total"] = total
-        # Ekranı yenile
+        # Tekil paket (BLE thread'i): sınırlı tampona ekle, UI karesinde toplu işlenir
+        self._handoff.push(data)
+
+    def on_new_batch(self, frames):
+        # Karedeki paketler bir kez çözülür (FrameBatch önbelleği) ve depoya yazılır
+        if self._feeds_store:
+            self.store.on_new_batch(frames)
+        # Yalnızca değişen (kaynak, BCU) çiftleri için toplamları O(1) güncelle
+        cols = frames.metrics
+        sources = getattr(frames, "sources", None)
+        updated = {(sources[src] if sources else 0, bcu) for bcu, src in zip(cols["bcu"], cols["index"])}
+        for source, bcu in updated:
+            self._aggregator(source).update(bcu, self.store.latest(bcu, source))
+        # Total geçmişi de depoda (cihaz başına) tutulur (grafik ve seçim değişimi için)
+        if updated:
+            t = frames.timestamps[-1] / 1e9 if getattr(frames, "timestamps", None) else time.monotonic()
+            for source in {source for source, _ in updated}:
+                for k, v in self._aggregator(source).totals().items():
+                    self.store.series(TOTAL_BCU, k, source).append(t, v)
+        # Ekranı ve grafikleri kare başına bir kez güncelle
         self._refresh_display()
+        self._update_charts()
+
+    def _selected_bcu(self):
+        return TOTAL_BCU if self.selected == "Total" else int(self.selected.split()[1])
+
+    def _load_charts(self):
+        # Seçim veya genişlik değişince görünen pencereyi depodan min/max seyreltilmiş olarak yükle
+        bcu, source = self._selected_bcu(), self.selected_source
+        now = time.monotonic()
+        for k, chart in self.charts.items():
+            chart.load(self.store.downsample(bcu, k, now - chart.window, now, chart.columns, source=source))
+        self._chart_since = now
+
+    def _update_charts(self):
+        # Yalnızca son çizimden sonra gelen örnekleri grafiklere ekle
+        bcu, source = self._selected_bcu(), self.selected_source
+        last = None
+        for k, chart in self.charts.items():
+            times, values = self.store.range(bcu, k, self._chart_since, None, source)
+            for t, v in zip(times, values):
+                chart.append(t, v)
+            if times:
+                last = times[-1]
+        if last is not None:
+            self._chart_since = last + 1e-9
+
+    def _current(self):
+        # Seçili görünümün metrikleri: Total için ortalamalar, BCU için depodaki son değerler
+        if self.selected == "Total":
+            return self._aggregator(self.selected_source).totals()
+        return self.store.latest(self._selected_bcu(), self.selected_source)
+
+    def _set_text(self, key, label, text):
+        # Biçimlenmiş değer değişmediyse etiketi yeniden yazma
+        if self._shown.get(key) != text:
+            self._shown[key] = text
+            label.text = text
 
     def _refresh_display(self):
-        # Seçili metrikleri kartlara yaz
-        m = self.metrics[self.selected]
-        self.cards["soc"].text = f"{m['soc']}%"
-        self.cards["soh"].text = f"{m['soh']}%"
-        self.cards["voltage"].text = f"{m['voltage']:.2f} V"
-        self.cards["temperature"].text = f"{m['temperature']}°C"
\ No newline at end of file
+        # Seçili metrikleri kartlara yaz (ortalamalar ondalıklı gösterilir)
+        m = self._current()
+        pct = "{:.1f}%" if self.selected == "Total" else "{:.0f}%"
+        deg = "{:.1f}°C" if self.selected == "Total" else "{:.0f}°C"
+        self._set_text("soc", self.cards["soc"], pct.format(m['soc']))
+        self._set_text("soh", self.cards["soh"], pct.format(m['soh']))
+        self._set_text("voltage", self.cards["voltage"], f"{m['voltage']:.2f} V")
+        self._set_text("temperature", self.cards["temperature"], deg.format(m['temperature']))
+        self._set_text("summary", self.summary_lbl, self._summary_text())
+
+    def _summary_text(self):
+        # Yalnızca Total seçiliyken ek toplamları göster
+        if self.selected != "Total":
+            return ""
+        agg = self._aggregator(self.selected_source)
+        lo_bcu, lo_v = agg.minimum("voltage")
+        hi_bcu, hi_v = agg.maximum("voltage")
+        weak_bcu, weak_soh = agg.weakest()
+        return (f"Min: BCU {lo_bcu} ({lo_v:.2f} V)    Max: BCU {hi_bcu} ({hi_v:.2f} V)\n"
+                f"Fark: {agg.spread('voltage'):.2f} V    Sıcaklık farkı: {agg.spread('temperature'):.0f}°C\n"
+                f"En zayıf paket: BCU {weak_bcu} (SOH {weak_soh:.0f}%)")
+
+
+def _source_name(source):
+    # Kayıt dosyalarındaki "K1", "K2" ... ile aynı numaralama
+    return f"Cihaz {source + 1}"
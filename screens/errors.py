@@ -2,28 +2,58 @@
 
 from kivy.metrics import dp  # DPI bağımsız ölçümler için
 from kivy.clock import Clock  # UI thread'e görev planlamak için
+from kivy.factory import Factory  # Satır tipinin veri içinden seçilebilmesi için
 from kivymd.uix.boxlayout import MDBoxLayout  # Material kutu düzeni
 from kivymd.uix.tab import MDTabsBase  # Sekme temel sınıfı
-from kivymd.uix.scrollview import MDScrollView  # Kaydırılabilir liste
-from kivymd.uix.list import MDList, TwoLineAvatarListItem, IconLeftWidget  # Hata listesi bileşenleri
+from kivy.uix.recycleboxlayout import RecycleBoxLayout  # RecycleView satır düzeni
+from kivymd.uix.recycleview import MDRecycleView  # Yalnızca görünen satırları oluşturan liste
+from kivymd.uix.list import TwoLineAvatarListItem, IconLeftWidget  # Hata listesi bileşenleri
 from kivymd.uix.menu import MDDropdownMenu  # Açılır menü
 from kivymd.uix.button import MDRaisedButton  # Yükseltilmiş buton
 from kivymd.uix.label import MDLabel  # Metin göstermek için
-from utils.parser import parse_error  # Gelen veriyi hata mesajı ve koda dönüştürmek için
+from utils.parser import parse_error_batch, error_message  # Gelen veriyi hata mesajı ve koda dönüştürmek için
+from utils.error_index import ErrorIndex, OCCURRENCE_CAP, ERROR  # (kaynak, BCU, hata, kod) başına toplanmış hatalar
+from utils.ingest import FrameIngestor  # Tekil paketler için sınırlı devir tamponu
 from datetime import datetime  # Zaman damgası oluşturmak için
 import random  # Demo amacıyla rastgele BCU seçmek için (gerçek veride kaldırılabilir)
+import time  # Oluşum zamanı (epoch)
 
-class ErrorScreen(MDBoxLayout, MDTabsBase):
+REFRESH_INTERVAL = 0.5  # Hata fırtınasında listenin yeniden kurulma aralığı (saniye)
+HANDOFF_CAPACITY = 1024  # on_new_data tamponu (paket)
+
+
+class ErrorListItem(TwoLineAvatarListItem):
+    # RecycleView satırı: ikon bir kez eklenir, satır yeniden kullanılırken yalnızca metinler değişir
     def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._no_ripple_effect = True
+        self.add_widget(IconLeftWidget(icon="alert-circle", theme_text_color="Error"))
+
+
+Factory.register("ErrorListItem", cls=ErrorListItem)
+
+
+class ErrorScreen(MDBoxLayout, MDTabsBase):
+    def __init__(self, history_cap=OCCURRENCE_CAP, **kwargs):
         super().__init__(**kwargs)
         # Dikey düzen, kenar boşlukları ve aralıklar
         self.orientation = 'vertical'
         self.padding = dp(10)
         self.spacing = dp(10)
 
-        # Her BCU için hata listesini başlat
-        self.bcu_errors = {f"BCU {i}": [] for i in range(1, 17)}
+        # Tekrarlayan hatalar (BCU, hata, kod) başına tek kayıtta toplanır;
+        # history_cap: kayıt başına saklanan son ham oluşum sayısı (satır açıldığında gösterilir)
+        self.history_cap = history_cap
+        self.index = ErrorIndex(occurrence_cap=history_cap)
+        self.expanded = set()  # Ham oluşumları gösterilen kayıtlar
+        self._refresh_event = None
         self.selected_bcu = "BCU 1"  # Varsayılan seçili BCU
+        # on_new_data ile gelen tekil paketler sınırlı tampondan kare başına bir kez işlenir;
+        # BLE thread'i hiç bekletilmez: tampon dolarsa en eski paketler düşer ve
+        # "ingest.errors.dropped" ile sayılır
+        self._handoff = FrameIngestor(capacity=HANDOFF_CAPACITY, name="ingest.errors")
+        self._handoff.add_consumer(self)
+        self._handoff.wakeup = Clock.create_trigger(self._handoff.drain)
 
         # BCU seçmek için açılır menüyü tetikleyen buton
         self.dropdown_button = MDRaisedButton(
@@ -33,25 +63,37 @@ class ErrorScreen(MDBoxLayout, MDTabsBase):
             pos_hint={"center_x": 0.5},
             on_release=self.open_menu
         )
-        # Menü öğelerini oluştur
-        menu_items = [
+        # Menü öğelerini oluştur (menü ilk açılışta oluşturulur)
+        self._menu_items = [
             {
                 "text": f"BCU {i}",
                 "viewclass": "OneLineListItem",
                 "on_release": lambda x=f"BCU {i}": self.set_bcu(x)
             } for i in range(1, 17)
         ]
-        self.menu = MDDropdownMenu(caller=self.dropdown_button, items=menu_items, width_mult=4)
+        self.menu = None
         self.add_widget(self.dropdown_button)
 
-        # Hata mesajlarını göstermek için kaydırılabilir liste
-        scroll = MDScrollView()
-        self.error_list = MDList(spacing=dp(4), padding=[0,0,0,dp(10)])
-        scroll.add_widget(self.error_list)
-        self.add_widget(scroll)
+        # Hata mesajları için sanal liste: yalnızca görünen satırlar widget olarak oluşturulur
+        self.error_list = MDRecycleView()
+        self.error_list.viewclass = ErrorListItem
+        layout = RecycleBoxLayout(
+            orientation='vertical',
+            key_viewclass="viewclass",  # Toplanmış hata satırı ya da ham oluşum satırı
+            default_size=(None, dp(72)),
+            default_size_hint=(1, None),
+            size_hint_y=None,
+            spacing=dp(4),
+            padding=[0, 0, 0, dp(10)]
+        )
+        layout.bind(minimum_height=layout.setter('height'))
+        self.error_list.add_widget(layout)
+        self.add_widget(self.error_list)
 
     def open_menu(self, *args):
         # BCU seçim menüsünü aç
+        if self.menu is None:
+            self.menu = MDDropdownMenu(caller=self.dropdown_button, items=self._menu_items, width_mult=4)
         self.menu.open()
 
     def set_bcu(self, bcu_name):
@@ -62,37 +104,109 @@ class ErrorScreen(MDBoxLayout, MDTabsBase):
         self.refresh_error_list()
 
     def on_new_data(self, data: bytes):
-        # Yeni veri geldiğinde, hataları güncellemek için UI thread'e ilet
-        Clock.schedule_once(lambda dt: self.update_errors(data), 0)
+        # Tekil paket (BLE thread'i): sınırlı tampona ekle, UI karesinde toplu işlenir
+        self._handoff.push(data)
+
+    def on_new_batch(self, frames):
+        # Karedeki hata sütunları (FrameBatch içinde bir kez çözülür); her oluşum indekste O(1)
+        # Paketin kaynağı (cihaz) kayıt anahtarındadır: farklı ağ geçitlerinin hataları ayrı satırlardır
+        cols = frames.errors
+        sources = frames.sources
+        now = time.time()  # Kare için tek zaman damgası
+        touched = False  # Seçili BCU'nun listesi değişti mi
+        for error_id, code, i in zip(cols["error_id"], cols["error_code"], cols["index"]):
+            touched |= self._store_error(error_id, code, now, sources[i]) == self.selected_bcu
+        if touched:
+            self._schedule_refresh()
 
     def update_errors(self, data: bytes):
         # Ham veriyi anlamlı hataya parse et
-        parsed = parse_error(data)
-        if not parsed:
+        cols = parse_error_batch((data,))
+        if not cols["index"]:
             return  # Geçersiz veri ise çık
+        if self._store_error(cols["error_id"][0], cols["error_code"][0], time.time()) == self.selected_bcu:
+            self._schedule_refresh()
+
+    def _store_error(self, error_id, code, now, source=0):
         # Demo: rastgele bir BCU seç (gerçek kullanımda doğrudan ilgili BCU'dan al)
         sim_bcu = f"BCU {random.randint(1, 16)}"
-        ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")  # Zaman damgası
-        # Hata bilgisini o BCU için sakla
-        self.bcu_errors[sim_bcu].append((parsed["error_message"], parsed["error_code"], ts))
-        # Eğer kayıtlı BCU seçiliyse listeye ekle
-        if sim_bcu == self.selected_bcu:
-            self._add_item(parsed["error_message"], parsed["error_code"], ts)
+        # Aynı (kaynak, BCU, hata, kod) tekrarları tek kayıtta toplanır: adet, ilk/son görülme, hız
+        self.index.record(sim_bcu, error_id, code, now, source)
+        return sim_bcu
+
+    def add_alarm(self, event):
+        # AlarmEngine dinleyicisi: kalkan alarm, kural adıyla BCU'nun hata listesine eklenir
+        # (kaynak başına ayrı kayıt: farklı ağ geçitlerinin aynı BCU'ları ayrı satırlardır)
+        if not event.raised:
+            return
+        bcu = f"BCU {event.bcu}"
+        self.index.record_alarm(bcu, event.rule.name, event.timestamp, event.source,
+                                message=event.rule.describe(event.value))
+        if bcu == self.selected_bcu:
+            self._schedule_refresh()
+
+    def _schedule_refresh(self):
+        # Hız ve "son görülme" metinleri için liste en fazla REFRESH_INTERVAL'de bir yeniden kurulur
+        if self._refresh_event is None:
+            self._refresh_event = Clock.schedule_once(self._refresh, REFRESH_INTERVAL)
+
+    def _refresh(self, dt=None):
+        self._refresh_event = None
+        self.refresh_error_list()
 
     def refresh_error_list(self):
-        # Mevcut seçili BCU'nun tüm hatalarını listele
-        self.error_list.clear_widgets()
-        for msg, code, ts in self.bcu_errors[self.selected_bcu]:
-            self._add_item(msg, code, ts)
-
-    def _add_item(self, message, code, timestamp):
-        # İki satırlı liste öğesi oluştur: mesaj ve zaman+kod
-        item = TwoLineAvatarListItem(
-            text=message,
-            secondary_text=f"{timestamp}    Code: 0x{code:02X}",
-            _no_ripple_effect=True
-        )
-        # Hatanın yanına uyarı ikonu ekle
-        icon = IconLeftWidget(icon="alert-circle", theme_text_color="Error")
-        item.add_widget(icon)
-        self.error_list.add_widget(item)
\ No newline at end of file
+        # Seçili BCU'nun her hatası için tek satır: önce aktif hatalar (son RATE_WINDOW
+        # saniyede tekrar eden), ardından başlık altında geçmiş hatalar; açılmış
+        # satırların altında ham oluşumlar
+        now = time.time()
+        live = sorted(self.index.active(now, bcu=self.selected_bcu), key=lambda e: e.last_seen, reverse=True)
+        live_keys = {e.key for e in live}
+        past = [e for e in self.index.for_bcu(self.selected_bcu) if e.key not in live_keys]
+        data = []
+        for entry in live:
+            self._add_rows(data, entry, now)
+        if past:
+            data.append({"viewclass": "OneLineListItem", "text": f"Aktif olmayan hatalar ({len(past)})",
+                         "height": dp(48)})
+            for entry in past:
+                self._add_rows(data, entry, now)
+        self.error_list.data = data
+        # Fırtına dinse de hızlar sıfıra insin ve satırlar geçmişe geçsin diye
+        # aktif hata kaldıkça liste periyodik olarak yenilenir
+        if live:
+            self._schedule_refresh()
+
+    def _add_rows(self, data, entry, now):
+        data.append(self._make_row(entry, now))
+        if entry.key in self.expanded:
+            data.extend(
+                {"viewclass": "OneLineListItem", "text": f"    {_format_time(ts)}", "height": dp(48)}
+                for ts in reversed(entry.occurrences)
+            )
+
+    def toggle_expand(self, key):
+        # Toplanmış satırı ham oluşumlarıyla aç / kapat
+        if key in self.expanded:
+            self.expanded.discard(key)
+        else:
+            self.expanded.add(key)
+        self.refresh_error_list()
+
+    def _make_row(self, entry, now):
+        # İki satırlı liste öğesi verisi: cihaz, mesaj, kod ve adet; ilk/son görülme ve hız
+        rate = entry.rate.rate(now)
+        if entry.kind == ERROR:
+            title = f"{error_message(entry.error_id)}    Code: 0x{entry.code:02X}"
+        else:
+            title = entry.message  # Alarm: kural adı ve son değer
+        return {
+            "viewclass": "ErrorListItem",
+            "text": f"K{entry.source + 1} {title}    ×{entry.count}",
+            "secondary_text": f"{_format_time(entry.first_seen)} – {_format_time(entry.last_seen)}"
+                              f"    {rate:.1f}/s",
+            "on_release": lambda key=entry.key: self.toggle_expand(key),
+        }
+
+
+def _format_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M:%S")
@@ -3,8 +3,10 @@
 import importlib  # Android için dinamik modül yükleme
 import platform  # Platform kontrolü
 import os        # Dosya yolu işlemleri
-from datetime import datetime  # Zaman damgası oluşturmak için
+import time      # Kayıt zaman damgası (epoch) için
+from datetime import datetime  # Kesinti başlangıç saati (işaret metni)
 
+from kivy.app import App  # Uygulama veri klasörü için
 from kivy.clock import Clock  # Zamanlanmış görevler için
 from kivy.metrics import dp  # DPI bağımsız ölçümler
 from kivy.uix.boxlayout import BoxLayout  # Yatay/dikey düzenleme
@@ -18,31 +20,45 @@ from kivymd.uix.gridlayout import MDGridLayout  # Esnek ızgara düzeni
 from kivymd.uix.menu import MDDropdownMenu  # Açılır menü
 from kivymd.uix.list import OneLineListItem  # Basit liste öğesi
 
-# Android tespiti ve paylaşım fonksiyonu
+from utils.log_writer import StreamingLogWriter  # Kayıtları arka planda dosyaya akıtmak için
+from utils.blf import BLFLogFormat  # Vector BLF (ikili, sıkıştırılmış) kayıt formatı
+from utils.capture import CaptureBuffer  # Kayıpsız (her paket) yakalama tamponu
+
+# Android tespiti
 IS_ANDROID = platform.system() == "Android"
-try:
-    from plyer import share  # Android paylaşım API
-except ImportError:
-    share = None
-
-# Android dışı dosya kaydetme için tkinter
-primary_external_storage_path = None
-if IS_ANDROID:
+
+
+# Platform modülleri (plyer, android.storage, tkinter) açılışı yavaşlatmasın diye
+# ilk kullanımda yüklenir; bulunamazsa None döner
+def _share_api():
+    # Android paylaşım API
+    try:
+        from plyer import share
+    except ImportError:
+        return None
+    return share
+
+
+def _external_storage_path():
+    # Android'de harici depolama kök dizinini veren fonksiyon
+    if not IS_ANDROID:
+        return None
     try:
-        android_storage = importlib.import_module("android.storage")
-        primary_external_storage_path = android_storage.primary_external_storage_path
+        return importlib.import_module("android.storage").primary_external_storage_path
     except (ImportError, AttributeError):
-        primary_external_storage_path = None
+        return None
 
-# Masaüstü kaydetmek için filedialog
-tk = filedialog = None
-if not IS_ANDROID:
+
+def _file_dialog():
+    # Masaüstünde kaydetme için (tkinter, filedialog)
+    if IS_ANDROID:
+        return None, None
     try:
         import tkinter as tk
         from tkinter import filedialog
     except ImportError:
-        tk = None
-        filedialog = None
+        return None, None
+    return tk, filedialog
 
 class LogsScreen(MDBoxLayout, MDTabsBase):
     def __init__(self, **kwargs):
@@ -53,10 +69,16 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         self.spacing = dp(10)
 
         # Kayıt verileri ve ayarlar
-        self.log_data = []  # Zaman damgası + hex veriler listesi
+        self.writer = None  # Aktif kaydı geçici dosyaya akıtan yazıcı
+        self.last_saved_file = None  # Son kaydedilen dosya (paylaşım için)
         self.latest_data = None  # Son alınan veri
+        self.latest_source = 0  # Son verinin geldiği cihaz
+        self.latest_id = None  # Son verinin CAN ID'si (çok çerçeveli bildirimlerde)
         self.log_event = None  # Zamanlanmış kayıt olayı
-        self.log_interval = 1  # Varsayılan 1 saniye
+        self.log_interval = 1  # Varsayılan 1 saniye (0 = tüm paketler, kayıpsız)
+        self.capture = None  # Tam hızlı modda BLE thread'inin yazdığı tampon
+        self.file_manager = None  # Kayıt açma dosya seçicisi (ilk kullanımda oluşturulur)
+        self.export_job = None  # Süren dışa aktarma işi (arka plan thread'i)
 
         # Durum göstergesi
         self.status_label = MDLabel(
@@ -71,7 +93,7 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         # Zaman aralığı seçimi: girdi ve açılır menü ikonu
         hl = BoxLayout(orientation='horizontal', size_hint=(1, None), height=dp(40), spacing=dp(10))
         self.interval_input = MDTextField(
-            hint_text="Saniye",
+            hint_text="Saniye (0 = tüm paketler)",
             text=str(self.log_interval),
             mode="rectangle",
             size_hint=(0.7, 1)
@@ -87,8 +109,9 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         hl.add_widget(self.dd_icon)
         self.add_widget(hl)
 
-        # Menü seçenekleri
-        items = [
+        # Menü seçenekleri (menü ilk açılışta oluşturulur)
+        self._menu_items = [
+            {"text": "Tüm paketler", "viewclass": "OneLineListItem", "on_release": lambda x="0": self._select_interval(x)},
             {"text": "50 ms", "viewclass": "OneLineListItem", "on_release": lambda x="0.05": self._select_interval(x)},
             {"text": "2 s",  "viewclass": "OneLineListItem", "on_release": lambda x="2":    self._select_interval(x)},
             {"text": "5 s",  "viewclass": "OneLineListItem", "on_release": lambda x="5":    self._select_interval(x)},
@@ -96,9 +119,9 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
             {"text": "20 s", "viewclass": "OneLineListItem", "on_release": lambda x="20":   self._select_interval(x)},
             {"text": "50 s", "viewclass": "OneLineListItem", "on_release": lambda x="50":   self._select_interval(x)},
         ]
-        self.dropdown = MDDropdownMenu(caller=self.dd_icon, items=items, width_mult=3)
+        self.dropdown = None
 
-        # Kayıt kontrol butonları: Başlat, Durdur, Sıfırla, Paylaş
+        # Kayıt kontrol butonları: Başlat, Durdur, Sıfırla, Paylaş, Aç (kayıt görüntüleyici), Dışa Aktar
         button_grid = MDGridLayout(
             cols=2,
             spacing=dp(15),
@@ -110,13 +133,19 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         self.stop_button  = MDRaisedButton(text="Durdur", icon="stop-circle",     on_release=self.stop_recording, **btn_style)
         self.reset_button = MDRaisedButton(text="Sıfırla", icon="backup-restore", on_release=self.reset_log, **btn_style)
         self.share_button = MDRaisedButton(text="Paylaş", icon="share-variant",   on_release=self.share_log, disabled=True, **btn_style)
+        self.open_button  = MDRaisedButton(text="Kayıt Aç", icon="folder-open",   on_release=self.open_log, **btn_style)
+        self.export_button = MDRaisedButton(text="Dışa Aktar", icon="table-arrow-right", on_release=self.ask_export_format,
+                                            disabled=True, **btn_style)
 
-        for w in (self.start_button, self.stop_button, self.reset_button, self.share_button):
+        for w in (self.start_button, self.stop_button, self.reset_button, self.share_button, self.open_button,
+                  self.export_button):
             button_grid.add_widget(w)
         self.add_widget(button_grid)
 
     def _open_dropdown(self, *args):
         # Zaman aralığı menüsünü göster
+        if self.dropdown is None:
+            self.dropdown = MDDropdownMenu(caller=self.dd_icon, items=self._menu_items, width_mult=3)
         self.dropdown.open()
 
     def _select_interval(self, value_str):
@@ -129,49 +158,136 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         # Yeni veri geldiğinde sakla
         self.latest_data = data
 
+    def on_new_batch(self, frames):
+        # Aralıklı kayıt yalnızca en son paketi kullanır
+        if frames:
+            self.latest_data = bytes(frames[-1])
+            self.latest_source = frames.sources[-1]
+            self.latest_id = frames.ids[-1]
+
+    def capture_frame(self, data: bytes, source: int = 0):
+        # BLE thread'inde çağrılır: tam hızlı modda her paketi doğrudan tampona yaz
+        capture = self.capture
+        if capture is not None:
+            capture.append(data, source)
+
+    def capture_frames(self, frames, ids, source: int = 0):
+        # BLE thread'inde çağrılır: tek bildirimden açılan çerçeveleri toplu olarak tampona yaz
+        capture = self.capture
+        if capture is not None:
+            capture.extend(frames, ids, source)
+
+    def mark_gap(self, start: float, end: float, device: str = ""):
+        # BLE thread'inde çağrılır: aktif kayda bağlantı kesintisi işareti koy.
+        # İşaret veri akışının yeniden başladığı ana (end) konur; kesinti öncesi kayıtlar
+        # dosyada zaten olduğundan kayıt zaman sırası bozulmaz (LogIndex zamana göre arar)
+        writer = self.writer
+        if writer is not None:
+            where = f" ({device})" if device else ""
+            began = datetime.fromtimestamp(start).strftime("%H:%M:%S.%f")[:-3]
+            try:
+                writer.mark(end, f"BLE bağlantı kesintisi{where}: {end - start:.2f} s ({began} itibarıyla)")
+            except RuntimeError:
+                pass  # Yazıcı durdu; hata durum satırında gösterilir
+
+    def mark_event(self, timestamp: float, text: str):
+        # Aktif kayda olay işareti koy (ör. alarm kalktı / temizlendi)
+        writer = self.writer
+        if writer is not None:
+            try:
+                writer.mark(timestamp, text)
+            except RuntimeError:
+                pass  # Yazıcı durdu; hata durum satırında gösterilir
+
+    def _show_capture_status(self, dt):
+        # Tam hızlı modda yazılan, kaybolan ve kırpılan paket sayısını göster
+        if self.writer is None or self.capture is None:
+            return
+        if self.writer.error is not None:
+            self._writer_failed()
+            return
+        text = f"Kaydedilen: {self.writer.count}"
+        if self.capture.dropped:
+            text += f"  (kayıp: {self.capture.dropped})"
+        if self.capture.truncated:
+            text += f"  (kırpılan: {self.capture.truncated})"
+        self.status_label.text = text
+
+    def _stop_timers(self):
+        # Zamanlanmış kaydı ve tam hızlı yakalamayı durdur
+        if self.log_event:
+            Clock.unschedule(self.log_event)
+            self.log_event = None
+        self.capture = None
+
     def _log_latest(self, dt):
-        # Son veriyi zaman damgasıyla kaydet
-        if self.latest_data is None:
+        # Son veriyi zaman damgasıyla yazıcı kuyruğuna ekle (dosyaya arka planda yazılır)
+        if self.latest_data is None or self.writer is None:
+            return
+        try:
+            self.writer.write(time.time(), self.latest_data, self.latest_source, self.latest_id)
+        except RuntimeError:
+            self._writer_failed()
             return
-        hex_data = self.latest_data.hex(' ').upper()
-        ts = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        self.log_data.append((ts, hex_data))
-        self.status_label.text = f"Kaydedilen: {len(self.log_data)}"
+        self.status_label.text = f"Kaydedilen: {self.writer.count}"
+
+    def _writer_failed(self):
+        # Yazıcı thread'i hata ile durdu: kaydı durdur, o ana kadar yazılanlar kaydedilebilir
+        self._stop_timers()
+        self.start_button.disabled = False
+        self.status_label.text = f"Kayıt hatası: {self.writer.error}"
+
+    def _temp_dir(self):
+        # Geçici kayıt dosyası için uygulama veri klasörü (yoksa sistem varsayılanı)
+        app = App.get_running_app()
+        return getattr(app, "user_data_dir", None)
+
+    def _discard_writer(self):
+        # Bitmemiş kaydı iptal et
+        if self.writer:
+            self.writer.discard()
+            self.writer = None
 
     def start_recording(self, *args):
         # Aralık değeri geçerliyse kaydı başlat
         try:
             val = float(self.interval_input.text)
-            if val <= 0:
+            if val < 0:
                 raise ValueError
             self.log_interval = val
         except ValueError:
             MDDialog(title="Hata", text="Geçerli bir sayı girin.", size_hint=(0.8,0.3)).open()
             return
         # Önceki zamanlanan kaydı iptal et
-        if self.log_event:
-            Clock.unschedule(self.log_event)
-        self.log_data.clear()
+        self._stop_timers()
+        # Kaydedilmemiş önceki kaydı at ve yeni geçici dosya aç
+        self._discard_writer()
         self.start_button.disabled = True
         self.share_button.disabled = True
         self.status_label.text = "Kayıt başladı..."
-        # Zamanlanmış kaydı başlat
-        self.log_event = Clock.schedule_interval(self._log_latest, self.log_interval)
+        if self.log_interval == 0:
+            # Kayıpsız mod: her bildirim BLE thread'inde tampona yazılır,
+            # yazıcı thread tamponu doğrudan boşaltır
+            capture = CaptureBuffer()
+            self.writer = StreamingLogWriter(fmt=BLFLogFormat(), directory=self._temp_dir(),
+                                             flush_interval=0.1, source=capture)
+            self.capture = capture
+            self.log_event = Clock.schedule_interval(self._show_capture_status, 0.5)
+        else:
+            # Aralıklı mod: yalnızca her aralıktaki son paket kaydedilir (örnekleme)
+            self.writer = StreamingLogWriter(fmt=BLFLogFormat(), directory=self._temp_dir())
+            self.log_event = Clock.schedule_interval(self._log_latest, self.log_interval)
 
     def stop_recording(self, *args):
         # Kaydı durdur ve dosya ismi sor
-        if self.log_event:
-            Clock.unschedule(self.log_event)
-            self.log_event = None
+        self._stop_timers()
         self.start_button.disabled = False
         self.ask_filename()
 
     def reset_log(self, *args):
         # Kayıt verisini sıfırla
-        if self.log_event:
-            Clock.unschedule(self.log_event)
-            self.log_event = None
-        self.log_data.clear()
+        self._stop_timers()
+        self._discard_writer()
         self.start_button.disabled = False
         self.share_button.disabled = True
         self.status_label.text = "Kayıt sıfırlandı."
@@ -199,30 +315,44 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
         filename += ".blf"
 
         # Android veya masaüstü için kayıt yolunu belirle
+        primary_external_storage_path = _external_storage_path()
         if IS_ANDROID and primary_external_storage_path:
             save_path = os.path.join(primary_external_storage_path(), "Download", filename)
         else:
+            tk, filedialog = _file_dialog()
             if tk and filedialog:
                 tk.Tk().withdraw()
                 save_path = filedialog.asksaveasfilename(defaultextension=".blf", initialfile=filename,
                                                         filetypes=[("BLF Dosyası","*.blf")])
+                if not save_path:
+                    return  # Kullanıcı dosya seçiciyi iptal etti
             else:
                 MDDialog(title="Hata", text="Dosya seçici açılamıyor.", size_hint=(0.8,0.3)).open()
                 return
 
-        # Verileri dosyaya yaz ve paylaşmayı etkinleştir
+        if self.writer is None:
+            MDDialog(title="Uyarı", text="Kaydedilecek veri yok.", size_hint=(0.8,0.3)).open()
+            return
+
+        # Kayıt zaten geçici dosyaya yazıldı: sadece bitir, hedefe taşı ve paylaşmayı etkinleştir
         self.dialog.dismiss()
-        with open(save_path, "w") as f:
-            for ts, hx in self.log_data:
-                f.write(f"{ts} || {hx}\n")
+        try:
+            self.last_saved_file = self.writer.finalize(save_path)
+        except Exception as e:
+            # Yazıcı (ve geçici kayıt) korunur: kullanıcı başka bir yola kaydetmeyi deneyebilir
+            MDDialog(title="Hata", text=str(e), size_hint=(0.8,0.3)).open()
+            return
+        self.writer = None
         self.share_button.disabled = False
+        self.export_button.disabled = False
         MDDialog(title="Başarılı", text=f"{save_path} kaydedildi.", size_hint=(0.8,0.3)).open()
 
     def share_log(self, *args):
         # Android paylaşım desteği varsa paylaş
-        if not self.log_data:
+        if not self.last_saved_file:
             MDDialog(title="Uyarı", text="Kaydedilecek veri yok.", size_hint=(0.8,0.3)).open()
             return
+        share = _share_api()
         if share:
             try:
                 share.share(filepath=self.last_saved_file, title="Log Paylaş")
@@ -230,3 +360,77 @@ class LogsScreen(MDBoxLayout, MDTabsBase):
                 MDDialog(title="Hata", text=str(e), size_hint=(0.8,0.3)).open()
         else:
             MDDialog(title="Bilgi", text="Paylaşım yalnızca Android'de destekler.", size_hint=(0.8,0.3)).open()
+
+    def open_log(self, *args):
+        # Kaydedilmiş bir BLF dosyası seçip uygulama içi görüntüleyicide aç
+        from kivymd.uix.filemanager import MDFileManager  # İlk kullanımda yüklenir
+        if self.file_manager is None:
+            self.file_manager = MDFileManager(exit_manager=self._close_file_manager,
+                                              select_path=self._show_log, ext=[".blf"])
+        if self.last_saved_file:
+            start = os.path.dirname(self.last_saved_file)
+        else:
+            storage = _external_storage_path()
+            start = os.path.join(storage(), "Download") if IS_ANDROID and storage else os.path.expanduser("~")
+        self.file_manager.show(start)
+
+    def _close_file_manager(self, *args):
+        self.file_manager.close()
+
+    def _show_log(self, path):
+        # Dosya belleğe okunmaz; görüntüleyici indeksle yalnızca gösterilen bölümü açar
+        self._close_file_manager()
+        from components.log_viewer import open_log_viewer  # İlk kullanımda yüklenir
+        try:
+            open_log_viewer(path)
+        except Exception as e:
+            MDDialog(title="Hata", text=f"Kayıt açılamadı: {e}", size_hint=(0.8,0.3)).open()
+
+    def ask_export_format(self, *args):
+        # Son kaydı çözülmüş sütunlar halinde dışa aktarmak için biçim seç
+        if not self.last_saved_file:
+            MDDialog(title="Uyarı", text="Önce kaydı kaydedin.", size_hint=(0.8,0.3)).open()
+            return
+        from utils.export import EXPORTERS  # İlk kullanımda yüklenir (pyarrow yavaş açılır)
+        labels = {"csv": "CSV (.csv.gz)", "parquet": "Parquet"}
+        self.export_dialog = MDDialog(
+            title="Dışa Aktar",
+            text="Biçim seçin:",
+            buttons=[MDRaisedButton(text=labels.get(fmt, fmt), on_release=lambda x, fmt=fmt: self.start_export(fmt))
+                     for fmt in EXPORTERS]
+        )
+        self.export_dialog.open()
+
+    def start_export(self, fmt):
+        # Dışa aktarma arka planda, parça parça yapılır; ilerleme çubuğu ve iptal düğmesi gösterilir
+        from kivymd.uix.progressbar import MDProgressBar  # İlk kullanımda yüklenir
+        from utils.export import EXPORTERS, ExportJob  # Arka plan dışa aktarma
+        self.export_dialog.dismiss()
+        if self.export_job is not None and self.export_job.running:
+            return
+        dest = os.path.splitext(self.last_saved_file)[0] + EXPORTERS[fmt].extension
+        self.export_progress = MDProgressBar(value=0, size_hint_y=None, height=dp(8))
+        self.progress_dialog = MDDialog(
+            title="Dışa aktarılıyor...",
+            type="custom",
+            content_cls=self.export_progress,
+            auto_dismiss=False,
+            buttons=[MDRaisedButton(text="İptal", on_release=lambda x: self.export_job.cancel())]
+        )
+        self.progress_dialog.open()
+        self.export_job = ExportJob(
+            self.last_saved_file, dest, fmt,
+            progress_callback=lambda ratio: Clock.schedule_once(lambda dt: self._show_export_progress(ratio)),
+            done_callback=lambda rows, error: Clock.schedule_once(lambda dt: self._export_done(dest, rows, error)),
+        ).start()
+
+    def _show_export_progress(self, ratio):
+        self.export_progress.value = ratio * 100
+
+    def _export_done(self, dest, rows, error):
+        self.progress_dialog.dismiss()
+        self.export_job = None
+        if error is not None:
+            MDDialog(title="Hata", text=f"Dışa aktarma başarısız: {error}", size_hint=(0.8,0.3)).open()
+        elif rows is not None:
+            MDDialog(title="Başarılı", text=f"{rows} satır {dest} dosyasına aktarıldı.", size_hint=(0.8,0.3)).open()
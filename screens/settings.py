@@ -9,9 +9,7 @@ from kivymd.uix.list import MDList, OneLineIconListItem, IconLeftWidget  # Cihaz
 from kivymd.uix.scrollview import MDScrollView  # Kaydırılabilir liste için
 from kivymd.uix.label import MDLabel  # Metin göstermek için
 
-from bleak import BleakScanner  # BLE cihaz taraması
-import threading  # Arka planda tarama iş parçacığı
-import asyncio  # Asenkron BLE tarama işlemi
+from utils.discovery import get_discovery  # Ortak, akışlı ve önbellekli BLE keşfi
 
 class SettingsScreen(MDBoxLayout, MDTabsBase):
     def __init__(self, connect_callback, **kwargs):
@@ -20,6 +18,8 @@ class SettingsScreen(MDBoxLayout, MDTabsBase):
         self.padding = dp(20)  # Kenar boşlukları
         self.spacing = dp(10)  # İçerikler arası boşluk
         self.connect_callback = connect_callback  # Seçilen cihazı ana uygulamaya iletmek için
+        self.discovery = get_discovery()  # Diyalogla paylaşılan keşif servisi ve önbelleği
+        self._items = {}  # adres -> liste öğesi (RSSI güncellemesi için)
 
         # Başlık etiketi
         self.add_widget(
@@ -57,48 +57,67 @@ class SettingsScreen(MDBoxLayout, MDTabsBase):
         self.add_widget(self.scroll)
 
     def start_scan(self, *args):
-        # Tarama öncesi listeyi temizle ve mesajı güncelle
+        # Önbellekteki cihazları hemen göster; yenileri tarama sürerken listeye eklenir
         self.device_list.clear_widgets()
+        self._items = {}
+        for d in self.discovery.cached():
+            self._show_device(d)
         self.msg_label.text = "Taranıyor..."
-        # BLE taramasını iş parçacığında yap
-        threading.Thread(target=self._scan_thread, daemon=True).start()
+        self.discovery.add_listener(self._on_discovered)
+        self.discovery.start().add_done_callback(self._scan_done)
 
-    def _scan_thread(self):
+    def _on_discovered(self, device, is_new):
+        # BLE thread'inde çağrılır: cihazı UI thread'inde listeye ekle/güncelle
+        Clock.schedule_once(lambda dt: self._show_device(device), 0)
+
+    def _scan_done(self, future):
+        # BLE thread'inde çağrılır: UI güncellemesini ana thread'e planla
         try:
-            # Yeni event loop oluşturup asenkron taramayı gerçekleştir
-            loop = asyncio.new_event_loop()
-            devices = loop.run_until_complete(BleakScanner.discover())
-            loop.close()
-            # UI güncellemesini ana thread'e planla
-            Clock.schedule_once(lambda dt: self._show_devices(devices), 0)
+            future.result()
+            Clock.schedule_once(lambda dt: self._finish_scan(), 0)
         except Exception as e:
             # Hata durumunu ana thread ile göster
             Clock.schedule_once(lambda dt, err=e: self._show_error(err), 0)
 
-    def _show_devices(self, devices):
+    def _finish_scan(self):
+        self.discovery.remove_listener(self._on_discovered)
         # Bulunan cihazlar yoksa hata göster
-        if not devices:
+        if not self._items:
             self._show_error("Hiç cihaz bulunamadı.")
             return
         # Cihaz sayısını kullanıcıya bildir
-        self.msg_label.text = f"{len(devices)} cihaz bulundu."
-        # Her cihaz için liste öğesi oluştur
-        for d in devices:
-            name = d.name or "Adsız"
-            addr = d.address
-            item = OneLineIconListItem(
-                text=f"{name} — {addr}",
-                on_release=lambda widget, a=addr: self._select_device(a)
-            )
-            icon = IconLeftWidget(icon="bluetooth", theme_text_color="Primary")
-            item.add_widget(icon)
-            self.device_list.add_widget(item)
+        self.msg_label.text = f"{len(self._items)} cihaz bulundu."
+
+    def _show_device(self, d):
+        # Cihaz listede varsa yalnızca metni (RSSI) güncelle, yoksa yeni öğe oluştur
+        name = d.name or "Adsız"
+        text = f"{name} — {d.address}" + (f"  ({d.rssi} dBm)" if d.rssi is not None else "")
+        item = self._items.get(d.address)
+        if item is not None:
+            item.text = text
+            return
+        item = OneLineIconListItem(
+            text=text,
+            on_release=lambda widget, a=d.address: self._select_device(a)
+        )
+        icon = IconLeftWidget(icon="bluetooth", theme_text_color="Primary")
+        item.add_widget(icon)
+        self.device_list.add_widget(item)
+        self._items[d.address] = item
 
     def _show_error(self, err):
         # Hata veya bilgi mesajını güncelle
         self.msg_label.text = f"Hata: {err}"
 
+    def show_link_status(self, address, connected):
+        # Bağlantı durumu değişikliğini göster (UI thread'inde çağrılmalı)
+        if connected:
+            self.msg_label.text = f"Bağlandı: {address}"
+        else:
+            self.msg_label.text = f"Bağlantı koptu ({address}), yeniden bağlanılıyor..."
+
     def _select_device(self, address):
         # Seçilen cihazı kullanıcıya bildir ve callback ile ilet
         self.msg_label.text = f"Seçildi: {address}"
+        self.discovery.stop()  # Tarama bağlantıyı yavaşlatmasın
         self.connect_callback(address)
@@ -0,0 +1,95 @@
+# utils/aggregates.py
+
+METRIC_KEYS = ("soc", "soh", "voltage", "temperature")
+
+
+class MetricAggregator:
+    """
+    BCU'lar üzerinde artımlı (incremental) toplam görünümü.
+    Her metrik için çalışan toplam tutulur; bir BCU değiştiğinde ortalama O(1)
+    güncellenir. Min/max BCU'lar yalnızca mevcut uç değer kötüleştiğinde
+    (ve okunduğunda) yeniden taranır.
+    """
+
+    RESYNC_EVERY = 4096  # Kayan nokta hatası birikmesin diye toplamları tam yeniden hesaplama aralığı
+
+    def __init__(self, bcu_count=16, keys=METRIC_KEYS):
+        self.bcu_count = bcu_count
+        self.keys = tuple(keys)
+        self.values = {k: [0] * bcu_count for k in self.keys}  # BCU sırasına göre son değerler
+        self.sums = {k: 0.0 for k in self.keys}
+        self._min_idx = {k: 0 for k in self.keys}
+        self._max_idx = {k: 0 for k in self.keys}
+        self._stale = set()  # Uç değerleri yeniden taranması gereken metrikler
+        self._updates = 0
+
+    def update(self, bcu: int, metrics: dict):
+        """
+        bcu: 1 tabanlı BCU numarası
+        metrics: {"soc": ..., "soh": ..., ...} (eksik anahtarlar atlanır)
+        """
+        i = bcu - 1
+        for k in self.keys:
+            if k not in metrics:
+                continue
+            new = metrics[k]
+            col = self.values[k]
+            old = col[i]
+            if new == old:
+                continue
+            col[i] = new
+            self.sums[k] += new - old
+            # Uç değer takibi: yeni değer sınırı aşarsa doğrudan al,
+            # mevcut uç değer geri çekilirse tembel yeniden tarama işaretle
+            lo, hi = self._min_idx[k], self._max_idx[k]
+            if i == lo:
+                if new > old:
+                    self._stale.add(k)
+            elif new < col[lo]:
+                self._min_idx[k] = i
+            if i == hi:
+                if new < old:
+                    self._stale.add(k)
+            elif new > col[hi]:
+                self._max_idx[k] = i
+
+        self._updates += 1
+        if self._updates >= self.RESYNC_EVERY:
+            self._updates = 0
+            for k in self.keys:
+                self.sums[k] = float(sum(self.values[k]))
+
+    def _rescan(self, k):
+        col = self.values[k]
+        self._min_idx[k] = min(range(self.bcu_count), key=col.__getitem__)
+        self._max_idx[k] = max(range(self.bcu_count), key=col.__getitem__)
+        self._stale.discard(k)
+
+    def mean(self, k):
+        return self.sums[k] / self.bcu_count
+
+    def minimum(self, k):
+        # Dönüş: (BCU numarası, değer)
+        if k in self._stale:
+            self._rescan(k)
+        i = self._min_idx[k]
+        return i + 1, self.values[k][i]
+
+    def maximum(self, k):
+        # Dönüş: (BCU numarası, değer)
+        if k in self._stale:
+            self._rescan(k)
+        i = self._max_idx[k]
+        return i + 1, self.values[k][i]
+
+    def spread(self, k):
+        # En yüksek ve en düşük BCU arasındaki fark
+        return self.maximum(k)[1] - self.minimum(k)[1]
+
+    def weakest(self):
+        # En düşük sağlık durumuna (SOH) sahip paket: (BCU numarası, SOH)
+        return self.minimum("soh")
+
+    def totals(self):
+        # Total görünümü için ortalamalar
+        return {k: self.mean(k) for k in self.keys}
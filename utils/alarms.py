@@ -0,0 +1,236 @@
+# utils/alarms.py
+
+"""
+Canlı veri akışı üzerinde eşik / histerezis / değişim hızı alarmları.
+Kurallar (assets/alarms.json, CAN2GO_ALARMS ile başka dosya) metrik ve BCU
+başına derlenir: her (BCU, metrik) için kuralların tüm sınırları tek bir
+sıralı kırılma noktası (breakpoint) dizisine dönüştürülür ve her aralık için
+ihlal edilen kuralların bit maskesi önceden hesaplanır. Bir değerin
+değerlendirilmesi bir bisect ve birkaç bit işlemidir; kural sayısı yüzlere
+çıksa da çerçeve başına maliyet neredeyse sabit kalır.
+
+Histerezis: alarm sınır aşıldığında kalkar, değer sınırın histerezis kadar
+içine dönene kadar sürer (ikinci, kaydırılmış bir tablo ile).
+Değişim hızı: |Δdeğer / Δt| (birim/s, en az RATE_INTERVAL aralıklı örneklerden) aynı
+yöntemle ayrı bir tabloda değerlendirilir.
+"""
+
+import bisect  # Değer -> aralık
+import json  # Kural dosyası
+import math  # nextafter: "sınırı aşan" değerleri kesin ayırmak için
+import os  # Kural dosyası yolu
+import time  # Olay zamanı (epoch)
+from collections import namedtuple  # Alarm olayı
+
+from utils.aggregates import METRIC_KEYS  # Kural tanımlanabilen metrikler
+
+ALARMS_PATH = os.environ.get("CAN2GO_ALARMS") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "alarms.json")
+LEVELS = ("warning", "critical")
+RATE_INTERVAL = 1.0  # Hız en az bu kadar saniye arayla alınan örneklerden hesaplanır (nicemleme gürültüsü)
+
+# source: cihaz (ağ geçidi) indeksi; raised: True = alarm kalktı, False = alarm temizlendi
+AlarmEvent = namedtuple("AlarmEvent", "timestamp source bcu metric rule value raised")
+
+
+class AlarmRule:
+    """
+    metric: soc / soh / voltage / temperature
+    bcu: yalnızca bu BCU (None = tüm BCU'lar)
+    low / high: alt / üst sınır (değer sınırın dışına çıkınca alarm)
+    max_rate: izin verilen en büyük değişim hızı (birim/s)
+    hysteresis: alarmın temizlenmesi için sınırın ne kadar içine dönülmesi gerektiği
+    """
+
+    def __init__(self, name, metric, low=None, high=None, max_rate=None, hysteresis=0.0, bcu=None,
+                 level="warning"):
+        if metric not in METRIC_KEYS:
+            raise ValueError(f"Bilinmeyen metrik: {metric}")
+        if low is None and high is None and max_rate is None:
+            raise ValueError(f"Kural {name}: low, high ya da max_rate gerekli")
+        if level not in LEVELS:
+            raise ValueError(f"Kural {name}: seviye {LEVELS} içinden olmalı")
+        self.name = name
+        self.metric = metric
+        self.low = low
+        self.high = high
+        self.max_rate = max_rate
+        self.hysteresis = abs(hysteresis)
+        self.bcu = bcu
+        self.level = level
+
+    @classmethod
+    def from_dict(cls, d):
+        d = dict(d)
+        try:
+            return cls(d.pop("name"), d.pop("metric"), **d)
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Geçersiz kural {d}: {e}") from None
+
+    def describe(self, value):
+        unit = {"soc": "%", "soh": "%", "voltage": " V", "temperature": " °C"}[self.metric]
+        return f"{self.name}: {self.metric} = {value:.2f}{unit}"
+
+    def __repr__(self):
+        return f"AlarmRule({self.name!r}, {self.metric!r})"
+
+
+def load_rules(path=ALARMS_PATH):
+    # Kural dosyası yoksa alarm yoktur
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [AlarmRule.from_dict(d) for d in json.load(f)]
+
+
+class BandTable:
+    """
+    Derlenmiş sınır tablosu. bounds: [(bit, alt, üst)], alt/üst None olabilir.
+    Değer v için ihlal maskesi: masks[bisect_right(points, v)]
+    (v < alt ya da v > üst olan kuralların bitleri).
+    """
+
+    __slots__ = ("points", "masks")
+
+    def __init__(self, bounds):
+        points = set()
+        for _, low, high in bounds:
+            if low is not None:
+                points.add(low)  # [alt, ...) ihlal etmez; altındaki aralıklar eder
+            if high is not None:
+                points.add(math.nextafter(high, math.inf))  # üstten büyük ilk değer
+        self.points = sorted(points)
+        # Her aralığın temsilcisi aralığın alt ucu (ilk aralık için -sonsuz)
+        reps = [-math.inf] + self.points
+        self.masks = [
+            sum(1 << bit for bit, low, high in bounds
+                if (low is not None and v < low) or (high is not None and v > high))
+            for v in reps
+        ]
+
+    def mask(self, value):
+        return self.masks[bisect.bisect_right(self.points, value)]
+
+
+class CompiledRules:
+    # Tek (BCU, metrik) için: kaldırma ve sürdürme (histerezis) tabloları, değer ve hız için
+    __slots__ = ("rules", "raise_value", "hold_value", "raise_rate", "hold_rate", "rate_bits")
+
+    def __init__(self, rules):
+        self.rules = rules  # bit -> AlarmRule
+        value = [(b, r) for b, r in enumerate(rules) if r.low is not None or r.high is not None]
+        rate = [(b, r) for b, r in enumerate(rules) if r.max_rate is not None]
+        self.raise_value = BandTable([(b, r.low, r.high) for b, r in value])
+        self.hold_value = BandTable([
+            (b, None if r.low is None else r.low + r.hysteresis, None if r.high is None else r.high - r.hysteresis)
+            for b, r in value])
+        self.raise_rate = BandTable([(b, None, r.max_rate) for b, r in rate])
+        self.hold_rate = BandTable([(b, None, r.max_rate - r.hysteresis) for b, r in rate])
+        self.rate_bits = sum(1 << b for b, _ in rate)
+
+
+class AlarmEngine:
+    """
+    FrameIngestor tüketicisi: karedeki metrik sütunlarını (FrameBatch.metrics,
+    tek çözümleme) derlenmiş tablolarla değerlendirir. Alarm kalktığında ve
+    temizlendiğinde dinleyiciler listener(AlarmEvent) ile UI thread'inde çağrılır.
+    Durum (kaynak, BCU, metrik) başına tutulur: farklı ağ geçitlerindeki aynı
+    numaralı BCU'lar ayrı paketlerdir. Derlenmiş tablolar kurallara bağlı olduğundan
+    (BCU, metrik) başınadır ve kaynaklar arasında paylaşılır.
+    active: (kaynak, bcu, metrik) -> etkin kuralların bit maskesi
+    """
+
+    def __init__(self, rules=None):
+        self.listeners = []
+        self.load(load_rules() if rules is None else rules)
+
+    def load(self, rules):
+        # Kuralları (yeniden) derle; etkin alarmlar sıfırlanır
+        self.rules = list(rules)
+        self.metrics = tuple(k for k in METRIC_KEYS if any(r.metric == k for r in self.rules))
+        self._compiled = {}  # (bcu, metrik) -> CompiledRules
+        self.active = {}
+        self._last = {}  # (kaynak, bcu, metrik) -> (değer, zaman saniye) hız hesabı için
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def _table(self, bcu, metric):
+        key = (bcu, metric)
+        table = self._compiled.get(key)
+        if table is None:
+            rules = [r for r in self.rules if r.metric == metric and r.bcu in (None, bcu)]
+            table = self._compiled[key] = CompiledRules(rules)
+        return table
+
+    def on_new_batch(self, frames):
+        if not self.rules:
+            return
+        cols = frames.metrics if hasattr(frames, "metrics") else frames
+        stamps = getattr(frames, "timestamps", None)
+        self.evaluate(cols, stamps, getattr(frames, "sources", None))
+
+    def evaluate(self, cols, timestamps_ns=None, sources=None):
+        """
+        cols: parse_metrics_batch çıktısı
+        timestamps_ns: kaynak paketlerin monotonic ns zamanları (cols["index"] ile eşlenir)
+        sources: paketlerin kaynak (cihaz) indeksleri (cols["index"] ile eşlenir; None = 0)
+        Dönüş: bu çağrıda oluşan AlarmEvent listesi
+        """
+        events = []
+        bcus, index = cols["bcu"], cols["index"]
+        if not len(index):
+            return events
+        mono_now = time.monotonic()
+        epoch_offset = time.time() - mono_now
+        table_of, active, last = self._table, self.active, self._last
+        for metric in self.metrics:
+            column = cols[metric]
+            for n, bcu in enumerate(bcus):
+                value = column[n]
+                source = sources[index[n]] if sources else 0
+                key = (source, bcu, metric)
+                table = table_of(bcu, metric)
+                prev = active.get(key, 0)
+                mask = table.raise_value.mask(value)
+                hold = table.hold_value.mask(value)
+                if table.rate_bits:
+                    t = timestamps_ns[index[n]] / 1e9 if timestamps_ns else mono_now
+                    before = last.get(key)
+                    if before is None:
+                        last[key] = (value, t)
+                    if before is not None and t - before[1] >= RATE_INTERVAL:
+                        last[key] = (value, t)
+                        rate = abs(value - before[0]) / (t - before[1])
+                        mask |= table.raise_rate.mask(rate)
+                        hold |= table.hold_rate.mask(rate)
+                    else:
+                        hold |= prev & table.rate_bits  # Hız hesaplanamıyorsa hız alarmları sürer
+                state = (prev & hold) | mask
+                if state != prev:
+                    active[key] = state
+                    t = timestamps_ns[index[n]] / 1e9 if timestamps_ns else mono_now
+                    self._emit(events, table, source, bcu, metric, value, state & ~prev, prev & ~state,
+                               t + epoch_offset)
+        for event in events:
+            for listener in self.listeners:
+                listener(event)
+        return events
+
+    @staticmethod
+    def _emit(events, table, source, bcu, metric, value, raised, cleared, timestamp):
+        for bits, is_raised in ((raised, True), (cleared, False)):
+            bit = 0
+            while bits:
+                if bits & 1:
+                    events.append(AlarmEvent(timestamp, source, bcu, metric, table.rules[bit], value, is_raised))
+                bits >>= 1
+                bit += 1
+
+    def active_alarms(self):
+        # Etkin alarmlar: [(kaynak, bcu, metrik, kural), ...]
+        out = []
+        for (source, bcu, metric), state in self.active.items():
+            rules = self._table(bcu, metric).rules
+            out.extend((source, bcu, metric, rules[b]) for b in range(len(rules)) if state >> b & 1)
+        return out
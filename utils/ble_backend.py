@@ -0,0 +1,16 @@
+# utils/ble_backend.py
+
+"""
+BLE arka ucu seçimi. Uygulama BleakClient / BleakScanner'ı yalnızca buradan alır;
+CAN2GO_SIMULATOR=1 ortam değişkeni ile gerçek bleak yerine simülatör kullanılır.
+"""
+
+import os  # Ortam değişkeni kontrolü
+
+USE_SIMULATOR = os.environ.get("CAN2GO_SIMULATOR", "") not in ("", "0")
+
+if USE_SIMULATOR:
+    from utils.simulator import SimulatedBleakClient as BleakClient  # noqa: F401
+    from utils.simulator import SimulatedBleakScanner as BleakScanner  # noqa: F401
+else:
+    from bleak import BleakClient, BleakScanner  # noqa: F401
@@ -0,0 +1,105 @@
+# utils/ble_worker.py
+
+"""
+Uygulama boyunca yaşayan tek BLE iş parçacığı ve tek asyncio event loop'u.
+Tüm BleakScanner / BleakClient nesneleri bu loop'ta oluşturulur ve kullanılır;
+UI tarafı işleri submit() ile gönderir ve concurrent.futures.Future alır.
+Böylece her tarama/bağlantı için yeni thread + loop kurulmaz ve istemci,
+sahibi olmayan bir loop'tan (ör. on_stop'ta asyncio.run) kullanılmaz.
+"""
+
+import asyncio  # Tek, kalıcı event loop
+import logging  # Loop hataları
+import threading  # Loop'u çalıştıran arka plan thread'i
+
+log = logging.getLogger("can2go.ble")
+
+
+class BleWorker:
+    def __init__(self, name="can2go-ble"):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        # Thread'i başlat ve loop hazır olana kadar bekle (tekrar çağrılırsa bir şey yapmaz)
+        with self._lock:
+            if self.running:
+                return self
+            self._ready.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_exception_handler(self._on_loop_error)
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    def _on_loop_error(self, loop, context):
+        log.warning("BLE loop hatası: %s", context.get("exception") or context.get("message"))
+
+    def submit(self, coro):
+        """
+        Korutini BLE loop'unda çalıştır; herhangi bir thread'den çağrılabilir.
+        Dönüş: concurrent.futures.Future (result(), add_done_callback(), cancel())
+        """
+        if not self.running:
+            self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, fn, *args):
+        # Senkron bir fonksiyonu BLE loop thread'inde çalıştır
+        if not self.running:
+            self.start()
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def stop(self, timeout=5.0):
+        """
+        Bekleyen görevleri iptal et, loop'u durdur ve thread'in bitmesini bekle.
+        Bağlantıların kapatılması (disconnect) stop'tan önce submit edilmelidir.
+        """
+        if not self.running:
+            return
+        loop = self.loop
+
+        async def _cancel_pending():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(_cancel_pending(), loop).result(timeout)
+        except Exception as e:
+            log.warning("BLE görevleri durdurulamadı: %s", e)
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_worker() -> BleWorker:
+    # Uygulama genelindeki tek BLE worker (ilk kullanımda başlatılır)
+    global _worker
+    with _worker_lock:
+        if _worker is None:
+            _worker = BleWorker()
+        return _worker.start()
@@ -0,0 +1,273 @@
+# utils/blf.py
+
+"""
+Vector BLF (Binary Logging Format) yazıcı ve okuyucu.
+Dosya yapısı: 144 baytlık "LOGG" başlığı + zlib ile sıkıştırılmış LOG_CONTAINER
+nesneleri; her konteynerin içinde "LOBJ" başlıklı CAN_MESSAGE / CAN_FD_MESSAGE
+nesneleri bulunur. CANalyzer/CANoe ve python-can ile açılabilir.
+"""
+
+import struct  # İkili başlık ve nesne yapıları
+import time  # Varsayılan zaman damgası
+import zlib  # Konteyner sıkıştırma
+from collections import namedtuple  # Okunan mesajlar için
+from datetime import datetime  # SYSTEMTIME dönüşümü
+
+FILE_HEADER_STRUCT = struct.Struct("<4sLBBBBBBBBQQLL8H8H")
+FILE_HEADER_SIZE = 144  # Başlık, yapı boyutundan sonra sıfırlarla doldurulur
+OBJ_HEADER_BASE_STRUCT = struct.Struct("<4sHHLL")  # imza, başlık boyu, sürüm, nesne boyu, tip
+OBJ_HEADER_V1_STRUCT = struct.Struct("<LHHQ")  # bayraklar, istemci no, nesne sürümü, zaman
+LOG_CONTAINER_STRUCT = struct.Struct("<H6xL4x")  # sıkıştırma yöntemi, açılmış boyut
+CAN_MSG_STRUCT = struct.Struct("<HBBL8s")  # kanal, bayraklar, dlc, ID, veri
+CAN_FD_MSG_STRUCT = struct.Struct("<HBBLLBBB5x64s")  # kanal, bayraklar, dlc, ID, süre, bit, fd bayrakları, geçerli bayt, veri
+APP_TEXT_STRUCT = struct.Struct("<LLL4x")  # kaynak, ayrılmış, metin uzunluğu
+
+CAN_MESSAGE = 1
+LOG_CONTAINER = 10
+APP_TEXT = 65
+CAN_FD_MESSAGE = 100
+
+NO_COMPRESSION = 0
+ZLIB_DEFLATE = 2
+
+TIME_TEN_MICS = 0x00000001
+TIME_ONE_NANS = 0x00000002
+
+CAN_MSG_EXT = 0x80000000  # Genişletilmiş (29 bit) ID bayrağı
+FD_EDL = 0x1  # CAN FD çerçevesi
+APPLICATION_ID = 5
+
+_OBJ_HEADER_SIZE = OBJ_HEADER_BASE_STRUCT.size + OBJ_HEADER_V1_STRUCT.size
+_CONTAINER_HEADER_SIZE = OBJ_HEADER_BASE_STRUCT.size + LOG_CONTAINER_STRUCT.size
+_FD_LENGTHS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 12, 16, 20, 24, 32, 48, 64)
+
+BLFMessage = namedtuple("BLFMessage", "timestamp channel arbitration_id is_extended data")
+
+
+class BLFParseError(Exception):
+    pass
+
+
+def _len2dlc(length):
+    # CAN FD veri uzunluğunu DLC koduna çevir (en yakın üst uzunluk)
+    for dlc, n in enumerate(_FD_LENGTHS):
+        if length <= n:
+            return dlc
+    return 15
+
+
+def _systemtime(timestamp):
+    # epoch saniye -> Windows SYSTEMTIME (yıl, ay, haftanın günü, gün, saat, dk, sn, ms)
+    t = datetime.fromtimestamp(timestamp)
+    return (t.year, t.month, t.isoweekday() % 7, t.day, t.hour, t.minute, t.second,
+            t.microsecond // 1000)
+
+
+def _from_systemtime(st):
+    year, month, _, day, hour, minute, second, ms = st
+    if year == 0:
+        return 0.0
+    return datetime(year, month, day, hour, minute, second, ms * 1000).timestamp()
+
+
+class BLFWriter:
+    """
+    Artımlı BLF yazıcı. Mesajlar bellekte bir konteyner dolana kadar biriktirilir,
+    ardından zlib ile sıkıştırılıp dosyaya yazılır. close() son konteyneri yazar
+    ve dosya başlığını (istatistikler) günceller.
+
+    f: ikili yazma + seek destekleyen dosya nesnesi
+    """
+
+    def __init__(self, f, channel=1, compression_level=6, max_container_size=128 * 1024):
+        self.file = f
+        self.channel = channel
+        self.compression_level = compression_level
+        self.max_container_size = max_container_size
+        self.start_timestamp = None
+        self.stop_timestamp = None
+        self.object_count = 0
+        self.uncompressed_size = FILE_HEADER_SIZE
+        self._buffer = []
+        self._buffer_size = 0
+        # Başlık için yer ayır; gerçek değerler close() sırasında yazılır
+        self._header_pos = f.tell()
+        f.write(b"\x00" * FILE_HEADER_SIZE)
+
+    def write(self, timestamp, data, arbitration_id=0, channel=None, is_extended=False):
+        """
+        Bir CAN mesajı ekle.
+        timestamp: epoch saniye; data: 8 bayta kadar CAN, 64 bayta kadar CAN FD olarak yazılır
+        """
+        arb_id = arbitration_id | CAN_MSG_EXT if is_extended else arbitration_id
+        channel = channel or self.channel
+        if len(data) <= 8:
+            payload = CAN_MSG_STRUCT.pack(channel, 0, len(data), arb_id, bytes(data))
+            self._add_object(CAN_MESSAGE, payload, timestamp)
+        else:
+            data = bytes(data[:64])
+            payload = CAN_FD_MSG_STRUCT.pack(channel, 0, _len2dlc(len(data)), arb_id, 0, 0,
+                                             FD_EDL, len(data), data)
+            self._add_object(CAN_FD_MESSAGE, payload, timestamp)
+
+    def write_text(self, timestamp, text, source=0):
+        # Açıklama/işaret nesnesi (APP_TEXT) ekle; CAN okuyucuları bunu atlar
+        encoded = text.encode("utf-8")
+        self._add_object(APP_TEXT, APP_TEXT_STRUCT.pack(source, 0, len(encoded)) + encoded, timestamp)
+
+    def _add_object(self, obj_type, payload, timestamp=None):
+        if timestamp is None:
+            timestamp = self.stop_timestamp or time.time()
+        if self.start_timestamp is None:
+            # Başlıktaki başlangıç zamanı milisaniye hassasiyetinde; farklar buna göre hesaplanır
+            self.start_timestamp = int(timestamp * 1000) / 1000
+        self.stop_timestamp = timestamp
+        rel_ns = max(int(round((timestamp - self.start_timestamp) * 1e9)), 0)
+        obj_size = _OBJ_HEADER_SIZE + len(payload)
+        self._buffer.append(OBJ_HEADER_BASE_STRUCT.pack(b"LOBJ", _OBJ_HEADER_SIZE, 1, obj_size, obj_type))
+        self._buffer.append(OBJ_HEADER_V1_STRUCT.pack(TIME_ONE_NANS, 0, 0, rel_ns))
+        self._buffer.append(payload)
+        padding = obj_size % 4
+        if padding:
+            self._buffer.append(b"\x00" * padding)
+        self._buffer_size += obj_size + padding
+        self.object_count += 1
+        if self._buffer_size >= self.max_container_size:
+            self.flush()
+
+    def flush(self):
+        # Biriken nesneleri tek bir sıkıştırılmış konteyner olarak yaz
+        if not self._buffer:
+            return
+        raw = b"".join(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+        compressed = zlib.compress(raw, self.compression_level)
+        obj_size = _CONTAINER_HEADER_SIZE + len(compressed)
+        self.file.write(OBJ_HEADER_BASE_STRUCT.pack(b"LOBJ", OBJ_HEADER_BASE_STRUCT.size, 1, obj_size, LOG_CONTAINER))
+        self.file.write(LOG_CONTAINER_STRUCT.pack(ZLIB_DEFLATE, len(raw)))
+        self.file.write(compressed)
+        self.file.write(b"\x00" * (obj_size % 4))
+        self.uncompressed_size += _CONTAINER_HEADER_SIZE + len(raw)
+
+    def close(self):
+        # Son konteyneri yaz ve dosya başlığını istatistiklerle güncelle
+        self.flush()
+        end = self.file.tell()
+        start = self.start_timestamp or time.time()
+        stop = self.stop_timestamp or start
+        header = FILE_HEADER_STRUCT.pack(
+            b"LOGG", FILE_HEADER_SIZE, APPLICATION_ID, 0, 0, 0, 2, 6, 8, 1,
+            end - self._header_pos, self.uncompressed_size, self.object_count, 0,
+            *_systemtime(start), *_systemtime(stop)
+        )
+        self.file.seek(self._header_pos)
+        self.file.write(header)
+        self.file.seek(end)
+
+
+class BLFReader:
+    """
+    BLF dosyasındaki CAN / CAN FD mesajlarını sırayla okur.
+    Diğer nesne tipleri atlanır; konteyner sınırını aşan nesneler desteklenir.
+    """
+
+    def __init__(self, f):
+        self.file = f
+        header = f.read(FILE_HEADER_SIZE)
+        if len(header) < FILE_HEADER_STRUCT.size or header[:4] != b"LOGG":
+            raise BLFParseError("BLF başlığı bulunamadı")
+        fields = FILE_HEADER_STRUCT.unpack_from(header)
+        header_size = fields[1]
+        self.file_size = fields[10]
+        self.uncompressed_size = fields[11]
+        self.object_count = fields[12]
+        self.start_timestamp = _from_systemtime(fields[14:22])
+        self.stop_timestamp = _from_systemtime(fields[22:30])
+        # Başlık 144 bayttan uzunsa kalanı atla
+        if header_size > FILE_HEADER_SIZE:
+            f.read(header_size - FILE_HEADER_SIZE)
+
+    def containers(self):
+        # Dosyadaki her nesneyi açılmış (uncompressed) içerik olarak döndür
+        f = self.file
+        while True:
+            base = f.read(OBJ_HEADER_BASE_STRUCT.size)
+            if len(base) < OBJ_HEADER_BASE_STRUCT.size:
+                return
+            signature, _, _, obj_size, obj_type = OBJ_HEADER_BASE_STRUCT.unpack(base)
+            if signature != b"LOBJ":
+                raise BLFParseError("Geçersiz nesne imzası")
+            body = f.read(obj_size - OBJ_HEADER_BASE_STRUCT.size)
+            f.read(obj_size % 4)  # Dolgu baytları
+            if obj_type != LOG_CONTAINER:
+                # Konteyner dışı nesne: başlığıyla birlikte olduğu gibi döndür
+                yield base + body
+                continue
+            method, _ = LOG_CONTAINER_STRUCT.unpack_from(body)
+            data = body[LOG_CONTAINER_STRUCT.size:]
+            yield zlib.decompress(data) if method == ZLIB_DEFLATE else data
+
+    def __iter__(self):
+        tail = b""
+        for chunk in self.containers():
+            data = tail + chunk if tail else chunk
+            pos = 0
+            end = len(data)
+            while pos + OBJ_HEADER_BASE_STRUCT.size <= end:
+                signature, header_size, header_version, obj_size, obj_type = \
+                    OBJ_HEADER_BASE_STRUCT.unpack_from(data, pos)
+                if signature != b"LOBJ":
+                    raise BLFParseError("Geçersiz nesne imzası")
+                next_pos = pos + obj_size + obj_size % 4
+                if pos + obj_size > end:
+                    break  # Nesnenin devamı sonraki konteynerde
+                message = self._parse(data, pos, header_size, header_version, obj_type)
+                if message is not None:
+                    yield message
+                pos = next_pos
+            tail = data[pos:] if pos < end else b""
+
+    def _parse(self, data, pos, header_size, header_version, obj_type):
+        if obj_type not in (CAN_MESSAGE, CAN_FD_MESSAGE):
+            return None
+        flags, _, _, ts = OBJ_HEADER_V1_STRUCT.unpack_from(data, pos + OBJ_HEADER_BASE_STRUCT.size)
+        factor = 1e-5 if flags == TIME_TEN_MICS else 1e-9
+        timestamp = self.start_timestamp + ts * factor
+        body = pos + header_size
+        if obj_type == CAN_MESSAGE:
+            channel, _, dlc, arb_id, payload = CAN_MSG_STRUCT.unpack_from(data, body)
+            payload = payload[:min(dlc, 8)]
+        else:
+            channel, _, _, arb_id, _, _, _, valid, payload = CAN_FD_MSG_STRUCT.unpack_from(data, body)
+            payload = payload[:valid]
+        return BLFMessage(timestamp, channel, arb_id & 0x1FFFFFFF, bool(arb_id & CAN_MSG_EXT), payload)
+
+
+class BLFLogFormat:
+    """
+    StreamingLogWriter için BLF formatı: kayıtlar artımlı olarak BLFWriter'a beslenir.
+    Her cihaz (kaynak) ayrı bir BLF kanalına yazılır: kanal = channel + kaynak indeksi.
+    CAN ID'si bilinen kayıtlar (çok çerçeveli bildirimler) kendi ID'leriyle yazılır.
+    """
+
+    def __init__(self, arbitration_id=0, channel=1):
+        self.arbitration_id = arbitration_id
+        self.channel = channel
+        self.writer = None
+
+    def begin(self, f):
+        self.writer = BLFWriter(f, channel=self.channel)
+
+    def write(self, f, records):
+        write = self.writer.write
+        arb_id = self.arbitration_id
+        channel = self.channel
+        for ts, data, source, frame_id in records:
+            write(ts, data, arb_id if frame_id is None else frame_id, channel + source)
+
+    def mark(self, f, timestamp, text):
+        self.writer.write_text(timestamp, text)
+
+    def end(self, f):
+        self.writer.close()
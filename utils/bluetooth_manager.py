@@ -1,41 +1,197 @@
 # utils/bluetooth_manager.py
 
 import asyncio
-from bleak import BleakClient
+import logging  # Seviye kontrollü, örneklemeli paket logu
+import random  # Yeniden bağlanma beklemesinde jitter
+import time  # Kopma anı ve veri gelene kadar geçen süre
+from utils.ble_backend import BleakClient  # Gerçek bleak ya da simülatör
+from utils.framing import FrameUnpacker, is_framed  # Çok çerçeveli bildirimler
+from utils.instrumentation import STATS  # Paket/bayt sayaçları
+
+log = logging.getLogger("can2go.ble")
+
+PACKET_LOG_SAMPLE = 1000  # DEBUG seviyesinde her N pakette bir paket içeriği loglanır
+CONNECT_TIMEOUT = 10.0  # Tek bağlantı denemesi için süre sınırı (saniye)
+RECONNECT_BASE_DELAY = 0.25  # İkinci denemeden önceki bekleme; her denemede iki katına çıkar
+RECONNECT_MAX_DELAY = 15.0  # Bekleme üst sınırı
+
+
+class NotifyError(Exception):
+    # Cihaza bağlanıldı ama bildirimlere abone olunamadı (bağlantı kapatıldı)
+    pass
+
 
 class BluetoothManager:
-    def __init__(self):
+    """
+    Tek cihaz bağlantısı ve bağlantı gözetimi (supervisor).
+    Beklenmeyen kopmada aynı istemci nesnesiyle, taramaya gerek kalmadan,
+    üstel bekleme + jitter ile yeniden bağlanır ve karakteristiğe yeniden abone olur.
+    Kopmadan ilk veriye kadar geçen süre "ble.time_to_data" histogramına yazılır ve
+    gap_callback(başlangıç_epoch, bitiş_epoch) ile bildirilir (ör. loga işaret koymak için).
+    status_callback(bağlı_mı) bağlantı durumu her değiştiğinde çağrılır.
+    Çok çerçeveli bildirimler (utils/framing.py) kopyalanmadan açılır ve
+    frames_callback(çerçeveler, ID'ler) ile tek seferde iletilir; frames_callback
+    yoksa her çerçeve notify_callback'e ayrı ayrı verilir.
+    Tüm callback'ler BLE thread'inde çağrılır.
+    """
+
+    def __init__(self, auto_reconnect=True):
         self.client = None
         self.connected = False
         self.notify_callback = None
+        self.frames_callback = None
+        self.unpacker = FrameUnpacker()
+        self.gap_callback = None
+        self.status_callback = None
+        self.auto_reconnect = auto_reconnect
+        self.address = None
+        self.characteristic_uuid = None
+        self._loop = None
+        self._closing = False  # Kullanıcı bağlantıyı kendisi kapatıyor: yeniden bağlanma
+        self._reconnect_task = None
+        self._dropped_at = None  # (monotonic, epoch) kopma anı; ilk veriyle temizlenir
+        self._rng = random.Random()
+        self._packets = STATS.counter("ble.packets")
+        self._bytes = STATS.counter("ble.bytes")
+        self._frames = STATS.counter("ble.frames")
+        self._lost = STATS.counter("ble.lost_notifications")
+        self._drops = STATS.counter("ble.disconnects")
+        self._reconnects = STATS.counter("ble.reconnects")
+        self._time_to_data = STATS.histogram("ble.time_to_data")
 
     async def connect_and_listen_fixed_address(self, address, characteristic_uuid, notify_callback):
         """
         Belirli bir Bluetooth adresine bağlanır ve karakteristik UUID'den veri dinler.
         """
         self.notify_callback = notify_callback
-        self.client = BleakClient(address)
+        self.address = address
+        self.characteristic_uuid = characteristic_uuid
+        self._loop = asyncio.get_running_loop()
+        self._closing = False
+        self._dropped_at = None
+        self.client = BleakClient(address, disconnected_callback=self._on_disconnected)
 
         try:
-            await self.client.connect()
-            self.connected = await self.client.is_connected()
-            print(f"✅ Bağlantı durumu: {self.connected}")
+            await self._open()
+        except Exception as e:
+            log.warning("⚠️ Bağlantı hatası: %s", e)
+            self.connected = False
+            self._report_status()
+            # Cihaz erişilebilir ama abonelik başarısız: gözetim yeniden denesin
+            if isinstance(e, NotifyError) and self.auto_reconnect and self._reconnect_task is None:
+                self._reconnect_task = self._loop.create_task(self._reconnect())
 
-            # notify başlat
-            await self.client.start_notify(characteristic_uuid, self._notification_handler)
-            print(f"🔔 Dinlemeye başlandı: {characteristic_uuid}")
+    async def _open(self):
+        # Bağlı değilse bağlan, ardından bildirimlere abone ol. Aynı istemci nesnesi
+        # tekrar kullanıldığından bleak cihazı yeniden taramak zorunda kalmaz.
+        # connected yalnızca abonelik de başarılıysa True olur.
+        if not self.client.is_connected:
+            await self.client.connect(timeout=CONNECT_TIMEOUT)
+        self.unpacker.reset()
+        log.info("✅ Bağlandı: %s", self.address)
 
+        # notify başlat; başarısızsa yarım kalan bağlantı kapatılır (veri gelmeyen açık bağlantı kalmasın)
+        try:
+            await self.client.start_notify(self.characteristic_uuid, self._notification_handler)
         except Exception as e:
-            print(f"⚠️ Bağlantı hatası: {e}")
-            self.connected = False
+            try:
+                await self.client.disconnect()
+            except Exception:
+                pass
+            raise NotifyError(f"Bildirim aboneliği başarısız: {e}") from e
+        self.connected = True
+        log.info("🔔 Dinlemeye başlandı: %s", self.characteristic_uuid)
+        self._report_status()
 
     async def disconnect(self):
+        self._closing = True
+        task, self._reconnect_task = self._reconnect_task, None
+        if task:
+            task.cancel()
         if self.client and self.connected:
             await self.client.disconnect()
             self.connected = False
-            print("🔌 Bağlantı sonlandırıldı.")
+            log.info("🔌 Bağlantı sonlandırıldı.")
+            self._report_status()
+
+    def _on_disconnected(self, client):
+        # bleak arka ucuna göre farklı bir thread'den de gelebilir: işi BLE loop'una taşı
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._handle_drop, client)
+
+    def _handle_drop(self, client):
+        # Bağlı sayılmayan bir bağlantının kopması (başarısız deneme) kendi hatasıyla ele alınır
+        if client is not self.client or self._closing or not self.connected:
+            return
+        self.connected = False
+        self._drops.add()
+        if self._dropped_at is None:
+            self._dropped_at = (time.monotonic(), time.time())
+        log.warning("⚠️ Bağlantı koptu: %s", self.address)
+        self._report_status()
+        if self.auto_reconnect and self._reconnect_task is None:
+            self._reconnect_task = self._loop.create_task(self._reconnect())
+
+    async def _reconnect(self):
+        attempt = 0
+        try:
+            while not self._closing and not self.connected:
+                delay = self._backoff(attempt)
+                if delay:
+                    await asyncio.sleep(delay)
+                attempt += 1
+                try:
+                    await self._open()
+                    self._reconnects.add()
+                    log.info("🔁 Yeniden bağlanıldı (%d. deneme)", attempt)
+                except Exception as e:
+                    self.connected = False
+                    log.info("Yeniden bağlanma denemesi %d başarısız: %s", attempt, e)
+        finally:
+            self._reconnect_task = None
+
+    def _backoff(self, attempt):
+        # İlk deneme beklemesiz (çoğu kopma anlık); sonrakiler üstel artar ve
+        # aynı anda kopan cihazlar senkron denemesin diye [üst/2, üst] aralığına dağıtılır
+        if attempt == 0:
+            return 0.0
+        cap = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** (attempt - 1))
+        return self._rng.uniform(cap / 2, cap)
+
+    def _report_status(self):
+        if self.status_callback:
+            self.status_callback(self.connected)
+
+    def _data_resumed(self):
+        # Kopmadan sonraki ilk paket: kesinti süresini ölç ve bildir
+        dropped_mono, dropped_epoch = self._dropped_at
+        self._dropped_at = None
+        self._time_to_data.record(int((time.monotonic() - dropped_mono) * 1e9))
+        log.info("📶 Veri akışı %.2f s sonra yeniden başladı", time.monotonic() - dropped_mono)
+        if self.gap_callback:
+            self.gap_callback(dropped_epoch, time.time())
 
     def _notification_handler(self, sender, data: bytearray):
-        print(f"📥 Veri alındı ({sender}): {data.hex()}")
+        # Sayaçlar her pakette, içerik logu yalnızca örneklenerek (hex biçimleme pahalı)
+        self._packets.add()
+        self._bytes.add(len(data))
+        if self._dropped_at is not None:
+            self._data_resumed()
+        if self._packets.value % PACKET_LOG_SAMPLE == 1 and log.isEnabledFor(logging.DEBUG):
+            log.debug("📥 Veri alındı (%s): %s [#%d]", sender, data.hex(), self._packets.value)
+        if is_framed(data):
+            # Çok çerçeveli bildirim: memoryview dilimleri, kopya yok
+            lost = self.unpacker.lost
+            frames, ids = self.unpacker.unpack(data)
+            self._frames.add(len(frames))
+            if self.unpacker.lost != lost:
+                self._lost.add(self.unpacker.lost - lost)
+            if self.frames_callback:
+                self.frames_callback(frames, ids)
+            elif self.notify_callback:
+                for frame in frames:
+                    self.notify_callback(bytes(frame))
+            return
+        self._frames.add()
         if self.notify_callback:
             self.notify_callback(bytes(data))
@@ -0,0 +1,109 @@
+# utils/capture.py
+
+import threading  # BLE thread'i (yazan) ile yazıcı thread (okuyan) arasında indeks koruması
+import time  # Monotonic nanosaniye zaman damgaları
+from array import array  # Önceden ayrılmış tipli diziler
+
+
+class CaptureBuffer:
+    """
+    Kayıpsız (full-rate) yakalama tamponu.
+    Her bildirim doğrudan BLE thread'inden, monotonic nanosaniye zaman damgasıyla
+    önceden ayrılmış bir bellek bloğuna (slab) kopyalanır; paket başına nesne
+    oluşturulmaz. Okuyucu drain() ile biriken kayıtları toplu olarak alır.
+
+    capacity: okunmadan tutulabilecek en fazla paket sayısı (dolarsa yeni paket sayılıp atılır)
+    slot_size: paket başına ayrılan bayt (uzun paketler kırpılır; 64 = CAN FD)
+    """
+
+    def __init__(self, capacity=65536, slot_size=64):
+        self.capacity = capacity
+        self.slot_size = slot_size
+        self.timestamps = array('q', bytes(8 * capacity))  # time.monotonic_ns
+        self.lengths = array('H', bytes(2 * capacity))
+        self.sources = array('B', bytes(capacity))  # Paketin geldiği cihaz (kaynak indeksi)
+        self.ids = array('i', bytes(4 * capacity))  # CAN ID (-1: eski tek paketli bildirim, ID yok)
+        self.slab = bytearray(capacity * slot_size)
+        self._view = memoryview(self.slab)
+        self._head = 0  # Toplam yazılan paket
+        self._tail = 0  # Toplam okunan paket
+        self.dropped = 0  # Tampon dolu olduğu için kaybolan paketler
+        self.truncated = 0  # slot_size'a sığmadığı için kırpılan paketler
+        # Monotonic saatten epoch saatine dönüşüm farkı (ns)
+        self.epoch_offset_ns = time.time_ns() - time.monotonic_ns()
+        self._lock = threading.Lock()
+
+    def append(self, data, source=0, frame_id=None) -> bool:
+        # BLE thread'inde çağrılır: paketi zaman damgasıyla sıradaki yuvaya kopyala
+        ts = time.monotonic_ns()
+        n = len(data)
+        if n > self.slot_size:
+            n = self.slot_size
+            data = data[:n]
+            self.truncated += 1
+        with self._lock:
+            if self._head - self._tail >= self.capacity:
+                self.dropped += 1
+                return False
+            i = self._head % self.capacity
+            off = i * self.slot_size
+            self._view[off:off + n] = data
+            self.timestamps[i] = ts
+            self.lengths[i] = n
+            self.sources[i] = source
+            self.ids[i] = -1 if frame_id is None else frame_id
+            self._head += 1
+        return True
+
+    def extend(self, frames, ids, source=0) -> int:
+        # Tek bildirimden açılan çerçeveleri aynı zaman damgası ve tek kilitle yaz
+        ts = time.monotonic_ns()
+        cap, slot, view = self.capacity, self.slot_size, self._view
+        with self._lock:
+            free = cap - (self._head - self._tail)
+            if free < len(frames):
+                self.dropped += len(frames) - free
+                frames = frames[:free]
+            head = self._head
+            for data, frame_id in zip(frames, ids):
+                n = len(data)
+                if n > slot:
+                    n = slot
+                    data = data[:n]
+                    self.truncated += 1
+                i = head % cap
+                off = i * slot
+                view[off:off + n] = data
+                self.timestamps[i] = ts
+                self.lengths[i] = n
+                self.sources[i] = source
+                self.ids[i] = frame_id
+                head += 1
+            written = head - self._head
+            self._head = head
+        return written
+
+    def drain(self):
+        """
+        Okunmamış tüm kayıtları döndürür: [(epoch saniye, bytes, kaynak, CAN ID ya da None), ...]
+        Yazan taraf okunmamış yuvalara dokunmadığı için kopyalama kilit dışında yapılır.
+        """
+        with self._lock:
+            tail, head = self._tail, self._head
+        if tail == head:
+            return []
+        cap, slot, off_ns = self.capacity, self.slot_size, self.epoch_offset_ns
+        ts, lengths, sources, ids, view = self.timestamps, self.lengths, self.sources, self.ids, self._view
+        records = []
+        for k in range(tail, head):
+            i = k % cap
+            o = i * slot
+            fid = ids[i]
+            records.append(((ts[i] + off_ns) / 1e9, bytes(view[o:o + lengths[i]]), sources[i],
+                            None if fid < 0 else fid))
+        with self._lock:
+            self._tail = head
+        return records
+
+    def __len__(self):
+        return self._head - self._tail
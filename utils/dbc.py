@@ -0,0 +1,343 @@
+# utils/dbc.py
+
+"""
+DBC tabanlı CAN sinyal çözücü.
+DBC dosyasındaki her mesaj, yüklenirken bir kez "derlenir":
+- Tekil çözüm için mesaja özel bir Python fonksiyonu üretilir (kaydırma, maske,
+  işaret, ölçek ve ofset sabit olarak gömülür; çalışırken DBC yorumlanmaz).
+- Toplu (sütunlu) çözüm için her sinyale bir çıkarma planı atanır: tek bayta
+  sığan sinyaller 256 girdilik tablo (bytes.translate / map), bayt hizalı 16 bit
+  sinyaller dilim + byteswap ile, diğerleri genel tamsayı yoluyla çözülür.
+Çoğullanmış (multiplexed) sinyaller desteklenir; toplu çözümde ilgili satırda
+bulunmayan değer NaN olur.
+
+Desteklenen DBC alt kümesi: BO_, SG_ (Intel/Motorola, işaretli/işaretsiz, M / mN).
+"""
+
+import re  # DBC satırlarını ayrıştırmak için
+import sys  # Platform bayt sırası kontrolü
+from array import array  # Sütun sonuçları için tipli diziler
+from collections import namedtuple  # Sinyal ve mesaj tanımları
+
+Signal = namedtuple(
+    "Signal", "name start length little_endian signed factor offset minimum maximum unit multiplexer")
+# multiplexer: None (normal), "M" (çoğullayıcı) ya da çoğullayıcı değeri (int)
+
+NAN = float("nan")
+CAN_EFF_FLAG = 0x80000000  # DBC'de genişletilmiş (29 bit) ID işareti
+
+_BO = re.compile(r"^BO_\s+(\d+)\s+(\w+)\s*:\s*(\d+)\s+(\S+)")
+_SG = re.compile(
+    r"^SG_\s+(\w+)\s*(M|m\d+)?\s*:\s*(\d+)\|(\d+)@([01])([+-])\s*"
+    r"\(\s*([^,]+?)\s*,\s*([^)]+?)\s*\)\s*\[\s*([^|]*?)\s*\|\s*([^\]]*?)\s*\]\s*\"([^\"]*)\"")
+
+
+class DBCParseError(Exception):
+    pass
+
+
+class Message:
+    def __init__(self, frame_id, name, size, sender, is_extended=False):
+        self.frame_id = frame_id
+        self.name = name
+        self.size = size  # Bayt (DLC)
+        self.sender = sender
+        self.is_extended = is_extended
+        self.signals = []
+
+    @property
+    def multiplexer(self):
+        for s in self.signals:
+            if s.multiplexer == "M":
+                return s
+        return None
+
+    def __repr__(self):
+        return f"Message({self.frame_id:#x}, {self.name!r}, {len(self.signals)} sinyal)"
+
+
+def _number(text):
+    value = float(text)
+    return int(value) if value.is_integer() and "e" not in text.lower() and "." not in text else value
+
+
+def parse_dbc(text):
+    """
+    DBC metnini ayrıştırır. Dönüş: CANDatabase
+    """
+    messages = []
+    current = None
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.strip()
+        if line.startswith("BO_ "):
+            m = _BO.match(line)
+            if not m:
+                raise DBCParseError(f"{lineno}. satır: geçersiz BO_ tanımı")
+            raw_id = int(m.group(1))
+            current = Message(raw_id & ~CAN_EFF_FLAG, m.group(2), int(m.group(3)), m.group(4),
+                              bool(raw_id & CAN_EFF_FLAG))
+            messages.append(current)
+        elif line.startswith("SG_ "):
+            m = _SG.match(line)
+            if not m or current is None:
+                raise DBCParseError(f"{lineno}. satır: geçersiz SG_ tanımı")
+            name, mux, start, length, order, sign, factor, offset, lo, hi, unit = m.groups()
+            if mux and mux != "M":
+                mux = int(mux[1:])
+            current.signals.append(Signal(
+                name, int(start), int(length), order == "1", sign == "-",
+                _number(factor), _number(offset),
+                _number(lo) if lo else None, _number(hi) if hi else None, unit, mux))
+        elif not line:
+            current = None
+    return CANDatabase(messages)
+
+
+def load_dbc(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        return parse_dbc(f.read())
+
+
+def _lsb(signal, size):
+    """
+    Sinyalin en düşük anlamlı bitinin, mesajın tamsayı gösterimindeki konumu.
+    Intel: little-endian tamsayı, Motorola: big-endian tamsayı üzerinden.
+    """
+    if signal.little_endian:
+        return signal.start
+    byte, bit = divmod(signal.start, 8)
+    return (size - 1 - byte) * 8 + bit - signal.length + 1
+
+
+def _byte_span(signal, size):
+    # Sinyalin kapladığı bayt aralığı [ilk, son]
+    lsb = _lsb(signal, size)
+    msb = lsb + signal.length - 1
+    if signal.little_endian:
+        return lsb // 8, msb // 8
+    return size - 1 - msb // 8, size - 1 - lsb // 8
+
+
+def _physical(signal, raw):
+    if signal.signed and raw & (1 << (signal.length - 1)):
+        raw -= 1 << signal.length
+    return raw * signal.factor + signal.offset
+
+
+def contiguous_frames(frames, size, stride=None):
+    """
+    Girdiyi sabit adımlı (stride) tek bir tampona çevirir.
+    frames: bytes benzeri bitişik tampon veya paket listesi.
+    Dönüş: (tampon, adım, kayıt sayısı, kaynak indeksleri)
+    """
+    if isinstance(frames, (bytes, bytearray, memoryview)):
+        buf = bytes(frames)
+        stride = stride or size
+        count = (len(buf) - size) // stride + 1 if len(buf) >= size else 0
+        return buf, stride, count, range(count)
+    # Liste: kısa paketleri atla, her paketin ilk `size` baytını birleştir
+    index = array('I', (i for i, f in enumerate(frames) if len(f) >= size))
+    if len(index) == len(frames):
+        buf = b"".join(f[:size] for f in frames)
+    else:
+        buf = b"".join(frames[i][:size] for i in index)
+    return buf, size, len(index), index
+
+
+class MessageDecoder:
+    """
+    Tek mesaj için derlenmiş çözücü.
+    decode(data): {sinyal: değer} (kısa paket için None)
+    decode_batch(frames, stride=None): sinyal sütunları + "index"
+    """
+
+    def __init__(self, message):
+        self.message = message
+        self.decode = self._compile_single()
+        self._plans = [self._plan(s) for s in message.signals]
+
+    # --- Tekil çözüm: mesaja özel üretilmiş fonksiyon ---
+
+    def _compile_single(self):
+        msg = self.message
+        size = msg.size
+        lines = ["def decode(data):", f"    if len(data) < {size}:", "        return None"]
+        if any(s.little_endian for s in msg.signals):
+            lines.append(f"    le = int.from_bytes(data[:{size}], 'little')")
+        if any(not s.little_endian for s in msg.signals):
+            lines.append(f"    be = int.from_bytes(data[:{size}], 'big')")
+        lines.append("    r = {}")
+        mux = msg.multiplexer
+        ordered = sorted(msg.signals, key=lambda s: s.multiplexer != "M")
+        for s in ordered:
+            src = "le" if s.little_endian else "be"
+            expr = f"({src} >> {_lsb(s, size)}) & {(1 << s.length) - 1:#x}"
+            indent = "    "
+            if isinstance(s.multiplexer, int) and mux is not None:
+                lines.append(f"    if mux == {s.multiplexer}:")
+                indent = "        "
+            lines.append(f"{indent}v = {expr}")
+            if s.signed:
+                lines.append(f"{indent}if v & {1 << (s.length - 1):#x}:")
+                lines.append(f"{indent}    v -= {1 << s.length:#x}")
+            if s.multiplexer == "M":
+                lines.append(f"{indent}mux = v")
+            scaled = "v"
+            if s.factor != 1:
+                scaled = f"v * {s.factor!r}"
+            if s.offset != 0:
+                scaled = f"{scaled} + {s.offset!r}"
+            lines.append(f"{indent}r[{s.name!r}] = {scaled}")
+        lines.append("    return r")
+        namespace = {}
+        exec("\n".join(lines), namespace)  # Derleme: yalnızca yükleme sırasında bir kez
+        return namespace["decode"]
+
+    # --- Toplu çözüm: sinyal başına çıkarma planı ---
+
+    def _plan(self, s):
+        size = self.message.size
+        first, last = _byte_span(s, size)
+        if s.multiplexer is None or s.multiplexer == "M":
+            if first == last:
+                return self._byte_table_plan(s, first)
+            if s.length == 16 and last == first + 1 and _lsb(s, size) % 8 == 0:
+                return self._word_plan(s, first)
+        return self._generic_plan(s)
+
+    def _byte_table_plan(self, s, byte):
+        # Sinyal tek bayta sığıyor: bayt değeri -> fiziksel değer tablosu
+        size = self.message.size
+        shift = _lsb(s, size) - ((byte * 8) if s.little_endian else (size - 1 - byte) * 8)
+        mask = (1 << s.length) - 1
+        values = [_physical(s, (v >> shift) & mask) for v in range(256)]
+        if all(isinstance(v, int) for v in values):
+            if all(0 <= v <= 255 for v in values):
+                table = bytes(values)
+                return lambda buf, end, stride: array('B', buf[byte:end:stride].translate(table))
+            if all(-32768 <= v <= 32767 for v in values):
+                return lambda buf, end, stride: array('h', map(values.__getitem__, buf[byte:end:stride]))
+        values = [float(v) for v in values]
+        return lambda buf, end, stride: array('d', map(values.__getitem__, buf[byte:end:stride]))
+
+    def _word_plan(self, s, first):
+        # Bayt hizalı 16 bit: dilimlerle topla, platform sırasına çevir, ölçekle
+        hi, lo = (first + 1, first) if s.little_endian else (first, first + 1)
+        code = 'h' if s.signed else 'H'
+        factor, offset = s.factor, s.offset
+        inverse = 1 / factor if factor else 0
+        divisor = round(inverse) if factor and factor != 1 and abs(inverse - round(inverse)) < 1e-9 else None
+
+        def extract(buf, end, stride):
+            count = (end // stride) if stride else 0
+            raw = bytearray(2 * count)
+            raw[0::2] = buf[hi:end:stride]  # big-endian sıra: önce yüksek bayt
+            raw[1::2] = buf[lo:end:stride]
+            words = array(code)
+            words.frombytes(raw)
+            if sys.byteorder == "little":
+                words.byteswap()
+            if factor == 1 and offset == 0:
+                return words
+            if divisor:
+                # 0.01 gibi ölçekler bölme ile uygulanır (ondalık değerler tam çıkar)
+                values = array('d', map(float(divisor).__rtruediv__, words))
+            else:
+                values = array('d', map(float(factor).__mul__, words))
+            if offset:
+                values = array('d', map(float(offset).__add__, values))
+            return values
+        return extract
+
+    def _generic_plan(self, s):
+        # Genel yol: satır başına tamsayı çıkarma (çoğullanmış ve hizasız sinyaller)
+        size = self.message.size
+        order = "little" if s.little_endian else "big"
+        shift, mask = _lsb(s, size), (1 << s.length) - 1
+        mux = self.message.multiplexer
+        mux_plan = None
+        if isinstance(s.multiplexer, int) and mux is not None:
+            mux_order = "little" if mux.little_endian else "big"
+            mux_shift, mux_mask = _lsb(mux, size), (1 << mux.length) - 1
+            mux_value = s.multiplexer
+            mux_plan = (mux_order, mux_shift, mux_mask, mux_value)
+
+        def extract(buf, end, stride):
+            out = array('d')
+            for o in range(0, end, stride):
+                frame = buf[o:o + size]
+                if mux_plan and (int.from_bytes(frame, mux_plan[0]) >> mux_plan[1]) & mux_plan[2] != mux_plan[3]:
+                    out.append(NAN)
+                    continue
+                out.append(_physical(s, (int.from_bytes(frame, order) >> shift) & mask))
+            return out
+        return extract
+
+    def decode_batch(self, frames, stride=None, ids=None):
+        """
+        Çok sayıda paketi tek seferde çözer.
+        frames: paket listesi veya bitişik tampon (stride: kayıt başına bayt, varsayılan DLC)
+        ids: frames ile aynı sırada çerçeve ID'leri (liste girdisi için); verilirse yalnızca
+             bu mesajın ID'sini ya da ID'si bilinmeyen (None) çerçeveler çözülür
+        Dönüş: {sinyal: sütun, ..., "index": kaynak sırası}; DLC'den kısa paketler atlanır.
+        """
+        positions = None
+        if ids is not None:
+            frame_id = self.message.frame_id
+            positions = [i for i, fid in enumerate(ids) if fid is None or fid == frame_id]
+            if len(positions) == len(frames):
+                positions = None
+            else:
+                frames = [frames[i] for i in positions]
+        buf, stride, count, index = contiguous_frames(frames, self.message.size, stride)
+        end = count * stride
+        columns = {s.name: plan(buf, end, stride) for s, plan in zip(self.message.signals, self._plans)}
+        columns["index"] = index if positions is None else array('I', (positions[i] for i in index))
+        return columns
+
+
+class CANDatabase:
+    """
+    Derlenmiş mesajlar. ID ya da ad ile çözücüye O(1) erişim.
+    """
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.decoders = {}  # ID -> MessageDecoder
+        self._by_name = {}
+        for msg in self.messages:
+            decoder = MessageDecoder(msg)
+            self.decoders[msg.frame_id] = decoder
+            self._by_name[msg.name] = decoder
+        # ID -> derlenmiş tekil çözüm fonksiyonu (sıcak yol için düz sözlük)
+        self._decode_fns = {fid: d.decode for fid, d in self.decoders.items()}
+
+    def decoder(self, name_or_id):
+        d = self._by_name.get(name_or_id) if isinstance(name_or_id, str) else self.decoders.get(name_or_id)
+        if d is None:
+            raise KeyError(f"DBC'de mesaj yok: {name_or_id}")
+        return d
+
+    def decode(self, frame_id, data):
+        # Tek çerçeve: ID'ye göre derlenmiş fonksiyona dağıt (bilinmeyen ID için None)
+        fn = self._decode_fns.get(frame_id)
+        return fn(data) if fn else None
+
+    def decode_grouped(self, frames, ids):
+        """
+        Farklı ID'li çerçeveleri toplu çözer.
+        ids: frames ile aynı sırada çerçeve ID'leri
+        Dönüş: {mesaj adı: sütunlar}; "index" frames içindeki konumlardır.
+        """
+        rows = {}
+        for i, fid in enumerate(ids):
+            rows.setdefault(fid, []).append(i)
+        out = {}
+        for fid, positions in rows.items():
+            decoder = self.decoders.get(fid)
+            if decoder is None:
+                continue
+            cols = decoder.decode_batch([frames[i] for i in positions])
+            cols["index"] = array('I', (positions[i] for i in cols["index"]))
+            out[decoder.message.name] = cols
+        return out
@@ -0,0 +1,105 @@
+# utils/device_hub.py
+
+"""
+Birden fazla ESP32 ağ geçidine (her batarya dizisi için bir tane) aynı anda,
+tek BLE event loop'u üzerinden bağlanma. Her cihaz kendi BluetoothManager'ına
+(ve yeniden bağlanma gözetimine) sahiptir; gelen her paket cihazın sabit kaynak
+indeksiyle etiketlenip ortak dispatch fonksiyonuna verilir. Kaynaklar arası adil
+dağıtım FrameIngestor'daki kaynak başına tamponlar ve round-robin ile yapılır.
+"""
+
+import asyncio  # Toplu bağlantı kesme
+import threading  # Kaynak indeksi ataması için
+
+from utils.ble_worker import get_worker  # Tüm cihazların paylaştığı tek loop
+from utils.bluetooth_manager import BluetoothManager  # Cihaz başına bağlantı ve gözetim
+
+
+class DeviceHub:
+    """
+    characteristic_uuid: tüm cihazlarda dinlenecek karakteristik
+    dispatch: dispatch(veri, kaynak) — BLE thread'inde çağrılır
+    dispatch_frames: dispatch_frames(çerçeveler, ID'ler, kaynak) — çok çerçeveli bildirimler
+                     için (None ise her çerçeve dispatch'e ayrı verilir)
+    gap_callback: gap_callback(adres, başlangıç_epoch, bitiş_epoch)
+    status_callback: status_callback(adres, bağlı_mı)
+    """
+
+    def __init__(self, characteristic_uuid, dispatch, gap_callback=None, status_callback=None, worker=None,
+                 dispatch_frames=None):
+        self.characteristic_uuid = characteristic_uuid
+        self.dispatch = dispatch
+        self.dispatch_frames = dispatch_frames
+        self.gap_callback = gap_callback
+        self.status_callback = status_callback
+        self.worker = worker or get_worker()
+        self.links = {}  # adres -> BluetoothManager
+        self.sources = {}  # adres -> kaynak indeksi (uygulama boyunca sabit; BLF kanalı buna göre)
+        self._lock = threading.Lock()
+
+    def source_of(self, address):
+        # Adrese sabit bir kaynak indeksi ata (ilk görülen 0, sonraki 1, ...)
+        with self._lock:
+            source = self.sources.get(address)
+            if source is None:
+                source = self.sources[address] = len(self.sources)
+            return source
+
+    def address_of(self, source):
+        for address, s in self.sources.items():
+            if s == source:
+                return address
+        return None
+
+    @property
+    def connected(self):
+        return [a for a, m in self.links.items() if m.connected]
+
+    def connect(self, address):
+        """
+        Cihazı bağlı cihazlara ekle (önceki bağlantılar korunur).
+        Dönüş: concurrent.futures.Future
+        """
+        source = self.source_of(address)
+        manager = self.links.get(address)
+        if manager is None:
+            manager = self.links[address] = BluetoothManager()
+            manager.gap_callback = lambda start, end: self._on_gap(address, start, end)
+            manager.status_callback = lambda connected: self._on_status(address, connected)
+        dispatch = self.dispatch
+        dispatch_frames = self.dispatch_frames
+
+        def on_data(data):
+            dispatch(data, source)
+
+        if dispatch_frames is not None:
+            manager.frames_callback = lambda frames, ids: dispatch_frames(frames, ids, source)
+
+        async def runner():
+            await manager.disconnect()
+            await manager.connect_and_listen_fixed_address(address, self.characteristic_uuid, on_data)
+
+        return self.worker.submit(runner())
+
+    def disconnect(self, address):
+        manager = self.links.pop(address, None)
+        if manager is None:
+            return None
+        return self.worker.submit(manager.disconnect())
+
+    def disconnect_all(self):
+        managers = list(self.links.values())
+        self.links.clear()
+
+        async def runner():
+            await asyncio.gather(*(m.disconnect() for m in managers), return_exceptions=True)
+
+        return self.worker.submit(runner())
+
+    def _on_gap(self, address, start, end):
+        if self.gap_callback:
+            self.gap_callback(address, start, end)
+
+    def _on_status(self, address, connected):
+        if self.status_callback:
+            self.status_callback(address, connected)
@@ -0,0 +1,146 @@
+# utils/discovery.py
+
+"""
+Ortak, akışlı (streaming) BLE cihaz keşfi.
+Tarama, detection callback ile yapılır: her cihaz görüldüğü anda dinleyicilere
+bildirilir, tarama süresinin bitmesi beklenmez. Cihazlar adrese göre tekilleştirilir
+(RSSI ve ad güncellenir) ve son sonuçlar önbellekte tutulur; ekran yeniden
+açıldığında liste anında dolar. CAN2GO_SERVICE_UUID verilirse tarama, işletim
+sistemi düzeyinde yalnızca bu servisi yayınlayan cihazlarla sınırlanır.
+"""
+
+import asyncio  # Tarama süresi / erken durdurma
+import os  # Servis UUID filtresi (ortam değişkeni)
+import threading  # Dinleyici listesi ve önbellek erişimi
+import time  # Son görülme zamanı
+
+from utils.ble_backend import BleakScanner  # Gerçek bleak ya da simülatör
+from utils.ble_worker import get_worker  # Taramanın çalıştığı ortak BLE loop'u
+
+SERVICE_UUID = os.environ.get("CAN2GO_SERVICE_UUID") or None  # ESP32'nin yayınladığı servis
+CACHE_TTL = 60.0  # Önbellekteki cihazın geçerli sayıldığı süre (saniye)
+RSSI_STEP = 4  # Bu kadar dBm'den küçük RSSI değişimleri dinleyicilere bildirilmez
+
+
+class DiscoveredDevice:
+    def __init__(self, address, name, rssi, service_uuids=()):
+        self.address = address
+        self.name = name
+        self.rssi = rssi
+        self.service_uuids = tuple(service_uuids)
+        self.last_seen = time.monotonic()
+
+    def __repr__(self):
+        return f"DiscoveredDevice({self.name!r}, {self.address!r}, rssi={self.rssi})"
+
+
+class DiscoveryService:
+    """
+    SettingsScreen ve BluetoothSettingsDialog'un paylaştığı keşif servisi.
+    Dinleyiciler listener(cihaz, yeni_mi) şeklinde BLE thread'inde çağrılır.
+    Aynı anda tek tarama yapılır; tarama sürerken start() mevcut taramanın
+    future'ını döndürür.
+    """
+
+    def __init__(self, service_uuids=None, cache_ttl=CACHE_TTL, worker=None):
+        if service_uuids is None and SERVICE_UUID:
+            service_uuids = [SERVICE_UUID]
+        self.service_uuids = service_uuids
+        self.cache_ttl = cache_ttl
+        self.worker = worker or get_worker()
+        self.devices = {}  # adres -> DiscoveredDevice
+        self.listeners = []
+        self._future = None
+        self._stop_event = None
+        self._lock = threading.Lock()
+
+    @property
+    def scanning(self):
+        return self._future is not None and not self._future.done()
+
+    def add_listener(self, listener):
+        with self._lock:
+            if listener not in self.listeners:
+                self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self._lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def cached(self):
+        # Önbellekteki güncel cihazlar; sinyali en güçlü olan başta
+        limit = time.monotonic() - self.cache_ttl
+        with self._lock:
+            devices = [d for d in self.devices.values() if d.last_seen >= limit]
+        return sorted(devices, key=lambda d: d.rssi if d.rssi is not None else -999, reverse=True)
+
+    def start(self, timeout=5.0):
+        """
+        Taramayı başlat (zaten sürüyorsa aynı taramaya katıl).
+        Dönüş: concurrent.futures.Future — tarama bitince cached() listesi
+        """
+        with self._lock:
+            if not self.scanning:
+                # Durdurma olayı burada oluşturulur: tarama loop'ta başlamadan gelen stop() kaybolmaz
+                stop_event = self._stop_event = asyncio.Event()
+                self._future = self.worker.submit(self._scan(timeout, stop_event))
+            return self._future
+
+    def stop(self):
+        # Taramayı süresi dolmadan bitir (ör. cihaz seçildiğinde)
+        with self._lock:
+            stop_event = self._stop_event
+        if stop_event is not None:
+            self.worker.call_soon(stop_event.set)
+
+    async def _scan(self, timeout, stop_event):
+        kwargs = {"service_uuids": self.service_uuids} if self.service_uuids else {}
+        scanner = BleakScanner(detection_callback=self._on_detect, **kwargs)
+        await scanner.start()
+        try:
+            await asyncio.wait_for(stop_event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            await scanner.stop()
+            with self._lock:
+                if self._stop_event is stop_event:
+                    self._stop_event = None
+        return self.cached()
+
+    def _on_detect(self, device, advertisement):
+        # BLE loop'unda çağrılır: adrese göre tekilleştir, yalnızca anlamlı değişiklikleri bildir
+        name = device.name or getattr(advertisement, "local_name", None)
+        rssi = getattr(advertisement, "rssi", None)
+        uuids = getattr(advertisement, "service_uuids", None) or ()
+        with self._lock:
+            known = self.devices.get(device.address)
+            if known is None:
+                known = self.devices[device.address] = DiscoveredDevice(device.address, name, rssi, uuids)
+                changed = is_new = True
+            else:
+                is_new = False
+                changed = (name and name != known.name) or (
+                    rssi is not None and (known.rssi is None or abs(rssi - known.rssi) >= RSSI_STEP))
+                known.last_seen = time.monotonic()
+                if name:
+                    known.name = name
+                if changed and rssi is not None:
+                    known.rssi = rssi
+            listeners = list(self.listeners) if changed else ()
+        for listener in listeners:
+            listener(known, is_new)
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_discovery() -> DiscoveryService:
+    # Uygulama genelindeki tek keşif servisi (önbellek ekranlar arasında paylaşılır)
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = DiscoveryService()
+        return _service
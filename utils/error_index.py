@@ -0,0 +1,157 @@
+# utils/error_index.py
+
+"""
+Hata toplama (aggregation) indeksi.
+Aynı (kaynak, BCU, hata ID, kod) dörtlüsünün (alarmlarda kural adının) her
+tekrarı ayrı satır olarak saklanmaz;
+tek bir kayıtta adet, ilk / son görülme zamanı, kayan pencere hızı ve son
+birkaç ham oluşum tutulur. Her oluşum O(1) işlenir; bellek farklı hata
+sayısıyla sınırlıdır, hata fırtınasının uzunluğuyla değil.
+"""
+
+from collections import deque  # Son ham oluşumlar
+
+RATE_WINDOW = 10  # Hız penceresi (saniye, 1 sn'lik dilimler)
+OCCURRENCE_CAP = 50  # Kayıt başına saklanan son ham oluşum sayısı
+
+# Kayıt türleri
+ERROR = "error"  # Cihazdan gelen CAN hata çerçevesi (hata ID, kod)
+ALARM = "alarm"  # AlarmEngine kuralı (kural adı)
+
+
+class RateWindow:
+    """
+    Son `window` saniyedeki olay sayısı. 1 saniyelik dilimlerden oluşan halka
+    ve çalışan toplam tutulur; ekleme ve okuma amortize O(1)'dir.
+    """
+
+    __slots__ = ("window", "counts", "total", "last")
+
+    def __init__(self, window=RATE_WINDOW):
+        self.window = window
+        self.counts = [0] * window
+        self.total = 0
+        self.last = None  # Son dilimin (tam saniye) numarası
+
+    def _advance(self, now):
+        second = int(now)
+        last = self.last
+        if last is None or second - last >= self.window:
+            if self.total:
+                self.counts = [0] * self.window
+                self.total = 0
+        elif second > last:
+            counts, w = self.counts, self.window
+            for s in range(last + 1, second + 1):
+                i = s % w
+                self.total -= counts[i]
+                counts[i] = 0
+        elif second < last:
+            return  # Saat geri gitti: mevcut dilime say
+        self.last = second
+
+    def add(self, now, n=1):
+        self._advance(now)
+        self.counts[self.last % self.window] += n
+        self.total += n
+
+    def rate(self, now):
+        # Olay / saniye
+        self._advance(now)
+        return self.total / self.window
+
+
+class ErrorAggregate:
+    """
+    source: cihaz (ağ geçidi) indeksi; kind: ERROR ya da ALARM
+    ERROR kayıtlarında error_id / code, ALARM kayıtlarında rule (kural adı) doludur.
+    """
+
+    __slots__ = ("source", "bcu", "kind", "error_id", "code", "rule", "count", "first_seen", "last_seen",
+                 "rate", "occurrences", "message")
+
+    def __init__(self, source, bcu, kind, error_id, code, rule, now, occurrence_cap=OCCURRENCE_CAP,
+                 rate_window=RATE_WINDOW):
+        self.source = source
+        self.bcu = bcu
+        self.kind = kind
+        self.error_id = error_id
+        self.code = code
+        self.rule = rule
+        self.count = 0
+        self.first_seen = now
+        self.last_seen = now
+        self.rate = RateWindow(rate_window)
+        self.occurrences = deque(maxlen=occurrence_cap)  # Son ham oluşum zamanları
+        self.message = None  # Son oluşumun metni (alarmlarda kural ve değer)
+
+    @property
+    def key(self):
+        return self.source, self.bcu, self.kind, self.error_id, self.code, self.rule
+
+
+class ErrorIndex:
+    """
+    (kaynak, BCU, tür, hata ID, kod, kural) -> ErrorAggregate. BCU başına ayrı
+    sözlük de tutulur; seçili BCU'nun listesi diğer BCU'ların hata sayısından
+    etkilenmez. Farklı ağ geçitlerinin aynı numaralı BCU'ları ayrı kayıtlardır.
+    """
+
+    def __init__(self, occurrence_cap=OCCURRENCE_CAP, rate_window=RATE_WINDOW):
+        self.occurrence_cap = occurrence_cap
+        self.rate_window = rate_window
+        self.entries = {}
+        self.by_bcu = {}  # bcu -> {anahtar: ErrorAggregate}
+        self.total = 0  # Toplam oluşum sayısı
+
+    def record(self, bcu, error_id, code, now, source=0):
+        """
+        Bir CAN hata oluşumunu kaydet. now: epoch saniye; source: cihaz indeksi
+        Dönüş: (ErrorAggregate, yeni_mi)
+        """
+        return self._record((source, bcu, ERROR, error_id, code, None), now)
+
+    def record_alarm(self, bcu, rule, now, source=0, message=None):
+        """
+        Kalkan bir alarmı kaydet. rule: kural adı
+        message: kaydın gösterilecek metni (kural ve son değer)
+        Dönüş: (ErrorAggregate, yeni_mi)
+        """
+        return self._record((source, bcu, ALARM, None, None, rule), now, message)
+
+    def _record(self, key, now, message=None):
+        entry = self.entries.get(key)
+        is_new = entry is None
+        if is_new:
+            entry = self.entries[key] = ErrorAggregate(*key, now, self.occurrence_cap, self.rate_window)
+            self.by_bcu.setdefault(entry.bcu, {})[key] = entry
+        entry.count += 1
+        if now > entry.last_seen:
+            entry.last_seen = now
+        entry.rate.add(now)
+        entry.occurrences.append(now)
+        if message is not None:
+            entry.message = message
+        self.total += 1
+        return entry, is_new
+
+    def for_bcu(self, bcu):
+        # BCU'nun hataları; en son görülen başta
+        entries = self.by_bcu.get(bcu)
+        if not entries:
+            return []
+        return sorted(entries.values(), key=lambda e: e.last_seen, reverse=True)
+
+    def active(self, now, timeout=RATE_WINDOW, bcu=None):
+        # Son `timeout` saniye içinde tekrar eden hatalar (bcu verilirse yalnızca o BCU'nun)
+        limit = now - timeout
+        entries = self.entries if bcu is None else self.by_bcu.get(bcu, {})
+        return [e for e in entries.values() if e.last_seen >= limit]
+
+    def clear(self):
+        self.entries.clear()
+        self.by_bcu.clear()
+        self.total = 0
+
+    def __len__(self):
+        return len(self.entries)
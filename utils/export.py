@@ -0,0 +1,214 @@
+# utils/export.py
+
+"""
+Kaydedilmiş BLF kayıtlarını çözülmüş, tipli sütunlar halinde dışa aktarma.
+Biçimler: sıkıştırılmış CSV (.csv.gz, her zaman) ve Parquet (.parquet, pyarrow
+yüklüyse). Kayıt konteyner konteyner (utils/log_index.py) okunup çözülür ve
+parça parça yazılır; bellekte hiçbir zaman tüm kayıt tutulmaz. ExportJob işi
+arka plan thread'inde yürütür, ilerlemeyi bildirir ve iptal edilebilir.
+"""
+
+import csv  # CSV satırları
+import gzip  # Sıkıştırılmış CSV
+import os  # Geçici dosya ve taşıma
+import threading  # Arka plan işi ve iptal
+
+from utils import parser  # DBC çözücüleri
+from utils.log_index import LogIndex, message_ids  # mmap'li BLF okuma ve konteyner indeksi
+
+try:
+    import pyarrow as pa  # Parquet (isteğe bağlı bağımlılık)
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+PARQUET_AVAILABLE = pa is not None
+COLUMNS = ("timestamp", "channel", "frame_id", "bcu", "soc", "soh", "voltage", "temperature",
+           "error_id", "error_code")
+METRICS = ("bcu", "soc", "soh", "voltage", "temperature")
+ERRORS = ("error_id", "error_code")
+ROW_GROUP_SIZE = 65536  # Parquet satır grubu (küçük parçalar birleştirilerek yazılır)
+
+
+def decode_rows(rows):
+    """
+    Tek konteynerin satırlarını sütunlara çevirir. Her çözülen çerçeve bir satırdır;
+    ilgisiz sütunlar None'dır (metrik satırında hata sütunları ve tersi).
+    Metin işaretleri ve DBC'de olmayan çerçeveler atlanır.
+    """
+    messages = [r for r in rows if r.text is None]
+    frames = [r.data for r in messages]
+    ids = message_ids(messages)
+    n = len(messages)
+    out = {k: [None] * n for k in COLUMNS}
+    decoded = [False] * n
+    for cols, keys in ((parser.parse_metrics_batch(frames, ids=ids), METRICS),
+                       (parser.parse_error_batch(frames, ids=ids), ERRORS)):
+        index = cols["index"]
+        for k in keys:
+            dest, src = out[k], cols[k]
+            for pos, value in zip(index, src):
+                dest[pos] = value
+        for pos in index:
+            decoded[pos] = True
+    keep = [i for i in range(n) if decoded[i]]
+    out["timestamp"] = [messages[i].timestamp for i in range(n)]
+    out["channel"] = [messages[i].channel for i in range(n)]
+    out["frame_id"] = ids
+    if len(keep) != n:
+        out = {k: [col[i] for i in keep] for k, col in out.items()}
+    return out
+
+
+class CSVGzipExporter:
+    # Başlık satırı + parça başına toplu writerows; boş hücre = ilgisiz sütun
+    extension = ".csv.gz"
+
+    def __init__(self, path):
+        self.file = gzip.open(path, "wt", newline="", encoding="utf-8", compresslevel=6)
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(COLUMNS)
+
+    def write(self, columns):
+        self.writer.writerows(zip(*(columns[k] for k in COLUMNS)))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetExporter:
+    # Tipli şema; parçalar ROW_GROUP_SIZE satıra ulaşınca tek satır grubu olarak yazılır
+    extension = ".parquet"
+
+    def __init__(self, path):
+        if pa is None:
+            raise RuntimeError("Parquet için pyarrow gerekli")
+        self.schema = pa.schema([
+            ("timestamp", pa.timestamp("us", tz="UTC")),
+            ("channel", pa.uint16()),
+            ("frame_id", pa.uint32()),
+            ("bcu", pa.uint8()),
+            ("soc", pa.float64()),
+            ("soh", pa.float64()),
+            ("voltage", pa.float64()),
+            ("temperature", pa.float64()),
+            ("error_id", pa.uint8()),
+            ("error_code", pa.uint8()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+        self._pending = {k: [] for k in COLUMNS}
+        self._rows = 0
+
+    def write(self, columns):
+        columns = dict(columns, timestamp=[round(t * 1e6) for t in columns["timestamp"]])
+        for k in COLUMNS:
+            self._pending[k].extend(columns[k])
+        self._rows += len(columns["timestamp"])
+        if self._rows >= ROW_GROUP_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        arrays = [pa.array(self._pending[f.name], type=f.type) for f in self.schema]
+        self.writer.write_table(pa.Table.from_arrays(arrays, schema=self.schema))
+        self._pending = {k: [] for k in COLUMNS}
+        self._rows = 0
+
+    def close(self):
+        self._flush()
+        self.writer.close()
+
+
+EXPORTERS = {"csv": CSVGzipExporter}
+if PARQUET_AVAILABLE:
+    EXPORTERS["parquet"] = ParquetExporter
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_log(source, dest, fmt="csv", progress=None, cancel=None):
+    """
+    BLF kaydını seçilen biçimde dest'e yazar (önce "<dest>.part", bitince taşınır).
+    progress: progress(bitmiş_konteyner, toplam) — her konteynerden sonra çağrılır
+    cancel: set edildiğinde işi durduran threading.Event (yarım dosya silinir)
+    Dönüş: yazılan satır sayısı
+    """
+    exporter_cls = EXPORTERS.get(fmt)
+    if exporter_cls is None:
+        raise ValueError(f"Desteklenmeyen biçim: {fmt}")
+    temp = dest + ".part"
+    rows = 0
+    with LogIndex(source) as index:
+        exporter = exporter_cls(temp)
+        try:
+            total = len(index)
+            for i in range(total):
+                if cancel is not None and cancel.is_set():
+                    raise ExportCancelled()
+                columns = decode_rows(index.rows(i))
+                exporter.write(columns)
+                rows += len(columns["timestamp"])
+                if progress:
+                    progress(i + 1, total)
+            exporter.close()
+        except BaseException:
+            try:
+                exporter.close()
+            except Exception:
+                pass
+            os.remove(temp)
+            raise
+    os.replace(temp, dest)
+    return rows
+
+
+class ExportJob:
+    """
+    export_log'u arka plan thread'inde çalıştırır.
+    progress_callback(oran 0..1) ve done_callback(satır sayısı ya da None, hata ya da None)
+    işin thread'inde çağrılır (UI güncellemesi için Clock ile taşınmalıdır).
+    İptal edilen iş done_callback(None, None) ile biter.
+    """
+
+    def __init__(self, source, dest, fmt="csv", progress_callback=None, done_callback=None):
+        self.source = source
+        self.dest = dest
+        self.fmt = fmt
+        self.progress_callback = progress_callback
+        self.done_callback = done_callback
+        self._cancel = threading.Event()
+        self._percent = -1  # Son bildirilen yüzde (UI'ya her konteynerde değil, yüzde değişince bildirilir)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _progress(self, done, total):
+        ratio = done / total if total else 1.0
+        percent = int(ratio * 100)
+        if self.progress_callback and percent != self._percent:
+            self._percent = percent
+            self.progress_callback(ratio)
+
+    def _run(self):
+        try:
+            rows = export_log(self.source, self.dest, self.fmt, self._progress, self._cancel)
+        except ExportCancelled:
+            result = (None, None)
+        except Exception as e:
+            result = (None, e)
+        else:
+            result = (rows, None)
+        if self.done_callback:
+            self.done_callback(*result)
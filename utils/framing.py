@@ -0,0 +1,102 @@
+# utils/framing.py
+
+"""
+Çok çerçeveli (multi-frame) BLE bildirim protokolü.
+Tek bildirim, MTU'ya sığdığı kadar ID ve uzunluk önekli CAN çerçevesi taşır:
+
+    Bildirim: [0xC2] [sıra: u16 LE] [kayıt] [kayıt] ...
+    Kayıt:    [CAN ID: u16 LE] [uzunluk: u8] [veri: uzunluk bayt]
+
+Sıra numarası her bildirimde bir artar (65535'ten sonra 0); atlanan numaralar
+kayıp bildirim olarak sayılır. Eski tek-paketli bildirimler (2 / 5 bayt) bu
+biçimle karışmaz: çerçeveli bildirim en az MIN_FRAMED_SIZE bayttır ve 0xC2 ile başlar.
+Açma (unpack) işlemi memoryview dilimleri döndürür; veri kopyalanmaz.
+"""
+
+import struct  # Başlık ve kayıt önekleri
+
+MAGIC = 0xC2  # Çerçeveli bildirim işareti
+HEADER = struct.Struct("<BH")  # işaret, sıra
+RECORD = struct.Struct("<HB")  # CAN ID, uzunluk
+MIN_FRAMED_SIZE = HEADER.size + RECORD.size + 1  # 7: eski 2/5 baytlık paketlerden ayırt etmek için
+DEFAULT_MTU = 247  # BLE 4.2+ tipik ATT MTU (yük = MTU - 3)
+ATT_OVERHEAD = 3
+
+
+def is_framed(data) -> bool:
+    return len(data) >= MIN_FRAMED_SIZE and data[0] == MAGIC
+
+
+class FrameUnpacker:
+    """
+    Bağlantı başına çerçeveli bildirim açıcı.
+    lost: sıra numarası atlamalarından hesaplanan kayıp bildirim sayısı
+    malformed: yarım kalmış (bozuk) kayıt içeren bildirim sayısı
+    """
+
+    def __init__(self):
+        self.expected_seq = None
+        self.lost = 0
+        self.malformed = 0
+
+    def reset(self):
+        # Yeniden bağlanınca cihaz sırayı sıfırlayabilir: ilk bildirimden yeniden senkronize ol
+        self.expected_seq = None
+
+    def unpack(self, data):
+        """
+        Dönüş: (çerçeveler, ID'ler) — çerçeveler `data` üzerinde memoryview dilimleridir
+        """
+        view = memoryview(data)
+        _, seq = HEADER.unpack_from(view)
+        expected = self.expected_seq
+        if expected is not None and seq != expected:
+            gap = (seq - expected) & 0xFFFF
+            if gap < 0x8000:  # İleri atlama: kayıp; geri gelen (yinelenen/eski) bildirim sayılmaz
+                self.lost += gap
+        self.expected_seq = (seq + 1) & 0xFFFF
+
+        frames, ids = [], []
+        unpack_record = RECORD.unpack_from
+        pos, end = HEADER.size, len(view)
+        while pos + RECORD.size <= end:
+            frame_id, n = unpack_record(view, pos)
+            pos += RECORD.size
+            if pos + n > end:
+                self.malformed += 1
+                break
+            frames.append(view[pos:pos + n])
+            ids.append(frame_id)
+            pos += n
+        return frames, ids
+
+
+class FramePacker:
+    """
+    Referans paketleyici (firmware ve simülatör için): çerçeveleri MTU'ya
+    sığacak şekilde bildirimlere doldurur.
+    """
+
+    def __init__(self, mtu=DEFAULT_MTU):
+        self.payload = mtu - ATT_OVERHEAD
+        self.seq = 0
+
+    def pack(self, frames, ids):
+        # Dönüş: bildirim listesi (bytes)
+        out = []
+        buf = bytearray()
+        for data, frame_id in zip(frames, ids):
+            n = len(data)
+            if n > 255 or HEADER.size + RECORD.size + n > self.payload:
+                raise ValueError(f"Çerçeve bildirime sığmıyor: {n} bayt")
+            if buf and len(buf) + RECORD.size + n > self.payload:
+                out.append(bytes(buf))
+                buf = bytearray()
+            if not buf:
+                buf += HEADER.pack(MAGIC, self.seq)
+                self.seq = (self.seq + 1) & 0xFFFF
+            buf += RECORD.pack(frame_id, n)
+            buf += data
+        if buf:
+            out.append(bytes(buf))
+        return out
@@ -0,0 +1,258 @@
+# utils/ingest.py
+
+import threading  # BLE thread'i ile UI thread'i arasındaki erişimi korumak için
+import time  # Paket alınma zamanı (monotonic) için
+from collections import deque  # Sınırlı halka tampon
+
+from utils.parser import parse_metrics_batch, parse_error_batch  # Kare başına tek çözümleme
+from utils.instrumentation import STATS  # Tüketici süreleri ve uçtan uca gecikme
+
+# Tüketici politikaları (ortak tamponun teslim ettiği kare üzerinde)
+EVERY_FRAME = "every_frame"  # Karedeki tüm paketler (zaman serisi, alarmlar, hata sayımı)
+LATEST_PER_BCU = "latest_per_bcu"  # Metrik paketlerinde (kaynak, BCU) başına yalnızca en sonuncusu (ekran)
+DROP_OLDEST = "drop_oldest"  # Karedeki en yeni `limit` paket; eskiler atılır
+POLICIES = (EVERY_FRAME, LATEST_PER_BCU, DROP_OLDEST)
+
+
+class FrameBatch(list):
+    """
+    Bir UI karesinde biriken paketler.
+    Normal bir liste gibi davranır; ek olarak her paketin alınma zamanını
+    (time.monotonic_ns) `timestamps`, geldiği cihazın indeksini `sources`,
+    CAN ID'sini `ids` (eski tek paketli bildirimlerde None) içinde aynı sırayla taşır.
+    Çözülmüş sütunlar (metrics / errors) ilk erişimde bir kez hesaplanır ve
+    tüm tüketiciler tarafından paylaşılır.
+    """
+
+    def __init__(self, frames=(), timestamps=(), sources=None, ids=None):
+        super().__init__(frames)
+        self.timestamps = list(timestamps)
+        self.sources = list(sources) if sources is not None else [0] * len(self)
+        self.ids = list(ids) if ids is not None else [None] * len(self)
+        self._metrics = None
+        self._errors = None
+
+    @classmethod
+    def single(cls, data: bytes, source=0):
+        # Tek paketlik batch (şimdiki zaman damgasıyla)
+        return cls((data,), (time.monotonic_ns(),), (source,), (None,))
+
+    @property
+    def metrics(self):
+        # parse_metrics_batch sütunları (önbellekli)
+        if self._metrics is None:
+            self._metrics = parse_metrics_batch(self, ids=self._typed_ids())
+        return self._metrics
+
+    @property
+    def errors(self):
+        # parse_error_batch sütunları (önbellekli)
+        if self._errors is None:
+            self._errors = parse_error_batch(self, ids=self._typed_ids())
+        return self._errors
+
+    def select(self, positions):
+        # Verilen sıradaki paketlerden yeni batch (çözülmüş sütunlar yeniden hesaplanır)
+        return FrameBatch((self[i] for i in positions),
+                          (self.timestamps[i] for i in positions) if self.timestamps else (),
+                          [self.sources[i] for i in positions], [self.ids[i] for i in positions])
+
+    def latest_per_bcu(self):
+        """
+        Metrik paketlerinde her (kaynak, BCU) çiftinin yalnızca en son paketini,
+        diğer paketleri (hatalar vb. durum değil olay taşır) olduğu gibi tutan batch.
+        Farklı ağ geçitlerindeki aynı numaralı BCU'lar birbirini ezmez.
+        Dönüş: (batch, atılan paket sayısı)
+        """
+        cols = self.metrics
+        sources = self.sources
+        last = {(sources[i], bcu): i for bcu, i in zip(cols["bcu"], cols["index"])}
+        if len(last) == len(cols["index"]):
+            return self, 0
+        metric_rows = set(cols["index"])
+        keep = sorted([i for i in range(len(self)) if i not in metric_rows] + list(last.values()))
+        return self.select(keep), len(self) - len(keep)
+
+    def _typed_ids(self):
+        # Hiç ID yoksa (yalnızca eski paketler) ID süzmesi gereksiz
+        return self.ids if any(fid is not None for fid in self.ids) else None
+
+
+class FrameIngestor:
+    """
+    BLE thread'inden gelen paketleri sınırlı bir halka tampona ekler ve
+    UI thread'inde kare başına bir kez toplu (batch) olarak dağıtır.
+    Her kaynak (cihaz) kendi tamponuna sahiptir: hızlı bir cihaz diğerlerinin
+    paketlerini düşüremez. drain() kaynakları her karede farklı bir kaynaktan
+    başlayarak sırayla (round-robin) birleştirir; max_batch verilirse her
+    kaynağa karede eşit pay ayrılır ve kalanlar sonraki kareye bırakılır.
+
+    capacity: kaynak başına tamponda tutulacak en fazla paket sayısı. Tampon dolunca
+              en eski paket düşer ve "<ad>.dropped" ile sayılır; push() ortak BLE
+              loop'unda çağrıldığından hiçbir zaman beklemez (bekleseydi tüm cihazlar,
+              yeniden bağlanma ve tarama da dururdu). Her paketin kaybolmaması gereken
+              tam hızlı kayıt bu tampondan değil, BLE thread'inde CaptureBuffer üzerinden yapılır.
+    max_batch: karede dağıtılacak en fazla paket (None = hepsi)
+    wakeup: tampon boşken ilk paket geldiğinde çağrılacak fonksiyon
+            (ör. Clock.create_trigger(ingestor.drain)); None ise drain dışarıdan
+            periyodik olarak çağrılmalıdır.
+    stats: ölçümlerin yazılacağı Instrumentation (varsayılan STATS)
+    name: ölçüm adlarının ön eki (aynı uygulamada birden fazla ingestor için)
+
+    Tüketiciler de kendi politikalarıyla eklenir (bkz. add_consumer); böylece
+    ekran gibi yalnızca güncel durumu gösteren tüketicilerin iş yükü, UI geride
+    kaldığında bile (kaynak, BCU) sayısıyla sınırlı kalır.
+    """
+
+    def __init__(self, capacity=4096, wakeup=None, stats=STATS, max_batch=None, name="ingest"):
+        self.capacity = capacity
+        self.wakeup = wakeup
+        self.max_batch = max_batch
+        self.name = name
+        self.consumers = []  # on_new_batch(frames) metoduna sahip ekranlar
+        self._policies = []  # Tüketici başına (politika, sınır)
+        self._consumer_drops = []  # Tüketici başına atılan paket sayacı
+        self.dropped = 0  # Tampon dolduğu için atılan paket sayısı
+        self.dropped_by_source = {}
+        self._queues = {}  # kaynak -> deque((zaman, paket, ID))
+        self._pending = 0  # Tüm kaynaklarda bekleyen paket
+        self._turn = 0  # Round-robin başlangıç kaynağı
+        self._lock = threading.Lock()
+        self._timers = []  # Tüketici başına süre histogramı
+        self._latency = stats.histogram("pipeline.notify_to_render")
+        self._stats = stats
+        stats.gauge(f"{name}.dropped", lambda: self.dropped)
+        stats.gauge(f"{name}.pending", lambda: self._pending)
+
+    def add_consumer(self, consumer, policy=EVERY_FRAME, limit=None):
+        """
+        Toplu veriyi alacak yeni bir tüketici ekle.
+        policy: EVERY_FRAME (karedeki tüm paketler), LATEST_PER_BCU (metriklerde
+                (kaynak, BCU) başına en son paket) ya da DROP_OLDEST (karedeki en yeni `limit` paket)
+        Tüketicinin politikası gereği atılan paketler "<ad>.dropped.<Tüketici>" sayacında
+        toplanır; ortak tampondan düşenler ise "<ad>.dropped" içindedir.
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"Bilinmeyen politika: {policy}")
+        if policy == DROP_OLDEST and not limit:
+            raise ValueError("DROP_OLDEST için limit gerekli")
+        name = type(consumer).__name__
+        self.consumers.append(consumer)
+        self._policies.append((policy, limit))
+        self._consumer_drops.append(self._stats.counter(f"{self.name}.dropped.{name}"))
+        self._timers.append(self._stats.histogram(f"consumer.{name}"))
+
+    def _queue(self, source):
+        # Kilit altında çağrılır: kaynağın tamponu (yoksa oluşturulur)
+        queue = self._queues.get(source)
+        if queue is None:
+            queue = self._queues[source] = deque(maxlen=self.capacity)
+        return queue
+
+    def push(self, data: bytes, source=0):
+        # BLE thread'inde çağrılır: paketi zaman damgasıyla kaynağın tamponuna ekle
+        ts = time.monotonic_ns()
+        with self._lock:
+            frames = self._queue(source)
+            was_empty = not self._pending
+            if len(frames) == self.capacity:
+                self.dropped += 1
+                self.dropped_by_source[source] = self.dropped_by_source.get(source, 0) + 1
+            else:
+                self._pending += 1
+            frames.append((ts, data, None))
+        # Yalnızca boş -> dolu geçişinde UI thread'ini uyandır
+        if was_empty and self.wakeup:
+            self.wakeup()
+
+    def push_many(self, frames, ids=None, source=0):
+        # Tek bildirimden açılan çerçeveler: kilit ve uyandırma bildirim başına bir kez
+        if not frames:
+            return
+        ts = time.monotonic_ns()
+        if ids is None:
+            ids = [None] * len(frames)
+        with self._lock:
+            queue = self._queue(source)
+            was_empty = not self._pending
+            overflow = max(0, len(queue) + len(frames) - self.capacity)
+            if overflow:
+                self.dropped += overflow
+                self.dropped_by_source[source] = self.dropped_by_source.get(source, 0) + overflow
+            self._pending += len(frames) - overflow
+            queue.extend((ts, data, fid) for data, fid in zip(frames, ids))
+        if was_empty and self.wakeup:
+            self.wakeup()
+
+    def _take(self):
+        # Kilit altında çağrılır: kaynaklardan bu karenin payını sırayla al
+        sources = list(self._queues)
+        start = self._turn % len(sources)
+        self._turn += 1
+        order = sources[start:] + sources[:start]
+        share = None
+        if self.max_batch is not None:
+            active = sum(1 for s in order if self._queues[s])
+            share = max(1, self.max_batch // max(active, 1))
+        chunks = []
+        for source in order:
+            frames = self._queues[source]
+            if not frames:
+                continue
+            if share is None or len(frames) <= share:
+                self._queues[source] = deque(maxlen=self.capacity)
+                chunks.append((source, frames))
+            else:
+                chunks.append((source, [frames.popleft() for _ in range(share)]))
+        self._pending -= sum(len(items) for _, items in chunks)
+        return chunks
+
+    def drain(self, *args):
+        # UI thread'inde çağrılır: biriken paketleri (en fazla max_batch) tek seferde dağıt
+        with self._lock:
+            if not self._pending:
+                return None
+            chunks = self._take()
+            leftover = self._pending
+        if len(chunks) == 1:
+            source, items = chunks[0]
+            batch = FrameBatch((d for _, d, _ in items), (t for t, _, _ in items),
+                               [source] * len(items), (f for _, _, f in items))
+        else:
+            batch = FrameBatch()
+            for source, items in chunks:
+                batch.extend(d for _, d, _ in items)
+                batch.timestamps.extend(t for t, _, _ in items)
+                batch.sources.extend([source] * len(items))
+                batch.ids.extend(f for _, _, f in items)
+        views = {(EVERY_FRAME, None): (batch, 0)}  # Politika başına batch bir kez süzülür
+        for consumer, timer, policy, drops in zip(self.consumers, self._timers, self._policies,
+                                                  self._consumer_drops):
+            view = views.get(policy)
+            if view is None:
+                view = views[policy] = self._view(batch, *policy)
+            frames, dropped = view
+            if dropped:
+                drops.add(dropped)
+            t0 = time.perf_counter_ns()
+            consumer.on_new_batch(frames)
+            timer.record(time.perf_counter_ns() - t0)
+        # Bildirimden kare işlemenin sonuna kadar geçen süre (paket başına)
+        done = time.monotonic_ns()
+        self._latency.record_many(done - ts for ts in batch.timestamps)
+        # Payı aşan paketler kaldıysa bir sonraki karede devam et
+        if leftover and self.wakeup:
+            self.wakeup()
+        return batch
+
+    @staticmethod
+    def _view(batch, policy, limit):
+        # Tüketicinin politikasına göre süzülmüş batch: (batch, atılan paket sayısı)
+        if policy == LATEST_PER_BCU:
+            return batch.latest_per_bcu()
+        if policy == DROP_OLDEST and len(batch) > limit:
+            return batch.select(range(len(batch) - limit, len(batch))), len(batch) - limit
+        return batch, 0
+
+    def __len__(self):
+        return self._pending
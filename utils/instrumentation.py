@@ -0,0 +1,135 @@
+# utils/instrumentation.py
+
+"""
+Veri hattı ölçümleri: sayaçlar, gecikme histogramları ve anlık değer (gauge) okuyucuları.
+Tüm ölçümler modül düzeyindeki STATS nesnesinde toplanır; snapshot() ile API
+olarak okunur, isteğe bağlı ekran katmanı (components/debug_overlay.py) da buradan beslenir.
+Her sayaç/histogram tek bir thread tarafından yazılır; okuma her thread'den yapılabilir.
+"""
+
+import bisect  # Histogram kovası bulma
+import time  # Süre ölçümü
+
+# Gecikme kovaları (mikro saniye): 1-2-5 serisi, 1 µs .. 10 s
+_BOUNDS_US = [m * 10 ** e for e in range(0, 7) for m in (1, 2, 5)] + [10_000_000]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def add(self, n=1):
+        self.value += n
+
+    def reset(self):
+        self.value = 0
+
+
+class LatencyHistogram:
+    """
+    Sabit kovalı gecikme histogramı; kayıt O(log k), bellek sabit.
+    Yüzdelikler kova üst sınırı olarak (yaklaşık) döner.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * (len(_BOUNDS_US) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[bisect.bisect_left(_BOUNDS_US, ns / 1000)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def record_many(self, values_ns):
+        for ns in values_ns:
+            self.record(ns)
+
+    def percentile(self, p):
+        # p (0-100) yüzdeliğinin kova üst sınırı (µs)
+        if not self.count:
+            return None
+        target = self.count * p / 100
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                if i < len(_BOUNDS_US):
+                    return min(_BOUNDS_US[i], round(self.max_ns / 1000, 1))
+                break
+        return round(self.max_ns / 1000, 1)
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "mean_us": round(self.total_ns / self.count / 1000, 1) if self.count else None,
+            "p50_us": self.percentile(50),
+            "p99_us": self.percentile(99),
+            "max_us": round(self.max_ns / 1000, 1),
+        }
+
+
+class _Timer:
+    # with STATS.timer("ad"): ... bloğunun süresini histograma yazar
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.record(time.perf_counter_ns() - self.t0)
+        return False
+
+
+class Instrumentation:
+    def __init__(self):
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}  # ad -> değeri döndüren fonksiyon
+        self.started = time.monotonic()
+
+    def counter(self, name) -> Counter:
+        c = self.counters.get(name)
+        if c is None:
+            c = self.counters[name] = Counter()
+        return c
+
+    def histogram(self, name) -> LatencyHistogram:
+        h = self.histograms.get(name)
+        if h is None:
+            h = self.histograms[name] = LatencyHistogram()
+        return h
+
+    def timer(self, name):
+        return _Timer(self.histogram(name))
+
+    def gauge(self, name, fn):
+        # Anlık değer okuyucu kaydet (ör. tampon düşürme sayıları)
+        self.gauges[name] = fn
+
+    def snapshot(self):
+        return {
+            "uptime_s": round(time.monotonic() - self.started, 1),
+            "counters": {k: c.value for k, c in self.counters.items()},
+            "gauges": {k: fn() for k, fn in self.gauges.items()},
+            "latency": {k: h.snapshot() for k, h in self.histograms.items()},
+        }
+
+    def reset(self):
+        # Nesneler yerinde sıfırlanır: bileşenler oluşturulurken aldıkları sayaçlara yazmaya devam eder
+        for c in self.counters.values():
+            c.reset()
+        for h in self.histograms.values():
+            h.reset()
+        self.started = time.monotonic()
+
+
+STATS = Instrumentation()
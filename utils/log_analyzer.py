@@ -0,0 +1,233 @@
+# utils/log_analyzer.py
+
+"""
+Kaydedilmiş BLF kayıtlarının komut satırından, Kivy olmadan toplu analizi.
+Her dosya konteyner indeksine (utils/log_index.py) göre parçalara bölünür;
+parçalar bir süreç havuzunda (process pool) paralel çözülür. Her süreç dosyayı
+kendisi bellek eşlemli (mmap) açar, yalnızca kendi konteynerlerini açar ve
+küçük bir kısmi özet döndürür; özetler ana süreçte birleştirilir.
+
+Kullanım:
+    python -m utils.log_analyzer kayit1.blf kayit2.blf ...
+    python -m utils.log_analyzer --jobs 8 --json kayitlar/*.blf > ozet.json
+
+Metrikler (kanal, BCU) başına, hatalar (kanal, hata ID) başına özetlenir;
+hata çerçevesi BCU bilgisi taşımaz (bkz. assets/can2go.dbc, BCU_ERROR).
+"""
+
+import argparse  # Komut satırı seçenekleri
+import json  # --json çıktısı
+import os  # Çekirdek sayısı
+import sys  # Çıkış kodu ve hata çıktısı
+from concurrent.futures import ProcessPoolExecutor  # Parçaların paralel çözümü
+from datetime import datetime  # Zaman biçimleme
+
+from utils import parser  # DBC çözücüleri
+from utils.blf import BLFParseError  # Geçersiz kayıt dosyası
+from utils.log_index import LogIndex, message_ids  # mmap'li BLF okuma ve konteyner indeksi
+
+METRICS = ("soc", "soh", "voltage", "temperature")
+CHUNK_CONTAINERS = 32  # Görev başına konteyner (~4 MB açılmış veri)
+
+
+class LogSummary:
+    """
+    Birleştirilebilir (merge) kısmi özet.
+    metrics: (kanal, bcu) -> {metrik: [adet, toplam, min, max]}
+    errors: (kanal, hata ID) -> [adet, ilk zaman, son zaman, son kod]
+    """
+
+    def __init__(self):
+        self.frames = 0
+        self.marks = 0  # Bağlantı kesintisi vb. metin işaretleri
+        self.start = None
+        self.stop = None
+        self.metrics = {}
+        self.errors = {}
+
+    def add_rows(self, rows):
+        # Tek konteynerin satırlarını özete ekle (sütunlar DBC ile toplu çözülür)
+        messages = [r for r in rows if r.text is None]
+        self.marks += len(rows) - len(messages)
+        if not messages:
+            return
+        self.frames += len(messages)
+        self._span(messages[0].timestamp, messages[-1].timestamp)
+        frames = [r.data for r in messages]
+        ids = message_ids(messages)
+
+        cols = parser.parse_metrics_batch(frames, ids=ids)
+        groups = {}
+        for n, (src, bcu) in enumerate(zip(cols["index"], cols["bcu"])):
+            groups.setdefault((messages[src].channel, bcu), []).append(n)
+        for key, positions in groups.items():
+            stats = self.metrics.get(key)
+            if stats is None:
+                stats = self.metrics[key] = {k: [0, 0.0, None, None] for k in METRICS}
+            for k in METRICS:
+                col = cols[k]
+                values = [col[n] for n in positions]
+                self._fold(stats[k], len(values), sum(values), min(values), max(values))
+
+        cols = parser.parse_error_batch(frames, ids=ids)
+        for src, error_id, code in zip(cols["index"], cols["error_id"], cols["error_code"]):
+            row = messages[src]
+            key = (row.channel, error_id)
+            entry = self.errors.get(key)
+            if entry is None:
+                self.errors[key] = [1, row.timestamp, row.timestamp, code]
+            else:
+                entry[0] += 1
+                entry[1] = min(entry[1], row.timestamp)
+                if row.timestamp >= entry[2]:
+                    entry[2], entry[3] = row.timestamp, code
+
+    @staticmethod
+    def _fold(stats, count, total, lo, hi):
+        stats[0] += count
+        stats[1] += total
+        stats[2] = lo if stats[2] is None else min(stats[2], lo)
+        stats[3] = hi if stats[3] is None else max(stats[3], hi)
+
+    def _span(self, start, stop):
+        self.start = start if self.start is None else min(self.start, start)
+        self.stop = stop if self.stop is None else max(self.stop, stop)
+
+    def merge(self, other):
+        self.frames += other.frames
+        self.marks += other.marks
+        if other.start is not None:
+            self._span(other.start, other.stop)
+        for key, stats in other.metrics.items():
+            mine = self.metrics.get(key)
+            if mine is None:
+                self.metrics[key] = stats
+                continue
+            for k, s in stats.items():
+                self._fold(mine[k], *s)
+        for key, (count, first, last, code) in other.errors.items():
+            entry = self.errors.get(key)
+            if entry is None:
+                self.errors[key] = [count, first, last, code]
+            else:
+                entry[0] += count
+                entry[1] = min(entry[1], first)
+                if last >= entry[2]:
+                    entry[2], entry[3] = last, code
+        return self
+
+    def to_dict(self):
+        return {
+            "frames": self.frames,
+            "marks": self.marks,
+            "start": self.start,
+            "stop": self.stop,
+            "bcus": [
+                {"channel": ch, "bcu": bcu, "frames": stats[METRICS[0]][0],
+                 **{k: {"min": s[2], "max": s[3], "mean": s[1] / s[0]} for k, s in stats.items() if s[0]}}
+                for (ch, bcu), stats in sorted(self.metrics.items())
+            ],
+            "errors": [
+                {"channel": ch, "error_id": error_id, "message": parser.error_message(error_id),
+                 "count": count, "first": first, "last": last, "last_code": code}
+                for (ch, error_id), (count, first, last, code) in sorted(self.errors.items())
+            ],
+        }
+
+
+_open_logs = {}  # Süreç başına açık kayıtlar (aynı dosyanın parçaları mmap'i paylaşır)
+
+
+def _analyze_chunk(path, start, stop):
+    # Havuz sürecinde çalışır: [start, stop) konteynerlerini çöz, kısmi özet döndür
+    index = _open_logs.get(path)
+    if index is None:
+        index = _open_logs[path] = LogIndex(path)
+    summary = LogSummary()
+    for i in range(start, stop):
+        summary.add_rows(index.rows(i))
+    return summary
+
+
+def _close_logs():
+    # Süreçteki açık kayıtları (dosya + mmap) kapat
+    while _open_logs:
+        _open_logs.popitem()[1].close()
+
+
+def analyze(paths, jobs=None, chunk=CHUNK_CONTAINERS):
+    """
+    Kayıtları paralel çözüp tek özet döndürür.
+    jobs: süreç sayısı (None = çekirdek sayısı, 1 = havuz kullanmadan bu süreçte)
+    Dönüş: (LogSummary, {dosya: konteyner sayısı})
+    """
+    tasks = []
+    containers = {}
+    for path in paths:
+        # İndeks burada oluşturulup yan dosyaya yazılır; süreçler onu doğrudan okur
+        with LogIndex(path) as index:
+            containers[path] = len(index)
+        tasks.extend((path, s, min(s + chunk, len(index))) for s in range(0, len(index), chunk))
+    summary = LogSummary()
+    if jobs == 1 or len(tasks) <= 1:
+        # Bu süreçte çalışılır: açılan kayıtlar dönüşte kapatılır (kütüphane kullanımında birikmesin)
+        try:
+            for task in tasks:
+                summary.merge(_analyze_chunk(*task))
+        finally:
+            _close_logs()
+        return summary, containers
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        for part in pool.map(_analyze_chunk, *zip(*tasks)):
+            summary.merge(part)
+    return summary, containers
+
+
+def _fmt_time(ts):
+    return datetime.fromtimestamp(ts).strftime("%d/%m/%Y %H:%M:%S") if ts is not None else "-"
+
+
+def format_report(summary):
+    # İnsan okunur tablo
+    data = summary.to_dict()
+    lines = [f"Çerçeve: {data['frames']}  İşaret: {data['marks']}  "
+             f"Aralık: {_fmt_time(data['start'])} – {_fmt_time(data['stop'])}", ""]
+    lines.append(f"{'Kanal':>5} {'BCU':>4} {'Çerçeve':>9}  {'SOC min/ort/max':>20}  "
+                 f"{'Voltaj min/ort/max':>24}  {'Sıcaklık min/ort/max':>22}")
+    for b in data["bcus"]:
+        cells = []
+        for k, width, fmt in (("soc", 20, "{:.1f}"), ("voltage", 24, "{:.2f}"), ("temperature", 22, "{:.0f}")):
+            s = b.get(k)
+            text = "/".join(fmt.format(s[x]) for x in ("min", "mean", "max")) if s else "-"
+            cells.append(f"{text:>{width}}")
+        lines.append(f"{b['channel']:>5} {b['bcu']:>4} {b['frames']:>9}  " + "  ".join(cells))
+    if data["errors"]:
+        lines += ["", f"{'Kanal':>5} {'ID':>4} {'Adet':>7}  {'İlk':<19}  {'Son':<19}  Hata"]
+        for e in data["errors"]:
+            lines.append(f"{e['channel']:>5} {e['error_id']:>4} {e['count']:>7}  {_fmt_time(e['first']):<19}  "
+                         f"{_fmt_time(e['last']):<19}  {e['message']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="CAN2GO BLF kayıtlarının paralel özeti")
+    ap.add_argument("paths", nargs="+", help="BLF kayıt dosyaları")
+    ap.add_argument("--jobs", "-j", type=int, default=None, help="süreç sayısı (varsayılan: çekirdek sayısı)")
+    ap.add_argument("--chunk", type=int, default=CHUNK_CONTAINERS, help="görev başına konteyner sayısı")
+    ap.add_argument("--json", action="store_true", help="JSON çıktı")
+    args = ap.parse_args(argv)
+    try:
+        summary, containers = analyze(args.paths, args.jobs, max(args.chunk, 1))
+    except (OSError, BLFParseError) as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+    if args.json:
+        json.dump({"files": containers, **summary.to_dict()}, sys.stdout, ensure_ascii=False, indent=1)
+        print()
+    else:
+        print(format_report(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,337 @@
+# utils/log_index.py
+
+"""
+Büyük BLF kayıtlarını uygulama içinde açmak için bellek eşlemli (mmap) okuyucu
+ve zaman indeksi. Dosya açılırken yalnızca konteyner başlıkları gezilir; her
+konteynerin ilk nesnesinin zamanı, sıkıştırılmış verinin yalnızca başı açılarak
+okunur. İndeks kaydın yanına "<kayıt>.idx" olarak yazılır ve sonraki açılışlarda
+(dosya boyu ve değişiklik zamanı tutuyorsa) doğrudan okunur. Bir zamana atlama,
+konteynerler üzerinde ikili arama (bisect) ile O(log n) yapılır ve yalnızca
+ilgili konteyner açılır.
+"""
+
+import bisect  # Zaman -> konteyner / satır araması
+import mmap  # Dosyayı belleğe kopyalamadan okumak için
+import os  # Dosya boyu ve değişiklik zamanı
+import re  # Filtre metni
+import struct  # İndeks dosyası başlığı
+import threading  # Arama thread'i ile UI arasında önbellek koruması
+import zlib  # Konteyner açma
+from array import array  # İndeks sütunları
+from collections import OrderedDict, namedtuple  # Açılmış konteyner önbelleği, satır kaydı
+from datetime import datetime  # Satır zaman metni
+
+from utils.blf import (  # BLF yapıları ve başlık okuma
+    APP_TEXT, APP_TEXT_STRUCT, BLFParseError, BLFReader, CAN_FD_MESSAGE, CAN_FD_MSG_STRUCT, CAN_MESSAGE,
+    CAN_MSG_STRUCT, LOG_CONTAINER, LOG_CONTAINER_STRUCT, OBJ_HEADER_BASE_STRUCT, OBJ_HEADER_V1_STRUCT,
+    TIME_TEN_MICS, ZLIB_DEFLATE,
+)
+from utils import parser  # Satırların BCU / hata çözümlemesi (DBC)
+
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = struct.Struct("<4sHQq")  # imza, sürüm, kayıt boyu, kayıt değişiklik zamanı (ns)
+INDEX_MAGIC = b"C2IX"
+INDEX_VERSION = 1
+CACHE_BLOCKS = 4  # Bellekte açık tutulan konteyner sayısı
+OBJ_HEADER_SIZE = OBJ_HEADER_BASE_STRUCT.size + OBJ_HEADER_V1_STRUCT.size
+CONTAINER_HEADER_SIZE = OBJ_HEADER_BASE_STRUCT.size + LOG_CONTAINER_STRUCT.size
+# V1 başlıklı CAN_MESSAGE nesnesinin tamamı (BLFWriter'ın yazdığı en sık nesne) tek seferde açılır
+CAN_OBJECT_STRUCT = struct.Struct("<4sHHLL" + OBJ_HEADER_V1_STRUCT.format[1:] + CAN_MSG_STRUCT.format[1:])
+
+# text: APP_TEXT işaretlerinin metni (CAN satırlarında None)
+LogRow = namedtuple("LogRow", "timestamp channel arbitration_id data text")
+
+
+def message_ids(rows):
+    # Satırların DBC mesaj ID'leri. Eski kayıtlarda ID 0'dır: mesaj, uygulamadaki gibi
+    # paket boyundan anlaşılır (metrik boyunda ve üstü metrik, daha kısası hata)
+    metrics_id = parser.database.decoder(parser.METRICS_MESSAGE).message.frame_id
+    error_id = parser.database.decoder(parser.ERROR_MESSAGE).message.frame_id
+    size = parser.METRIC_FRAME_SIZE
+    return [r.arbitration_id or (metrics_id if len(r.data) >= size else error_id) for r in rows]
+
+
+class LogBlock:
+    """
+    Açılmış tek konteyner: satırlar, zaman sütunu ve DBC ile çözülmüş
+    BCU / hata ID sütunları (ilgisiz satırlarda None).
+    """
+
+    def __init__(self, index, rows):
+        self.index = index
+        self.rows = rows
+        self.timestamps = array('d', (r.timestamp for r in rows))
+        self.bcu = [None] * len(rows)
+        self.error_id = [None] * len(rows)
+        self.summary = [r.text and f"# {r.text}" for r in rows]
+        self._decode()
+
+    def _decode(self):
+        positions = [i for i, r in enumerate(self.rows) if r.text is None]
+        frames = [self.rows[i].data for i in positions]
+        ids = message_ids(self.rows[i] for i in positions)
+        metrics = parser.parse_metrics_batch(frames, ids=ids)
+        for n, src in enumerate(metrics["index"]):
+            i = positions[src]
+            self.bcu[i] = metrics["bcu"][n]
+            self.summary[i] = (f"BCU {metrics['bcu'][n]}  SOC %{metrics['soc'][n]:.0f}  "
+                               f"SOH %{metrics['soh'][n]:.0f}  {metrics['voltage'][n]:.2f} V  "
+                               f"{metrics['temperature'][n]:.0f} °C")
+        errors = parser.parse_error_batch(frames, ids=ids)
+        for n, src in enumerate(errors["index"]):
+            i = positions[src]
+            self.error_id[i] = errors["error_id"][n]
+            self.summary[i] = f"{parser.error_message(errors['error_id'][n])} (kod {errors['error_code'][n]})"
+
+    def __len__(self):
+        return len(self.rows)
+
+
+class RowFilter:
+    """
+    Satır filtresi. Metin biçimi: "BCU 3" / "B3" (BCU), "E145" / "hata 145" (hata ID);
+    ikisi birlikte de verilebilir ("B3 E145").
+    """
+
+    _BCU = re.compile(r"\b(?:bcu|b)\s*(\d+)\b", re.IGNORECASE)
+    _ERROR = re.compile(r"\b(?:hata|error|e)\s*(\d+)\b", re.IGNORECASE)
+
+    def __init__(self, bcu=None, error_id=None):
+        self.bcu = bcu
+        self.error_id = error_id
+
+    @classmethod
+    def parse(cls, text):
+        text = text.strip()
+        if not text:
+            return None
+        bcu, error = cls._BCU.search(text), cls._ERROR.search(text)
+        if not bcu and not error:
+            raise ValueError(f"Filtre anlaşılamadı: {text}")
+        return cls(int(bcu.group(1)) if bcu else None, int(error.group(1)) if error else None)
+
+    def select(self, block):
+        # Bloktaki eşleşen satırların konumları
+        bcu, error_id = self.bcu, self.error_id
+        return [i for i in range(len(block))
+                if (bcu is None or block.bcu[i] == bcu) and (error_id is None or block.error_id[i] == error_id)]
+
+
+class LogIndex:
+    """
+    path: BLF kayıt dosyası
+    use_sidecar: indeksi "<path>.idx" dosyasından oku / dosyaya yaz
+    Konteyner i'nin zaman aralığı: [first_ts[i], first_ts[i + 1])
+    """
+
+    def __init__(self, path, use_sidecar=True):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            header = BLFReader(self._file)  # Başlık doğrulama ve zaman bilgileri
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        self._view = memoryview(self._mm)
+        self.header_size = self._file.tell()
+        self.object_count = header.object_count
+        self.start_timestamp = header.start_timestamp
+        self.stop_timestamp = header.stop_timestamp
+        self.offsets = array('Q')  # Konteynerin dosyadaki konumu
+        self.first_ts = array('d')  # Konteynerdeki ilk nesnenin zamanı
+        self._cache = OrderedDict()  # konteyner -> LogBlock
+        self._lock = threading.Lock()
+        if not (use_sidecar and self._load_sidecar()):
+            self._build()
+            if use_sidecar:
+                self._save_sidecar()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._cache.clear()
+            if self._view is not None:
+                self._view.release()
+                self._view = None
+                self._mm.close()
+                self._file.close()
+
+    # İndeks
+
+    def _stamp(self):
+        st = os.fstat(self._file.fileno())
+        return st.st_size, st.st_mtime_ns
+
+    def _load_sidecar(self):
+        try:
+            with open(self.path + INDEX_SUFFIX, "rb") as f:
+                raw = f.read()
+        except OSError:
+            return False
+        if len(raw) < INDEX_HEADER.size:
+            return False
+        magic, version, size, mtime = INDEX_HEADER.unpack_from(raw)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or (size, mtime) != self._stamp():
+            return False
+        body = raw[INDEX_HEADER.size:]
+        count = len(body) // 16
+        self.offsets.frombytes(body[:8 * count])
+        self.first_ts.frombytes(body[8 * count:16 * count])
+        return True
+
+    def _save_sidecar(self):
+        # Yazılamazsa (ör. salt okunur klasör) indeks her açılışta yeniden oluşturulur
+        try:
+            with open(self.path + INDEX_SUFFIX, "wb") as f:
+                f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *self._stamp()))
+                f.write(self.offsets.tobytes())
+                f.write(self.first_ts.tobytes())
+        except OSError:
+            pass
+
+    def _build(self):
+        # Üst düzey nesneleri mmap üzerinde gez; konteynerleri tamamen açmadan ilk zamanı oku
+        view, end = self._view, len(self._mm)
+        base = OBJ_HEADER_BASE_STRUCT
+        pos = self.header_size
+        while pos + base.size <= end:
+            signature, _, _, obj_size, obj_type = base.unpack_from(view, pos)
+            if signature != b"LOBJ" or obj_size < base.size:
+                raise BLFParseError("Geçersiz nesne imzası")
+            if obj_type == LOG_CONTAINER:
+                ts = self._peek_timestamp(pos, min(pos + obj_size, end))
+                if ts is not None:
+                    self.offsets.append(pos)
+                    self.first_ts.append(ts)
+            pos += obj_size + obj_size % 4
+
+    def _peek_timestamp(self, pos, end):
+        method, _ = LOG_CONTAINER_STRUCT.unpack_from(self._view, pos + OBJ_HEADER_BASE_STRUCT.size)
+        data = self._view[pos + CONTAINER_HEADER_SIZE:end]
+        if method == ZLIB_DEFLATE:
+            # Sıkıştırılmış akışın yalnızca ilk nesne başlığına yetecek kadarını aç
+            head = zlib.decompressobj().decompress(data[:1024], OBJ_HEADER_SIZE)
+            if len(head) < OBJ_HEADER_SIZE:
+                head = zlib.decompress(data)
+        else:
+            head = bytes(data[:OBJ_HEADER_SIZE])
+        if len(head) < OBJ_HEADER_SIZE:
+            return None
+        return self._timestamp(head, 0)
+
+    def _timestamp(self, data, pos):
+        # V1 ve V2 nesne başlıklarında zaman aynı konumdadır
+        flags, _, _, ts = OBJ_HEADER_V1_STRUCT.unpack_from(data, pos + OBJ_HEADER_BASE_STRUCT.size)
+        return self.start_timestamp + ts * (1e-5 if flags == TIME_TEN_MICS else 1e-9)
+
+    # Okuma
+
+    def block(self, i):
+        # i. konteyneri açıp çözülmüş satırlara çevir (son açılanlar önbellekte tutulur)
+        with self._lock:
+            cached = self._cache.get(i)
+            if cached is not None:
+                self._cache.move_to_end(i)
+                return cached
+        block = LogBlock(i, self.rows(i))
+        with self._lock:
+            self._cache[i] = block
+            while len(self._cache) > CACHE_BLOCKS:
+                self._cache.popitem(last=False)
+        return block
+
+    def rows(self, i):
+        # i. konteynerin ham satırları (önbelleğe alınmaz, çözümleme yapılmaz)
+        with self._lock:
+            pos = self.offsets[i]
+            _, _, _, obj_size, _ = OBJ_HEADER_BASE_STRUCT.unpack_from(self._view, pos)
+            method, _ = LOG_CONTAINER_STRUCT.unpack_from(self._view, pos + OBJ_HEADER_BASE_STRUCT.size)
+            data = self._view[pos + CONTAINER_HEADER_SIZE:pos + obj_size]
+            raw = zlib.decompress(data) if method == ZLIB_DEFLATE else bytes(data)
+            del data
+        return list(self._rows(raw))
+
+    def _rows(self, data):
+        # Konteyner içindeki CAN / CAN FD mesajları ve metin işaretleri
+        pos, end = 0, len(data)
+        start_ts = self.start_timestamp
+        can_object, can_size = CAN_OBJECT_STRUCT.unpack_from, CAN_OBJECT_STRUCT.size
+        while pos + OBJ_HEADER_SIZE <= end:
+            signature, header_size, _, obj_size, obj_type = OBJ_HEADER_BASE_STRUCT.unpack_from(data, pos)
+            if signature != b"LOBJ":
+                raise BLFParseError("Geçersiz nesne imzası")
+            if pos + obj_size > end:
+                break  # Konteyner sınırını aşan nesne (bu uygulamanın yazdığı dosyalarda olmaz)
+            body = pos + header_size
+            if obj_type == CAN_MESSAGE and header_size == OBJ_HEADER_SIZE and obj_size >= can_size:
+                # Hızlı yol: başlık ve mesaj tek unpack ile
+                (_, _, _, _, _, flags, _, _, ts,
+                 channel, _, dlc, arb_id, payload) = can_object(data, pos)
+                yield LogRow(start_ts + ts * (1e-5 if flags == TIME_TEN_MICS else 1e-9), channel,
+                             arb_id & 0x1FFFFFFF, payload[:min(dlc, 8)], None)
+            elif obj_type == CAN_MESSAGE:
+                channel, _, dlc, arb_id, payload = CAN_MSG_STRUCT.unpack_from(data, body)
+                yield LogRow(self._timestamp(data, pos), channel, arb_id & 0x1FFFFFFF,
+                             payload[:min(dlc, 8)], None)
+            elif obj_type == CAN_FD_MESSAGE:
+                channel, _, _, arb_id, _, _, _, valid, payload = CAN_FD_MSG_STRUCT.unpack_from(data, body)
+                yield LogRow(self._timestamp(data, pos), channel, arb_id & 0x1FFFFFFF, payload[:valid], None)
+            elif obj_type == APP_TEXT:
+                _, _, length = APP_TEXT_STRUCT.unpack_from(data, body)
+                start = body + APP_TEXT_STRUCT.size
+                text = data[start:start + length].decode("utf-8", "replace")
+                yield LogRow(self._timestamp(data, pos), 0, 0, b"", text)
+            pos += obj_size + obj_size % 4
+
+    def locate(self, timestamp):
+        """
+        Zamana en yakın (o zamandan sonraki ilk) satırın konumu.
+        Dönüş: (konteyner, satır) — kayıt boşsa None
+        """
+        if not self.offsets:
+            return None
+        i = max(bisect.bisect_right(self.first_ts, timestamp) - 1, 0)
+        block = self.block(i)
+        j = bisect.bisect_left(block.timestamps, timestamp)
+        if j >= len(block) and i + 1 < len(self):
+            return i + 1, 0
+        return i, min(j, max(len(block) - 1, 0))
+
+    def find(self, row_filter, start=0, step=1, cancel=None):
+        """
+        start konteynerinden itibaren (step: 1 ileri, -1 geri) filtreye uyan satırı
+        içeren ilk konteyneri arar. cancel: set edildiğinde aramayı bırakan threading.Event
+        Dönüş: (konteyner, eşleşen satır konumları) ya da None
+        """
+        i = start
+        while 0 <= i < len(self):
+            if cancel is not None and cancel.is_set():
+                return None
+            matches = row_filter.select(self.block(i))
+            if matches:
+                return i, matches
+            i += step
+        return None
+
+
+def format_time(timestamp):
+    # Satır zamanı: saat:dakika:saniye.milisaniye
+    return datetime.fromtimestamp(timestamp).strftime("%H:%M:%S.%f")[:-3]
+
+
+def format_row(block, i):
+    # Listede gösterilecek iki satırlık metin
+    row = block.rows[i]
+    if row.text is not None:
+        return format_time(row.timestamp), block.summary[i]
+    head = f"{format_time(row.timestamp)}  K{row.channel}  {row.arbitration_id:03X}  {row.data.hex(' ').upper()}"
+    return head, block.summary[i] or ""
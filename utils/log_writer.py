@@ -0,0 +1,170 @@
+# utils/log_writer.py
+
+import logging  # Yazıcı thread hataları (can2go.log)
+import os  # fsync ve dosya işlemleri
+import queue  # BLE/UI thread'i ile yazıcı thread arasında kayıt kuyruğu
+import shutil  # Geçici dosyayı hedefe taşımak için
+import tempfile  # Kayıt sırasında kullanılan geçici dosya
+import threading  # Arka planda yazıcı thread
+import time  # fsync aralığı için
+from collections import namedtuple  # Kuyruktaki işaret kayıtları
+from datetime import datetime  # Metin formatındaki zaman damgası
+
+log = logging.getLogger("can2go.log")
+
+_STOP = object()  # Yazıcı thread'e kapanma işareti
+_Mark = namedtuple("_Mark", "timestamp text")  # Veri dışı açıklama (ör. bağlantı kesintisi)
+
+
+class TextLogFormat:
+    """
+    Satır başına bir kayıt, her satırda aynı dört sütun:
+    "gg/aa/yyyy ss:dd:ss || K<kaynak> || <CAN ID> || HEX VERİ"
+    Kaynak 1 tabanlı cihaz numarasıdır (K1, K2 ...). CAN ID'si olmayan eski tek
+    paketli bildirimlerde ID sütunu "-" olur. İşaretler: "... || - || - || # metin"
+    """
+    def begin(self, f):
+        pass
+
+    def write(self, f, records):
+        lines = [
+            f"{datetime.fromtimestamp(ts).strftime('%d/%m/%Y %H:%M:%S')} || K{source + 1} || "
+            f"{'-' if frame_id is None else f'{frame_id:03X}'} || {data.hex(' ').upper()}\n"
+            for ts, data, source, frame_id in records
+        ]
+        f.write("".join(lines).encode("ascii"))
+
+    def mark(self, f, timestamp, text):
+        f.write(f"{datetime.fromtimestamp(timestamp).strftime('%d/%m/%Y %H:%M:%S')} || - || - || # {text}\n"
+                .encode("utf-8"))
+
+    def end(self, f):
+        pass
+
+
+class StreamingLogWriter:
+    """
+    Kayıtları bellekte biriktirmeden, ayrı bir thread'de geçici dosyaya akıtır.
+    write() her thread'den çağrılabilir ve beklemez; kayıtlar toplu (batch)
+    halinde yazılır, belirli aralıklarla fsync yapılır. finalize() yalnızca
+    kalan kuyruğu boşaltır, dosyayı kapatır ve hedefe taşır.
+
+    fmt: begin/write/end metotlarına sahip dosya formatı (varsayılan TextLogFormat)
+    directory: geçici dosyanın oluşturulacağı klasör (None ise sistem varsayılanı)
+    source: drain() ile kayıt listesi veren kaynak (ör. CaptureBuffer); yazıcı thread
+            her turda bu kaynağı da boşaltır
+    """
+
+    def __init__(self, fmt=None, directory=None, batch_size=512, flush_interval=0.5, fsync_interval=5.0,
+                 source=None):
+        self.fmt = fmt or TextLogFormat()
+        self.source = source
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync_interval = fsync_interval
+        self.count = 0  # Kuyruğa alınan kayıt sayısı
+        self.error = None  # Yazıcı thread'de oluşan son hata
+        fd, self.temp_path = tempfile.mkstemp(suffix=".part", prefix="can2go_", dir=directory)
+        self._file = os.fdopen(fd, "wb", buffering=1 << 16)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _check(self):
+        # Yazıcı thread'i durduysa kuyruk sınırsızca büyümesin: hemen hata ver
+        if self.error is not None or not self._thread.is_alive():
+            raise RuntimeError("Kayıt yazıcısı durdu") from self.error
+
+    def write(self, timestamp: float, data: bytes, source: int = 0, frame_id=None):
+        # Kaydı kuyruğa ekle (timestamp: epoch saniye, source: cihaz indeksi, frame_id: CAN ID)
+        self._check()
+        self._queue.put((timestamp, data, source, frame_id))
+        self.count += 1
+
+    def mark(self, timestamp: float, text: str):
+        # Kayda veri dışı bir işaret ekle (format destekliyorsa); sayaca dahil edilmez
+        self._check()
+        self._queue.put(_Mark(timestamp, text))
+
+    def _run(self):
+        f = self._file
+        last_sync = time.monotonic()
+        stopping = False
+        try:
+            self.fmt.begin(f)
+            while not stopping:
+                # İlk kaydı bekle, ardından kuyrukta biriken her şeyi topla
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = None
+                batch = []
+                while item is not None:
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    if type(item) is _Mark:
+                        # İşaretten önceki kayıtları (kaynaktakiler dahil) yaz, sonra işareti
+                        if batch:
+                            self.fmt.write(f, batch)
+                            batch = []
+                        self._drain_source(f)
+                        if hasattr(self.fmt, "mark"):
+                            self.fmt.mark(f, item.timestamp, item.text)
+                        item = None if self._queue.empty() else self._queue.get_nowait()
+                        continue
+                    batch.append(item)
+                    if len(batch) >= self.batch_size:
+                        self.fmt.write(f, batch)
+                        batch = []
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        item = None
+                if batch:
+                    self.fmt.write(f, batch)
+                # Bağlı kaynakta (tam hızlı yakalama) biriken kayıtları yaz
+                self._drain_source(f)
+                # Periyodik fsync: uygulama çökse bile kayıt diskte kalsın
+                now = time.monotonic()
+                if now - last_sync >= self.fsync_interval:
+                    f.flush()
+                    os.fsync(f.fileno())
+                    last_sync = now
+            self.fmt.end(f)
+            f.flush()
+            os.fsync(f.fileno())
+        except Exception as e:
+            self.error = e
+            log.exception("Kayıt yazıcısı durdu")
+        finally:
+            f.close()
+
+    def _drain_source(self, f):
+        if self.source is not None:
+            records = self.source.drain()
+            if records:
+                self.count += len(records)
+                self.fmt.write(f, records)
+
+    def close(self):
+        # Kalan kayıtları yaz ve thread'i durdur
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def finalize(self, dest_path: str):
+        # Kaydı bitir ve geçici dosyayı hedef adla taşı
+        self.close()
+        if self.error:
+            raise self.error
+        shutil.move(self.temp_path, dest_path)
+        return dest_path
+
+    def discard(self):
+        # Kaydı iptal et ve geçici dosyayı sil
+        self.close()
+        try:
+            os.remove(self.temp_path)
+        except OSError:
+            pass
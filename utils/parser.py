@@ -1,47 +1,102 @@
 # utils/parser.py
 
+import os  # DBC dosya yolu
+from utils.dbc import load_dbc  # Derlenmiş DBC çözücü
+
+# Önceden tanımlı hatalar (ileride detaylandırılacak)
+ERROR_DEFINITIONS = {
+    145: "Cell Overvoltage",
+    146: "Cell Undervoltage",
+    147: "Over Temperature",
+    148: "Under Temperature",
+    149: "Charge Overcurrent",
+    150: "Discharge Overcurrent",
+    151: "BMS Communication Lost",
+    152: "Battery Pack Unbalanced",
+}
+
+# Çerçeve düzeni assets/can2go.dbc'den okunur; firmware değişince yalnızca DBC güncellenir
+# (CAN2GO_DBC ortam değişkeniyle başka bir dosya da verilebilir)
+DBC_PATH = os.environ.get("CAN2GO_DBC") or os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "can2go.dbc")
+METRICS_MESSAGE = "BCU_METRICS"  # soc, soh, voltage, temperature, bcu
+ERROR_MESSAGE = "BCU_ERROR"  # error_id, error_code
+
+database = None  # Yüklü CANDatabase
+_metrics_decoder = _error_decoder = None
+METRIC_FRAME_SIZE = ERROR_FRAME_SIZE = None
+
+
+def load_definitions(path=DBC_PATH):
+    """
+    DBC dosyasını yükleyip mesaj çözücülerini (yeniden) derler.
+    Uygulama çalışırken de çağrılabilir; sonraki batch'ler yeni tanımlarla çözülür.
+    """
+    global database, _metrics_decoder, _error_decoder, METRIC_FRAME_SIZE, ERROR_FRAME_SIZE
+    db = load_dbc(path)
+    metrics, errors = db.decoder(METRICS_MESSAGE), db.decoder(ERROR_MESSAGE)
+    database, _metrics_decoder, _error_decoder = db, metrics, errors
+    METRIC_FRAME_SIZE = metrics.message.size
+    ERROR_FRAME_SIZE = errors.message.size
+    return db
+
+
+load_definitions()
+
+
+def parse_metrics_batch(frames, stride=None, ids=None):
+    """
+    Çok sayıda metrik paketini tek seferde çözer.
+    frames: paket listesi veya bitişik tampon (stride: kayıt başına bayt, varsayılan DLC)
+    ids: çerçeve ID'leri (çok çerçeveli bildirimlerden); diğer mesajlar atlanır
+    Dönüş: sütunlar sözlüğü (DBC'deki BCU_METRICS sinyalleri)
+        bcu, soc, soh, voltage, temperature, index (kaynak sırası)
+    Mesaj boyundan kısa paketler atlanır.
+    """
+    return _metrics_decoder.decode_batch(frames, stride, ids)
+
+
+def parse_error_batch(frames, stride=None, ids=None):
+    """
+    Çok sayıda hata paketini tek seferde çözer.
+    Dönüş: sütunlar sözlüğü (DBC'deki BCU_ERROR sinyalleri)
+        error_id, error_code, index (kaynak sırası)
+    Mesaj metni gerektiğinde error_message() ile alınır.
+    """
+    return _error_decoder.decode_batch(frames, stride, ids)
+
+
+def error_message(error_id: int) -> str:
+    # Prototip: bilinmeyen bir hata ID’si de prototip mesaj olarak göster
+    return ERROR_DEFINITIONS.get(error_id) or f"Unknown Error ID {error_id}"
+
+
 def parse_error(data: bytes):
     """
     Prototip aşamasında, gelen her veri paketi için hata olarak değerlendirin.
     data[0]: hata ID
     data[1]: hata kodu
     """
-    error_id = data[0]
-    error_code = data[1]
-    # Önceden tanımlı hatalar (ileride detaylandırılacak)
-    error_definitions = {
-        145: "Cell Overvoltage",
-        146: "Cell Undervoltage",
-        147: "Over Temperature",
-        148: "Under Temperature",
-        149: "Charge Overcurrent",
-        150: "Discharge Overcurrent",
-        151: "BMS Communication Lost",
-        152: "Battery Pack Unbalanced",
-    }
-    if error_id in error_definitions:
-        return {
-            "error_message": error_definitions[error_id],
-            "error_code": error_code
-        }
-    # Prototip: bilinmeyen bir hata ID’si de prototip mesaj olarak göster
+    cols = parse_error_batch((data,))
+    if not cols["index"]:
+        raise IndexError(f"hata paketi için en az {ERROR_FRAME_SIZE} bayt gerekli")
     return {
-        "error_message": f"Unknown Error ID {error_id}",
-        "error_code": error_code
+        "error_message": error_message(cols["error_id"][0]),
+        "error_code": cols["error_code"][0]
     }
 
+
 def parse_metrics(data: bytes):
     """
     Dummy veri üzerinden metrik üretimi (real-time parser bu fonksiyonu değiştirecek).
     """
-    soc = data[0] * 100 // 255  # 0-100
-    soh = data[1] * 100 // 255
-    voltage = (data[2] << 8 | data[3]) / 100.0  # 0-65535 -> 0-655.35 V
-    temp = data[4] - 40  # 0-255 -> -40 to +215°C
+    cols = parse_metrics_batch((data,))
+    if not cols["index"]:
+        raise IndexError(f"metrik paketi için en az {METRIC_FRAME_SIZE} bayt gerekli")
 
     return {
-        "soc": soc,
-        "soh": soh,
-        "voltage": voltage,
-        "temperature": temp
+        "soc": cols["soc"][0],
+        "soh": cols["soh"][0],
+        "voltage": cols["voltage"][0],
+        "temperature": cols["temperature"][0]
     }
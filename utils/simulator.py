@@ -0,0 +1,289 @@
+# utils/simulator.py
+
+"""
+ESP32 olmadan geliştirme ve yük testi için BLE simülatörü.
+Uygulamanın kullandığı BleakClient / BleakScanner yüzeyini taklit eder ve
+çok BCU'lu metrik ile hata trafiği üretir. Aynı seed ile aynı paket dizisi
+ve aynı hata (fault) senaryosu üretilir.
+
+Kullanım: CAN2GO_SIMULATOR=1 python main.py
+Parametreler ortam değişkenleriyle ayarlanabilir (bkz. SimulatorConfig.from_env).
+"""
+
+import asyncio  # Bildirim üretim döngüsü
+import os  # Ortam değişkenleri
+import random  # Seed'li deterministik üretim
+from collections import namedtuple  # Tarama sonuçları için cihaz kaydı
+
+from utils.framing import DEFAULT_MTU, FramePacker  # Çok çerçeveli bildirim modu
+
+SimulatedDevice = namedtuple("SimulatedDevice", "name address rssi service_uuids", defaults=((),))
+# bleak'in AdvertisementData'sının simülatörde kullanılan alanları
+SimulatedAdvertisement = namedtuple("SimulatedAdvertisement", "local_name rssi service_uuids")
+
+# Simüle ESP32'lerin yayınladığı servis (CAN2GO_SERVICE_UUID ile filtre denenebilir)
+SIM_SERVICE_UUID = os.environ.get("CAN2GO_SERVICE_UUID", "0000c260-0000-1000-8000-00805f9b34fb")
+
+DEFAULT_DEVICES = (
+    SimulatedDevice("CAN2Go-SIM-1", "SI:MU:LA:TO:R0:01", -48, (SIM_SERVICE_UUID,)),
+    SimulatedDevice("CAN2Go-SIM-2", "SI:MU:LA:TO:R0:02", -61, (SIM_SERVICE_UUID,)),
+    SimulatedDevice(None, "SI:MU:LA:TO:R0:99", -83),  # Servis yayınlamayan alakasız cihaz
+)
+
+# Çerçeveli modda paket boyuna göre CAN ID (assets/can2go.dbc: BCU_METRICS / BCU_ERROR)
+FRAME_IDS = {5: 0x100, 2: 0x101}
+
+
+class SimulatorConfig:
+    """
+    rate: saniyedeki bildirim sayısı
+    bcu_count: simüle edilen BCU sayısı
+    error_ratio: hata paketi olasılığı
+    seed: rastgelelik tohumu (aynı seed = aynı trafik)
+    burst_prob / burst_size: her paket için ani yığılma olasılığı ve yığın boyu
+    gap_prob / gap_seconds: her paket için veri kesintisi olasılığı ve süresi
+    disconnect_after: bu kadar paketten sonra bağlantıyı kopar (None = kopma yok)
+    framed / mtu: paketleri utils/framing.py biçiminde MTU'ya sığdığı kadar tek bildirimde gönder
+    """
+
+    def __init__(self, rate=200.0, bcu_count=16, error_ratio=0.02, seed=0,
+                 burst_prob=0.0, burst_size=50, gap_prob=0.0, gap_seconds=0.5,
+                 disconnect_after=None, devices=DEFAULT_DEVICES, framed=False, mtu=DEFAULT_MTU):
+        self.rate = rate
+        self.bcu_count = bcu_count
+        self.error_ratio = error_ratio
+        self.seed = seed
+        self.burst_prob = burst_prob
+        self.burst_size = burst_size
+        self.gap_prob = gap_prob
+        self.gap_seconds = gap_seconds
+        self.disconnect_after = disconnect_after
+        self.devices = devices
+        self.framed = framed
+        self.mtu = mtu
+
+    @classmethod
+    def from_env(cls, environ=os.environ):
+        # CAN2GO_SIM_RATE, CAN2GO_SIM_SEED, CAN2GO_SIM_BURST, CAN2GO_SIM_GAP, CAN2GO_SIM_DISCONNECT,
+        # CAN2GO_SIM_FRAMED, CAN2GO_SIM_MTU
+        cfg = cls()
+        cfg.rate = float(environ.get("CAN2GO_SIM_RATE", cfg.rate))
+        cfg.seed = int(environ.get("CAN2GO_SIM_SEED", cfg.seed))
+        cfg.burst_prob = float(environ.get("CAN2GO_SIM_BURST", cfg.burst_prob))
+        cfg.gap_prob = float(environ.get("CAN2GO_SIM_GAP", cfg.gap_prob))
+        if environ.get("CAN2GO_SIM_DISCONNECT"):
+            cfg.disconnect_after = int(environ["CAN2GO_SIM_DISCONNECT"])
+        cfg.framed = environ.get("CAN2GO_SIM_FRAMED", "") not in ("", "0")
+        cfg.mtu = int(environ.get("CAN2GO_SIM_MTU", cfg.mtu))
+        return cfg
+
+
+class TrafficGenerator:
+    """
+    Deterministik paket üreticisi. Her BCU için SOC/SOH/voltaj/sıcaklık
+    rastgele yürüyüşle değişir; paketler utils/parser.py düzenindedir:
+    metrik: [soc, soh, voltaj(hi), voltaj(lo), sıcaklık+40]  (BCU = byte0 % 16 + 1)
+    hata:   [hata ID, hata kodu]
+    """
+
+    ERROR_IDS = tuple(range(145, 153))
+
+    def __init__(self, config=None):
+        self.config = config or SimulatorConfig()
+        self.rng = random.Random(self.config.seed)
+        rng = self.rng
+        self.state = [
+            {
+                "soc": rng.uniform(40, 95),
+                "soh": rng.uniform(80, 100),
+                "voltage": rng.uniform(46, 54),
+                "temperature": rng.uniform(20, 35),
+            }
+            for _ in range(self.config.bcu_count)
+        ]
+        self.sent = 0
+
+    def next_frame(self) -> bytearray:
+        rng = self.rng
+        self.sent += 1
+        if rng.random() < self.config.error_ratio:
+            return bytearray((rng.choice(self.ERROR_IDS), rng.randrange(256)))
+        i = rng.randrange(self.config.bcu_count)
+        s = self.state[i]
+        # Yavaş rastgele yürüyüş: SOC azalır, sıcaklık ve voltaj dalgalanır
+        s["soc"] = min(100.0, max(0.0, s["soc"] - rng.uniform(0, 0.02)))
+        s["voltage"] = min(655.0, max(0.0, s["voltage"] + rng.gauss(0, 0.05)))
+        s["temperature"] = min(215.0, max(-40.0, s["temperature"] + rng.gauss(0, 0.1)))
+        # İlk bayt hem SOC'u hem BCU'yu taşır: SOC'a en yakın, BCU'ya denk gelen değeri seç
+        b0 = int(round(s["soc"] * 2.55))
+        b0 = b0 - (b0 % 16) + (i % 16)
+        if b0 > 255:
+            b0 -= 16
+        raw_v = int(round(s["voltage"] * 100))
+        return bytearray((b0, int(round(s["soh"] * 2.55)), raw_v >> 8, raw_v & 0xFF,
+                          int(round(s["temperature"])) + 40))
+
+    def frames(self, n):
+        return [self.next_frame() for _ in range(n)]
+
+
+class SimulatedBleakClient:
+    """
+    BleakClient yerine kullanılabilen simüle istemci.
+    Desteklenen yüzey: connect, disconnect, is_connected, start_notify, stop_notify,
+    disconnected_callback.
+    """
+
+    def __init__(self, address_or_device, disconnected_callback=None, config=None, **kwargs):
+        self.address = getattr(address_or_device, "address", address_or_device)
+        self._disconnected_callback = disconnected_callback
+        self.config = config or SimulatorConfig.from_env()
+        self._connected = False
+        self._task = None
+        self.generator = TrafficGenerator(self.config)
+
+    @property
+    def is_connected(self):
+        return self._connected
+
+    async def connect(self, **kwargs):
+        await asyncio.sleep(0.05)  # Gerçekçi küçük bağlantı gecikmesi
+        self._connected = True
+        return True
+
+    async def disconnect(self):
+        await self._stop()
+        self._connected = False
+        return True
+
+    async def start_notify(self, char_specifier, callback, **kwargs):
+        if not self._connected:
+            raise RuntimeError("Simülatör bağlı değil")
+        await self._stop()
+        self._task = asyncio.get_running_loop().create_task(self._produce(char_specifier, callback))
+
+    async def stop_notify(self, char_specifier):
+        await self._stop()
+
+    async def _stop(self):
+        task, self._task = self._task, None
+        if task and task is not asyncio.current_task():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _produce(self, sender, callback):
+        # Hedef hıza göre, geçen süreye düşen sayıda paketi gönder (ms altı uyku yapılamadığı için)
+        cfg = self.config
+        gen = self.generator
+        fault_rng = random.Random(cfg.seed + 1)  # Fault senaryosu da deterministik
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        emitted = 0
+        link_sent = 0  # Bu bağlantıda gönderilen paket (kopma senaryosu bağlantı başına sayılır)
+        # Çerçeveli modda turda üretilen paketler biriktirilip MTU'luk bildirimlere doldurulur
+        pending = [] if cfg.framed else None
+        send = pending.append if cfg.framed else (lambda frame: callback(sender, frame))
+        packer = FramePacker(cfg.mtu)
+        while self._connected:
+            due = int((loop.time() - start) * cfg.rate) - emitted
+            for _ in range(max(due, 0)):
+                if cfg.disconnect_after is not None and link_sent >= cfg.disconnect_after:
+                    self._flush(sender, callback, packer, pending)
+                    self._drop_link()
+                    return
+                if cfg.burst_prob and fault_rng.random() < cfg.burst_prob:
+                    # Ani yığılma: aynı anda çok sayıda bildirim
+                    for frame in gen.frames(cfg.burst_size):
+                        send(frame)
+                    link_sent += cfg.burst_size
+                if cfg.gap_prob and fault_rng.random() < cfg.gap_prob:
+                    # Veri kesintisi: bu süre boyunca hiçbir şey gönderme ve birikeni atla
+                    self._flush(sender, callback, packer, pending)
+                    await asyncio.sleep(cfg.gap_seconds)
+                    emitted = int((loop.time() - start) * cfg.rate)
+                    break
+                send(gen.next_frame())
+                emitted += 1
+                link_sent += 1
+            self._flush(sender, callback, packer, pending)
+            await asyncio.sleep(0.001)
+
+    @staticmethod
+    def _flush(sender, callback, packer, pending):
+        # Biriken paketleri ID önekleriyle paketleyip bildirim olarak gönder
+        if not pending:
+            return
+        for notification in packer.pack(pending, [FRAME_IDS[len(f)] for f in pending]):
+            callback(sender, bytearray(notification))
+        pending.clear()
+
+    def _drop_link(self):
+        # Beklenmeyen bağlantı kopması: bleak gibi disconnected_callback çağrılır
+        self._connected = False
+        self._task = None
+        if self._disconnected_callback:
+            self._disconnected_callback(self)
+
+
+class SimulatedBleakScanner:
+    """
+    BleakScanner yerine kullanılabilen simüle tarayıcı.
+    Desteklenen yüzey: discover(), detection_callback ile start() / stop() ve
+    service_uuids filtresi. Cihazlar farklı gecikmelerle "duyulur" ve yayınları
+    RSSI dalgalanmasıyla tekrarlanır.
+    """
+
+    ADVERTISE_INTERVAL = 0.2  # Aynı cihazın yayın tekrar aralığı (saniye)
+
+    def __init__(self, detection_callback=None, service_uuids=None, config=None, **kwargs):
+        self.detection_callback = detection_callback
+        self.service_uuids = [u.lower() for u in service_uuids] if service_uuids else None
+        self.config = config or SimulatorConfig.from_env()
+        self._task = None
+
+    def _visible(self):
+        devices = self.config.devices
+        if self.service_uuids:
+            devices = [d for d in devices if set(u.lower() for u in d.service_uuids) & set(self.service_uuids)]
+        return list(devices)
+
+    async def start(self):
+        await self.stop()
+        self._task = asyncio.get_running_loop().create_task(self._advertise())
+
+    async def stop(self):
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _advertise(self):
+        rng = random.Random(self.config.seed + 2)
+        devices = self._visible()
+        # İlk duyulma: güçlü sinyalli cihazlar daha erken
+        first = sorted(devices, key=lambda d: -d.rssi)
+        await asyncio.sleep(0.05)
+        for d in first:
+            self._emit(d, d.rssi)
+            await asyncio.sleep(0.05)
+        while True:
+            await asyncio.sleep(self.ADVERTISE_INTERVAL)
+            for d in devices:
+                self._emit(d, d.rssi + rng.randint(-6, 6))
+
+    def _emit(self, device, rssi):
+        if self.detection_callback:
+            adv = SimulatedAdvertisement(device.name, rssi, list(device.service_uuids))
+            self.detection_callback(device._replace(rssi=rssi), adv)
+
+    @staticmethod
+    async def discover(timeout=5.0, config=None, service_uuids=None, **kwargs):
+        scanner = SimulatedBleakScanner(service_uuids=service_uuids, config=config)
+        await asyncio.sleep(min(timeout, 0.3))
+        return scanner._visible()
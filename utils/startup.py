@@ -0,0 +1,33 @@
+# utils/startup.py
+
+"""
+Açılış süresi ölçümü. main.py en başta START'ı alır; açılışın önemli adımları
+mark() ile işaretlenir ve report() ile süreler (ms) loglanır / döndürülür.
+İşaretler: "imports" (modül yüklemeleri), "build" (login ekranı hazır),
+"first_frame" (ilk kare çizildi), "main_tabs" (sekmeler arka planda hazırlandı).
+"""
+
+import logging  # Rapor çıktısı
+import time  # perf_counter
+
+log = logging.getLogger("can2go.startup")
+
+
+class StartupTimer:
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.marks = {}  # ad -> başlangıçtan geçen süre (ms)
+
+    def mark(self, name):
+        # Aynı ad ilk kez işaretlendiğinde kaydedilir
+        if name not in self.marks:
+            self.marks[name] = round((time.perf_counter() - self.t0) * 1000, 1)
+        return self.marks[name]
+
+    def report(self):
+        text = ", ".join(f"{k}={v} ms" for k, v in self.marks.items())
+        log.info("⏱️ Açılış: %s", text)
+        return dict(self.marks)
+
+
+START = StartupTimer()
@@ -0,0 +1,178 @@
+# utils/timeseries.py
+
+import time  # Zaman damgası olmayan girdiler için
+from array import array  # Sabit boyutlu tipli halka tamponlar
+
+from utils.aggregates import METRIC_KEYS  # soc, soh, voltage, temperature
+from utils.parser import parse_metrics_batch  # FrameBatch dışı girdiler için çözümleme
+
+
+class RingSeries:
+    """
+    Tek bir (kaynak, BCU, metrik) için sabit kapasiteli zaman serisi.
+    Zaman damgaları (monotonic saniye) ve değerler önceden ayrılmış iki
+    array('d') içinde tutulur; dolunca en eski örneğin üzerine yazılır.
+    Zaman damgalarının artan sırada eklendiği varsayılır.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self._head = 0  # Toplam eklenen örnek sayısı
+
+    def __len__(self):
+        return min(self._head, self.capacity)
+
+    def append(self, t, v):
+        i = self._head % self.capacity
+        self.times[i] = t
+        self.values[i] = v
+        self._head += 1
+
+    def _phys(self, i):
+        # Mantıksal indeks (0 = en eski) -> fiziksel dizi indeksi
+        return (self._head - len(self) + i) % self.capacity
+
+    def latest(self):
+        # Son örnek: (zaman, değer) ya da None
+        if not self._head:
+            return None
+        i = (self._head - 1) % self.capacity
+        return self.times[i], self.values[i]
+
+    def _bisect(self, t):
+        # t'den küçük olmayan ilk örneğin mantıksal indeksi (O(log n))
+        lo, hi = 0, len(self)
+        times, phys = self.times, self._phys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[phys(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def range(self, t0=None, t1=None):
+        """
+        [t0, t1) aralığındaki örnekler: (zamanlar, değerler) array('d') çifti.
+        """
+        start = 0 if t0 is None else self._bisect(t0)
+        end = len(self) if t1 is None else self._bisect(t1)
+        times, values = array('d'), array('d')
+        if start >= end:
+            return times, values
+        # Halka sınırını en fazla iki dilimle kopyala
+        a, b = self._phys(start), self._phys(end - 1) + 1
+        if a < b:
+            times.extend(self.times[a:b])
+            values.extend(self.values[a:b])
+        else:
+            times.extend(self.times[a:])
+            times.extend(self.times[:b])
+            values.extend(self.values[a:])
+            values.extend(self.values[:b])
+        return times, values
+
+    def downsample(self, t0, t1, buckets, mode="minmax"):
+        """
+        [t0, t1) aralığını eşit zaman dilimlerine böler.
+        mode="minmax": [(dilim başlangıcı, min, max), ...]
+        mode="mean":   [(dilim başlangıcı, ortalama), ...]
+        Boş dilimler atlanır.
+        """
+        times, values = self.range(t0, t1)
+        if not times or buckets <= 0:
+            return []
+        width = (t1 - t0) / buckets
+        out = []
+        cur = -1
+        lo = hi = total = 0.0
+        n = 0
+        for t, v in zip(times, values):
+            b = int((t - t0) / width)
+            if b != cur:
+                if n:
+                    start = t0 + cur * width
+                    out.append((start, lo, hi) if mode == "minmax" else (start, total / n))
+                cur, lo, hi, total, n = b, v, v, 0.0, 0
+            if v < lo:
+                lo = v
+            elif v > hi:
+                hi = v
+            total += v
+            n += 1
+        if n:
+            start = t0 + cur * width
+            out.append((start, lo, hi) if mode == "minmax" else (start, total / n))
+        return out
+
+
+class TimeSeriesStore:
+    """
+    Kaynak (cihaz), BCU ve metrik bazında ortak zaman serisi deposu.
+    Paketler bir kez çözülür ve buraya yazılır; dashboard ve analiz
+    ekranları aynı veriyi buradan okur. Farklı ağ geçitlerindeki aynı
+    numaralı BCU'lar farklı paketlerdir: seriler (kaynak, BCU) ile ayrılır.
+    """
+
+    def __init__(self, capacity=16384, keys=METRIC_KEYS):
+        self.capacity = capacity
+        self.keys = tuple(keys)
+        self._series = {}  # (kaynak, bcu, metrik) -> RingSeries
+        self.bcus = set()  # Veri gelmiş (kaynak, BCU) çiftleri
+        self.sources = set()  # Veri gelmiş kaynak indeksleri
+
+    def series(self, bcu, key, source=0):
+        # İlgili seriyi döndür, yoksa oluştur (yalnızca yazma yolları: append_columns, Toplam)
+        s = self._series.get((source, bcu, key))
+        if s is None:
+            s = self._series[(source, bcu, key)] = RingSeries(self.capacity)
+        return s
+
+    def on_new_batch(self, frames):
+        # FrameBatch tüketicisi: karedeki metrikleri (tek çözümleme) depoya yaz
+        cols = frames.metrics if hasattr(frames, "metrics") else parse_metrics_batch(frames)
+        stamps = getattr(frames, "timestamps", None)
+        self.append_columns(cols, stamps, getattr(frames, "sources", None))
+        return cols
+
+    def append_columns(self, cols, timestamps_ns=None, sources=None):
+        """
+        parse_metrics_batch çıktısını ekler.
+        timestamps_ns: kaynak paketlerin monotonic ns zamanları (cols["index"] ile eşlenir)
+        sources: paketlerin kaynak (cihaz) indeksleri (cols["index"] ile eşlenir; None = 0)
+        Dönüş: güncellenen (kaynak, BCU) çiftleri
+        """
+        now = time.monotonic()
+        updated = set()
+        series = self.series
+        keys = self.keys
+        columns = [cols[k] for k in keys]
+        for n, (bcu, src) in enumerate(zip(cols["bcu"], cols["index"])):
+            t = timestamps_ns[src] / 1e9 if timestamps_ns else now
+            source = sources[src] if sources else 0
+            for k, col in zip(keys, columns):
+                series(bcu, k, source).append(t, col[n])
+            updated.add((source, bcu))
+        self.bcus |= updated
+        self.sources.update(source for source, _ in updated)
+        return updated
+
+    def latest(self, bcu, source=0):
+        # BCU'nun son metrikleri: {"soc": ..., ...} (veri yoksa 0)
+        out = {}
+        for k in self.keys:
+            s = self._series.get((source, bcu, k))
+            last = s.latest() if s else None
+            out[k] = last[1] if last else 0
+        return out
+
+    def range(self, bcu, key, t0=None, t1=None, source=0):
+        # Okuma seri oluşturmaz: veri gelmemiş BCU / kaynak için boş diziler
+        s = self._series.get((source, bcu, key))
+        return s.range(t0, t1) if s else (array('d'), array('d'))
+
+    def downsample(self, bcu, key, t0, t1, buckets, mode="minmax", source=0):
+        s = self._series.get((source, bcu, key))
+        return s.downsample(t0, t1, buckets, mode) if s else []